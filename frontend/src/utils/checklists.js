@@ -0,0 +1,79 @@
+/**
+ * Inspection checklist templates kept in localStorage and revalidated by version (ETag) once per page load.
+ * Picking the checklist for a vehicle runs locally, mirroring vehicle_inspection_template.select_checklist.
+ */
+import { frappeCall } from "./api.js";
+
+const STORAGE_KEY = "workshop-inspection-checklists";
+const MATCH_FIELDS = ["make", "model", "fuel_type"];
+
+let revalidation = null;
+const vehicleCache = new Map();
+
+function readStored() {
+	try {
+		const bundle = JSON.parse(localStorage.getItem(STORAGE_KEY) || "null");
+		return bundle && bundle.version && Array.isArray(bundle.templates) ? bundle : null;
+	} catch {
+		return null;
+	}
+}
+
+function store(bundle) {
+	try {
+		localStorage.setItem(STORAGE_KEY, JSON.stringify(bundle));
+	} catch {
+		/* quota / private mode: keep it for this page only */
+	}
+}
+
+/** The compiled bundle; the stored copy is sent as etag and only replaced when the server has a newer one. */
+export function getChecklistBundle() {
+	if (!revalidation) {
+		const stored = readStored();
+		revalidation = frappeCall("workshop_mgmt.workshop_management.vehicle_inspection_template.get_inspection_checklists", {
+			etag: stored?.version || null,
+		})
+			.then((res) => {
+				if (res?.not_modified && stored) return stored;
+				store(res);
+				return res;
+			})
+			.catch((e) => {
+				revalidation = null;
+				if (stored) return stored;
+				throw e;
+			});
+	}
+	return revalidation;
+}
+
+function norm(v) {
+	return String(v || "").trim().toLowerCase() || null;
+}
+
+export function selectChecklist(bundle, vehicle) {
+	const values = Object.fromEntries(MATCH_FIELDS.map((f) => [f, norm(vehicle?.[f])]));
+	let best = null;
+	let bestKey = null;
+	for (const template of bundle.templates || []) {
+		const criteria = MATCH_FIELDS.filter((f) => template[f]);
+		if (criteria.some((f) => template[f] !== values[f])) continue;
+		const key = [criteria.length, template.priority || 0];
+		if (!bestKey || key[0] > bestKey[0] || (key[0] === bestKey[0] && key[1] > bestKey[1])) {
+			best = template;
+			bestKey = key;
+		}
+	}
+	return best ? best.items : bundle.standard || [];
+}
+
+/** Checklist rows for a vehicle; the vehicle is only looked up when some template could depend on it. */
+export async function checklistForVehicle(vehicleName, loadVehicle) {
+	const bundle = await getChecklistBundle();
+	if (!vehicleName || !(bundle.templates || []).length) return bundle.standard || [];
+	if (!vehicleCache.has(vehicleName)) {
+		vehicleCache.set(vehicleName, loadVehicle(vehicleName).catch(() => null));
+	}
+	return selectChecklist(bundle, await vehicleCache.get(vehicleName));
+}
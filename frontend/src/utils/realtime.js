@@ -0,0 +1,68 @@
+/**
+ * Frappe realtime (socket.io) for the portal.
+ * The client script is served by the site's socketio server, so it is loaded on demand instead of bundled.
+ */
+let socketPromise = null;
+const handlers = new Map();
+
+function socketHost() {
+	const port = window?.frappe?.boot?.socketio_port;
+	const { protocol, hostname, host } = window.location;
+	// Behind nginx the socket shares the site origin; in development it listens on its own port.
+	if (import.meta.env.DEV && port) return `${protocol}//${hostname}:${port}`;
+	return `${protocol}//${host}`;
+}
+
+function loadClient(host) {
+	if (window.io) return Promise.resolve(window.io);
+	return new Promise((resolve, reject) => {
+		const script = document.createElement("script");
+		script.src = `${host}/socket.io/socket.io.js`;
+		script.async = true;
+		script.onload = () => (window.io ? resolve(window.io) : reject(new Error("socket.io unavailable")));
+		script.onerror = () => reject(new Error("socket.io unavailable"));
+		document.head.appendChild(script);
+	});
+}
+
+function connect() {
+	if (!socketPromise) {
+		const host = socketHost();
+		const site = window?.frappe?.boot?.sitename;
+		socketPromise = loadClient(host)
+			.then((io) => {
+				const socket = io(site ? `${host}/${site}` : host, { withCredentials: true });
+				for (const [event, set] of handlers) {
+					socket.on(event, (data) => set.forEach((fn) => fn(data)));
+				}
+				return socket;
+			})
+			.catch(() => {
+				socketPromise = null;
+				return null;
+			});
+	}
+	return socketPromise;
+}
+
+/** Subscribe to a realtime event; returns an unsubscribe function. Fails silently when no socket is available. */
+export function onRealtime(event, handler) {
+	let set = handlers.get(event);
+	const isNew = !set;
+	if (isNew) {
+		set = new Set();
+		handlers.set(event, set);
+	}
+	set.add(handler);
+	const pending = connect();
+	if (isNew) {
+		pending.then((socket) => {
+			if (socket && !socket.hasListeners(event)) {
+				socket.on(event, (data) => handlers.get(event)?.forEach((fn) => fn(data)));
+			}
+		});
+	}
+	return () => {
+		handlers.get(event)?.delete(handler);
+	};
+}
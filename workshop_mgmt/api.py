@@ -3,6 +3,7 @@
 
 import frappe
 from frappe import _
+from frappe.utils import cint, cstr, flt, get_datetime
 
 JOB_CARD_ALLOWED_STATUSES = (
 	"Draft",
@@ -18,65 +19,34 @@ JOB_CARD_ALLOWED_STATUSES = (
 )
 
 
-def _job_card_workflow_path_to_status(name, target_status):
+def _job_card_workflow_path_to_status(name, target_status, doc=None):
 	"""Return a list of workflow action names to reach target_status, or None if unreachable."""
-	from collections import deque
+	from workshop_mgmt.workshop_management.workflow_graph import path_to_status
 
-	from frappe.model.workflow import (
-		get_workflow,
-		get_workflow_name,
-		has_approval_access,
-		is_transition_condition_satisfied,
-	)
+	return path_to_status(doc or frappe.get_doc("Job Card", name), target_status)
 
-	if not get_workflow_name("Job Card"):
-		return None
-
-	workflow = get_workflow("Job Card")
-	field = workflow.workflow_state_field
-	base = frappe.get_doc("Job Card", name)
-	base.load_from_db()
-	start = base.get(field)
-	if not start and workflow.states:
-		start = workflow.states[0].state
-	if not start:
-		return None
-	if start == target_status:
-		return []
-
-	roles = frappe.get_roles()
-	user = frappe.session.user
-	queue = deque([(start, [])])
-	visited = {start}
-
-	while queue:
-		state, path = queue.popleft()
-		eval_doc = frappe.get_doc("Job Card", name)
-		eval_doc.load_from_db()
-		eval_doc.set(field, state)
-
-		for tr in workflow.transitions:
-			if tr.state != state or tr.allowed not in roles:
-				continue
-			trans_dict = tr.as_dict()
-			if not is_transition_condition_satisfied(tr, eval_doc):
-				continue
-			if not has_approval_access(user, eval_doc, trans_dict):
-				continue
-			next_state = tr.next_state
-			new_path = path + [tr.action]
-			if next_state == target_status:
-				return new_path
-			if next_state not in visited:
-				visited.add(next_state)
-				queue.append((next_state, new_path))
-
-	return None
+
+def _apply_job_card_actions(name, actions, fast_forward=True, doc=None):
+	"""Apply workflow actions to a Job Card: in one save when fast_forward (and the path allows it),
+	otherwise through apply_workflow one action at a time."""
+	from frappe.model.workflow import apply_workflow
+
+	if fast_forward and len(actions) > 1:
+		from workshop_mgmt.workshop_management.workflow_graph import fast_forward as _fast_forward
+
+		if _fast_forward(doc or frappe.get_doc("Job Card", name), actions):
+			return
+	for action in actions:
+		apply_workflow({"doctype": "Job Card", "name": name}, action)
 
 
 @frappe.whitelist()
-def job_card_set_status(name, status):
-	"""Move Job Card to the given status (shortest workflow path), or set directly when no workflow."""
+def job_card_set_status(name, status, fast_forward=1):
+	"""Move Job Card to the given status (shortest workflow path), or set directly when no workflow.
+
+	With fast_forward (default) a multi-step path is checked hop by hop and saved once, with one workflow
+	comment per hop; pass fast_forward=0 for one apply_workflow save per action.
+	"""
 	status = (status or "").strip()
 	if status not in JOB_CARD_ALLOWED_STATUSES:
 		frappe.throw(_("Invalid status."), title=_("Job Card"))
@@ -84,7 +54,7 @@ def job_card_set_status(name, status):
 	doc = frappe.get_doc("Job Card", name)
 	doc.check_permission("write")
 
-	from frappe.model.workflow import apply_workflow, get_workflow_name
+	from frappe.model.workflow import get_workflow_name
 
 	if doc.status == status:
 		return {"name": doc.name, "status": doc.status}
@@ -94,7 +64,7 @@ def job_card_set_status(name, status):
 		doc.save()
 		return {"name": doc.name, "status": doc.status}
 
-	actions = _job_card_workflow_path_to_status(name, status)
+	actions = _job_card_workflow_path_to_status(name, status, doc)
 	if not actions:
 		frappe.throw(
 			_("No allowed workflow path from {0} to {1}.").format(
@@ -104,13 +74,130 @@ def job_card_set_status(name, status):
 			title=_("Job Card"),
 		)
 
-	for action in actions:
-		apply_workflow({"doctype": "Job Card", "name": name}, action)
+	_apply_job_card_actions(name, actions, cint(fast_forward), doc)
 
 	doc = frappe.get_doc("Job Card", name)
 	return {"name": doc.name, "status": doc.status}
 
 
+JOB_CARD_BULK_STATUS_LIMIT = 500
+# Transitions are committed every chunk, so a long batch neither holds row locks nor loses finished work.
+_BULK_STATUS_CHUNK = 20
+
+
+def _bulk_status_items(items):
+	"""Parse [{"name", "status"}, ...] into ordered (name, status) pairs, last entry per card winning."""
+	items = frappe.parse_json(items) if isinstance(items, str) else items
+	if not isinstance(items, list):
+		frappe.throw(_("items must be a list of {name, status}."), title=_("Job Card"))
+	pairs = {}
+	for item in items:
+		if not isinstance(item, dict) or not item.get("name"):
+			frappe.throw(_("Each item needs a Job Card name and a status."), title=_("Job Card"))
+		status = (item.get("status") or "").strip()
+		if status not in JOB_CARD_ALLOWED_STATUSES:
+			frappe.throw(_("Invalid status {0} for {1}.").format(status, item["name"]), title=_("Job Card"))
+		pairs.pop(item["name"], None)
+		pairs[item["name"]] = status
+	if len(pairs) > JOB_CARD_BULK_STATUS_LIMIT:
+		frappe.throw(
+			_("At most {0} Job Cards can be moved at once.").format(JOB_CARD_BULK_STATUS_LIMIT),
+			title=_("Job Card"),
+		)
+	return list(pairs.items())
+
+
+@frappe.whitelist()
+def job_card_bulk_set_status(items, fast_forward=1):
+	"""Move many Job Cards, each to its own status, e.g. a multi-select kanban drop.
+
+	items: [{"name": "JC-...", "status": "In Progress"}, ...]. Cards are grouped by (current state, target)
+	so each workflow path is resolved once; only groups whose path has conditional hops fall back to a
+	per-card search. Every card is applied under its own savepoint and the batch commits every
+	_BULK_STATUS_CHUNK cards, so a failing card is reported in its result instead of aborting the rest.
+	Multi-step paths are applied in a single save per card unless fast_forward=0.
+	"""
+	from workshop_mgmt.workshop_management import link_sync
+	from workshop_mgmt.workshop_management.link_cache import clear as clear_link_headers
+	from workshop_mgmt.workshop_management.workflow_graph import (
+		get_compiled_graph,
+		path_to_status,
+		shared_path,
+	)
+
+	pairs = _bulk_status_items(items)
+	graph = get_compiled_graph("Job Card")
+	state_field = graph["state_field"] if graph else "status"
+	fields = list({"name", "owner", "status", state_field})
+	current = {
+		r.name: r
+		for r in frappe.get_all("Job Card", filters={"name": ["in", [n for n, _s in pairs]]}, fields=fields)
+	}
+	user = frappe.session.user
+
+	group_paths = {}
+	planned = []
+	results = []
+	for name, status in pairs:
+		row = current.get(name)
+		result = {"name": name, "from": row.status if row else None, "status": status, "ok": False}
+		results.append(result)
+		if not row:
+			result["error"] = _("Job Card not found.")
+			continue
+		if not frappe.has_permission("Job Card", "write", name):
+			result["error"] = _("Not permitted to change this Job Card.")
+			continue
+		if row.status == status:
+			result.update(ok=True, actions=[])
+			continue
+		if not graph:
+			planned.append((result, None))
+			continue
+
+		start = row.get(state_field) or graph["initial"]
+		owner_blocked = user != "Administrator" and user == row.owner
+		key = (start, status, owner_blocked)
+		if key not in group_paths:
+			reachable = start and status in graph["paths"].get(start, {})
+			group_paths[key] = shared_path(graph, start, status, owner_blocked) if reachable else False
+		actions = group_paths[key]
+		if actions is None:
+			actions = path_to_status(frappe.get_doc("Job Card", name), status, user)
+		if not actions:
+			result["error"] = _("No allowed workflow path from {0} to {1}.").format(
+				row.status or _("(empty)"), status
+			)
+			continue
+		planned.append((result, actions))
+
+	for offset in range(0, len(planned), _BULK_STATUS_CHUNK):
+		for result, actions in planned[offset : offset + _BULK_STATUS_CHUNK]:
+			# Queued back-link writes of earlier cards must not be dropped by this card's rollback.
+			link_sync.flush()
+			frappe.db.savepoint("job_card_bulk_status")
+			try:
+				if actions is None:
+					doc = frappe.get_doc("Job Card", result["name"])
+					doc.status = result["status"]
+					doc.save()
+				else:
+					_apply_job_card_actions(result["name"], actions, cint(fast_forward))
+			except Exception as e:
+				frappe.db.rollback(save_point="job_card_bulk_status")
+				link_sync.discard()
+				clear_link_headers()
+				frappe.clear_messages()
+				result["error"] = frappe.utils.strip_html(str(e)) or _("Status change failed.")
+			else:
+				result.update(ok=True, actions=actions or [])
+		frappe.db.commit()
+
+	moved = sum(1 for r in results if r["ok"] and r["from"] != r["status"])
+	failed = sum(1 for r in results if not r["ok"])
+	return {"results": results, "moved": moved, "failed": failed}
+
+
 @frappe.whitelist()
 def get_dashboard_data(filters=None):
     """Deprecated endpoint kept for compatibility."""
@@ -137,6 +224,29 @@ def create_job_card_from_inspection(
     return _create(inspection, company, warehouse, populate_from_recommendations)
 
 
+@frappe.whitelist()
+def create_job_cards_from_inspections(
+    inspections,
+    company,
+    warehouse,
+    populate_from_recommendations=1,
+):
+    """Queue Job Cards for many inspections with one company/warehouse; poll job_card_conversion_status."""
+    from workshop_mgmt.workshop_management.vehicle_inspection_jobs import (
+        create_job_cards_from_inspections as _create,
+    )
+
+    return _create(inspections, company, warehouse, populate_from_recommendations)
+
+
+@frappe.whitelist()
+def job_card_conversion_status(conversion_id):
+    """Per-inspection results of create_job_cards_from_inspections (also pushed as workshop_inspection_conversion)."""
+    from workshop_mgmt.workshop_management.vehicle_inspection_jobs import get_conversion_status
+
+    return get_conversion_status(conversion_id)
+
+
 @frappe.whitelist()
 def appointment_check_in(name):
     """Set status to Checked-In (same as desk Check In)."""
@@ -238,71 +348,137 @@ def job_card_create_quotation(name):
     return doc.create_quotation()
 
 
-@frappe.whitelist()
-def job_card_update_line_items(name, service_items=None, part_items=None):
-    """Update Job Card service/part lines from portal mechanic UI."""
-    doc = frappe.get_doc("Job Card", name)
-    doc.check_permission("write")
+_LINE_ITEM_TABLES = {
+    "service_items": ("Job Card Service Item", ("item_code", "qty", "rate")),
+    "part_items": ("Job Card Part Item", ("item_code", "qty", "rate", "warehouse")),
+}
 
-    service_items = frappe.parse_json(service_items) or []
-    part_items = frappe.parse_json(part_items) or []
 
+def _normalize_line_item(row, fields, rates):
     def _num(v, default=0.0):
         try:
             return float(v)
         except Exception:
             return default
 
-    normalized_service = []
-    for row in service_items:
-        item_code = (row.get("item_code") or "").strip()
-        if not item_code:
-            continue
-        qty = _num(row.get("qty"), 1.0)
+    item_code = (row.get("item_code") or "").strip()
+    if not item_code:
+        return None
+    qty = _num(row.get("qty"), 1.0)
+    # A line sent without a rate takes the customer's price list rate
+    if row.get("rate") in (None, ""):
+        rate = rates.get(item_code, 0.0)
+    else:
         rate = _num(row.get("rate"), 0.0)
-        normalized_service.append(
-            {
-                "doctype": "Job Card Service Item",
-                "item_code": item_code,
-                "qty": qty if qty > 0 else 1.0,
-                "rate": rate if rate >= 0 else 0.0,
-            }
-        )
+    out = {
+        "item_code": item_code,
+        "qty": qty if qty > 0 else 1.0,
+        "rate": rate if rate >= 0 else 0.0,
+    }
+    if "warehouse" in fields:
+        out["warehouse"] = (row.get("warehouse") or "").strip() or None
+    return out
+
+
+def _line_value_changed(field, old, new):
+    # Stored rows hold None / "" and 0 / None interchangeably; only a real difference counts.
+    if field in ("qty", "rate"):
+        return flt(old) != flt(new)
+    return cstr(old) != cstr(new)
+
 
-    normalized_parts = []
-    for row in part_items:
-        item_code = (row.get("item_code") or "").strip()
-        if not item_code:
+def _diff_line_items(doc, table, incoming, rates):
+    """Apply incoming rows to one child table in place; return (changed rows, deleted row names).
+
+    Rows carrying a child `name` update that row, rows without one are inserted (their `client_id` is
+    echoed back so the client can adopt the new name), and existing rows missing from incoming are
+    deleted. Untouched rows keep their name, so the save and its Version diff only cover real edits.
+    """
+    doctype, fields = _LINE_ITEM_TABLES[table]
+    existing = {row.name: row for row in doc.get(table)}
+    rows, changed, seen = [], [], set()
+    for raw in incoming:
+        values = _normalize_line_item(raw, fields, rates)
+        if values is None:
             continue
-        qty = _num(row.get("qty"), 1.0)
-        rate = _num(row.get("rate"), 0.0)
-        out = {
-            "doctype": "Job Card Part Item",
-            "item_code": item_code,
-            "qty": qty if qty > 0 else 1.0,
-            "rate": rate if rate >= 0 else 0.0,
-        }
-        warehouse = (row.get("warehouse") or "").strip()
-        if warehouse:
-            out["warehouse"] = warehouse
-        normalized_parts.append(out)
-
-    doc.set("service_items", [])
-    for row in normalized_service:
-        doc.append("service_items", row)
-
-    doc.set("part_items", [])
-    for row in normalized_parts:
-        doc.append("part_items", row)
+        row_name = raw.get("name")
+        if row_name:
+            row = existing.get(row_name)
+            if row is None:
+                frappe.throw(_("Row {0} is not a {1} of Job Card {2}.").format(row_name, doctype, doc.name))
+            if row_name in seen:
+                frappe.throw(_("Row {0} was sent more than once.").format(row_name))
+            seen.add(row_name)
+            if any(_line_value_changed(f, row.get(f), v) for f, v in values.items()):
+                row.update(values)
+                changed.append((row, None))
+        else:
+            row = doc.append(table, values)
+            changed.append((row, raw.get("client_id")))
+        rows.append(row)
+
+    deleted = [row_name for row_name in existing if row_name not in seen]
+    if [id(row) for row in doc.get(table)] != [id(row) for row in rows]:
+        doc.set(table, rows)
+        for idx, row in enumerate(rows, start=1):
+            row.idx = idx
+    return changed, deleted
 
-    doc.save()
 
-    return {
-        "name": doc.name,
-        "status": doc.status,
-        "service_items": doc.get("service_items"),
-        "part_items": doc.get("part_items"),
+@frappe.whitelist()
+def job_card_update_line_items(name, service_items=None, part_items=None, modified=None):
+    """Update Job Card service/part lines from portal mechanic UI, touching only the rows that changed.
+
+    Lines sent without a rate are priced from the customer's price list. A table that is not passed is
+    left alone. When modified (the Job Card's timestamp the client last
+    loaded) is given and the card has been saved since, the edit is rejected. Returns the new modified
+    and, per table, the updated / inserted rows and the names of deleted rows.
+    """
+    doc = frappe.get_doc("Job Card", name)
+    doc.check_permission("write")
+
+    if modified and get_datetime(modified) != get_datetime(doc.modified):
+        frappe.throw(
+            _("Job Card {0} was changed by someone else. Reload it and apply your edit again.").format(doc.name),
+            frappe.TimestampMismatchError,
+        )
+
+    from workshop_mgmt.workshop_management.pricing import get_job_card_rates
+
+    tables = {
+        table: frappe.parse_json(incoming) or []
+        for table, incoming in (("service_items", service_items), ("part_items", part_items))
+        if incoming is not None
     }
+    rates = get_job_card_rates(
+        doc,
+        [
+            (row.get("item_code") or "").strip()
+            for rows in tables.values()
+            for row in rows
+            if row.get("rate") in (None, "")
+        ],
+    )
+
+    result = {}
+    for table, incoming in tables.items():
+        changed, deleted = _diff_line_items(doc, table, incoming, rates)
+        if changed or deleted:
+            result[table] = (changed, deleted)
+
+    if result:
+        doc.save()
+
+    out = {"name": doc.name, "status": doc.status, "modified": doc.modified}
+    for table, (changed, deleted) in result.items():
+        rows = []
+        for row, client_id in changed:
+            data = row.as_dict()
+            if client_id:
+                data["client_id"] = client_id
+            rows.append(data)
+        out[table] = {"changed": rows, "deleted": deleted}
+    return out
 
 
 @frappe.whitelist()
@@ -312,6 +488,22 @@ def job_card_create_sales_invoice(name):
     return doc.create_sales_invoice()
 
 
+@frappe.whitelist()
+def job_card_enqueue_sales_invoice(name):
+    """Queue Sales Invoice creation in the background; poll job_card_invoice_status or listen for workshop_invoice."""
+    from workshop_mgmt.workshop_management.invoicing import enqueue_sales_invoice
+
+    return enqueue_sales_invoice(name)
+
+
+@frappe.whitelist()
+def job_card_invoice_status(name):
+    """Status of the queued invoice run for a Job Card (queued / running / done / failed / none)."""
+    from workshop_mgmt.workshop_management.invoicing import get_invoice_job_status
+
+    return get_invoice_job_status(name)
+
+
 
 
 
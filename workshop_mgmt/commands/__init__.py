@@ -0,0 +1,105 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+"""bench commands for workshop_mgmt (bench --site <site> <command>)."""
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-workshop-metrics")
+@click.option("--from-date", help="First day to recompute (default: earliest source row)")
+@click.option("--to-date", help="Last day to recompute (default: latest source row)")
+@click.option("--company", help="Only recompute rows for this company")
+@pass_context
+def rebuild_workshop_metrics(context, from_date=None, to_date=None, company=None):
+	"""Backfill or repair the garage dashboard daily rollup (Workshop Metric Rollup)."""
+	from workshop_mgmt.workshop_management.dashboard_rollup import rebuild_metric_rollup
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		summary = rebuild_metric_rollup(from_date=from_date, to_date=to_date, company=company)
+		for metric, rows in summary.items():
+			click.echo(f"{metric}: {rows} rows")
+	finally:
+		frappe.destroy()
+
+
+@click.command("check-workshop-query-plans")
+@click.option("--seed-rows", type=int, default=0, help="Seed this many synthetic rows first (developer mode)")
+@click.option("--purge", is_flag=True, default=False, help="Remove the synthetic rows afterwards")
+@pass_context
+def check_workshop_query_plans(context, seed_rows=0, purge=False):
+	"""EXPLAIN the indexed workshop queries and fail on any full table scan."""
+	from workshop_mgmt.workshop_management.index_manager import (
+		check_query_plans,
+		ensure_workshop_indexes,
+		purge_explain_dataset,
+		seed_explain_dataset,
+	)
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	failed = False
+	try:
+		ensure_workshop_indexes()
+		if seed_rows:
+			seed_explain_dataset(seed_rows)
+		for result in check_query_plans(raise_on_full_scan=False):
+			status = "FULL SCAN" if result["full_scan"] else "ok"
+			keys = ", ".join(str(p["key"]) for p in result["plan"])
+			click.echo(f"[{status}] {result['query']} (key: {keys})")
+			failed = failed or result["full_scan"]
+		if purge:
+			purge_explain_dataset()
+	finally:
+		frappe.destroy()
+	if failed:
+		raise SystemExit(1)
+
+
+@click.command("benchmark-job-card-workflow")
+@click.option("--job-card", help="Job Card to resolve paths for (default: most recently modified)")
+@click.option("--iterations", type=int, default=20, help="Resolutions per workflow state")
+@pass_context
+def benchmark_job_card_workflow(context, job_card=None, iterations=20):
+	"""Compare Job Card workflow path resolution, uncompiled search vs compiled graph."""
+	from workshop_mgmt.workshop_management.workflow_graph import benchmark_path_resolution
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		result = benchmark_path_resolution(job_card=job_card, iterations=iterations)
+		for key, value in result.items():
+			click.echo(f"{key}: {value}")
+	finally:
+		frappe.destroy()
+
+
+@click.command("sync-workshop-links")
+@pass_context
+def sync_workshop_links(context):
+	"""Repair Service Appointment / Vehicle Inspection back-links in bulk (after imports or data fixes)."""
+	from workshop_mgmt.workshop_management.link_sync import resync_links
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		for link, rows in resync_links().items():
+			click.echo(f"{link}: {rows} rows updated")
+	finally:
+		frappe.destroy()
+
+
+commands = [
+	rebuild_workshop_metrics,
+	check_workshop_query_plans,
+	benchmark_job_card_workflow,
+	sync_workshop_links,
+]
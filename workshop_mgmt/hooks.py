@@ -159,6 +159,69 @@ boot_session = "workshop_mgmt.startup.boot_session"
 # 	}
 # }
 
+doc_events = {
+	"Sales Invoice": {
+		"on_submit": "workshop_mgmt.workshop_management.dashboard_events.on_sales_invoice_change",
+		"on_cancel": "workshop_mgmt.workshop_management.dashboard_events.on_sales_invoice_change",
+	},
+	"Payment Entry": {
+		"on_submit": "workshop_mgmt.workshop_management.dashboard_events.on_payment_entry_change",
+		"on_cancel": "workshop_mgmt.workshop_management.dashboard_events.on_payment_entry_change",
+	},
+	"Job Card": {
+		"on_update": [
+			"workshop_mgmt.workshop_management.link_cache.forget",
+			"workshop_mgmt.workshop_management.stock_availability.sync_reservations",
+		],
+		"on_change": "workshop_mgmt.workshop_management.dashboard_events.on_job_card_change",
+		"on_trash": [
+			"workshop_mgmt.workshop_management.link_cache.forget",
+			"workshop_mgmt.workshop_management.stock_availability.sync_reservations",
+		],
+		"after_delete": "workshop_mgmt.workshop_management.dashboard_events.on_job_card_change",
+	},
+	"Service Appointment": {
+		"on_update": "workshop_mgmt.workshop_management.link_cache.forget",
+		# on_change also fires for db_set status moves (check-in, cancel), which change slot capacity
+		"on_change": [
+			"workshop_mgmt.workshop_management.dashboard_events.on_service_appointment_change",
+			"workshop_mgmt.workshop_management.slot_availability.invalidate_appointment_days",
+		],
+		"on_trash": [
+			"workshop_mgmt.workshop_management.link_cache.forget",
+			"workshop_mgmt.workshop_management.slot_availability.invalidate_appointment_days",
+		],
+		"after_delete": "workshop_mgmt.workshop_management.dashboard_events.on_service_appointment_change",
+	},
+	"Vehicle": {
+		"on_update": "workshop_mgmt.workshop_management.link_cache.forget",
+		"on_trash": "workshop_mgmt.workshop_management.link_cache.forget",
+	},
+	"Vehicle Inspection": {
+		"on_update": "workshop_mgmt.workshop_management.link_cache.forget",
+		"on_trash": "workshop_mgmt.workshop_management.link_cache.forget",
+	},
+	"Item Price": {
+		"on_update": "workshop_mgmt.workshop_management.pricing.invalidate_item_price",
+		"on_trash": "workshop_mgmt.workshop_management.pricing.invalidate_item_price",
+	},
+	"Item": {
+		"on_update": "workshop_mgmt.workshop_management.pricing.invalidate_item",
+	},
+	"BOM": {
+		"on_submit": "workshop_mgmt.workshop_management.bom_index.invalidate_bom",
+		"on_cancel": "workshop_mgmt.workshop_management.bom_index.invalidate_bom",
+		"on_update_after_submit": "workshop_mgmt.workshop_management.bom_index.invalidate_bom",
+	},
+	"BOM Update Log": {
+		"on_change": "workshop_mgmt.workshop_management.bom_index.on_bom_update_log_change",
+	},
+	"Workflow": {
+		"on_update": "workshop_mgmt.workshop_management.workflow_graph.invalidate_workflow_graph",
+		"on_trash": "workshop_mgmt.workshop_management.workflow_graph.invalidate_workflow_graph",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -180,6 +243,12 @@ boot_session = "workshop_mgmt.startup.boot_session"
 # 	],
 # }
 
+scheduler_events = {
+	"hourly_long": [
+		"workshop_mgmt.workshop_management.status_sweeper.sweep_statuses",
+	],
+}
+
 # Testing
 # -------
 
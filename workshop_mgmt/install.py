@@ -5,7 +5,9 @@ import frappe
 from frappe.permissions import add_permission
 
 from workshop_mgmt.permission_utils import WORKSHOP_CUSTOMER_ROLE
+from workshop_mgmt.workshop_management.dashboard_rollup import ensure_metric_rollup
 from workshop_mgmt.workshop_management.demo.seed_demo_items import seed_demo_workshop_items
+from workshop_mgmt.workshop_management.index_manager import ensure_workshop_indexes
 
 
 def after_install():
@@ -13,6 +15,7 @@ def after_install():
 	_remove_legacy_garage_dashboard()
 	ensure_workshop_job_card_workflow()
 	_seed_demo_items_safe()
+	ensure_metric_rollup()
 
 
 def after_migrate():
@@ -20,6 +23,8 @@ def after_migrate():
 	_remove_legacy_garage_dashboard()
 	ensure_workshop_job_card_workflow()
 	_seed_demo_items_safe()
+	ensure_workshop_indexes()
+	ensure_metric_rollup()
 
 
 def _seed_demo_items_safe():
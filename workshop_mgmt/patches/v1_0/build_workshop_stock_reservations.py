@@ -0,0 +1,11 @@
+# Copyright (c) 2026, Infoney and contributors
+"""Build the Workshop Stock Reservation ledger from the part rows of open Job Cards."""
+
+import frappe
+
+from workshop_mgmt.workshop_management.stock_availability import RESERVATION_DOCTYPE, rebuild_reservations
+
+
+def execute():
+	if frappe.db.table_exists(RESERVATION_DOCTYPE):
+		rebuild_reservations()
@@ -0,0 +1,37 @@
+# Copyright (c) 2026, Infoney and contributors
+"""Backfill Service Appointment.company (from the linked Job Card, else the default company) and rebuild
+appointment rollup rows, which were stored without a company."""
+
+import frappe
+
+from workshop_mgmt.workshop_management.dashboard_rollup import (
+	METRIC_APPOINTMENT_STATUS,
+	ROLLUP_DOCTYPE,
+	rebuild_metric_rollup,
+)
+
+
+def execute():
+	if not frappe.db.has_column("Service Appointment", "company"):
+		return
+
+	frappe.db.sql(
+		"""
+		update `tabService Appointment` sa
+		inner join `tabJob Card` jc on jc.name = sa.job_card
+		set sa.company = jc.company
+		where ifnull(sa.company, '') = '' and ifnull(jc.company, '') != ''
+		"""
+	)
+	default_company = frappe.defaults.get_global_default("company")
+	if default_company:
+		frappe.db.sql(
+			"update `tabService Appointment` set company = %s where ifnull(company, '') = ''",
+			(default_company,),
+		)
+	frappe.db.commit()
+
+	if frappe.db.table_exists(ROLLUP_DOCTYPE):
+		# Start the metric over: rows stored under company '' would otherwise stay next to the rebuilt ones.
+		frappe.db.delete(ROLLUP_DOCTYPE, {"metric": METRIC_APPOINTMENT_STATUS})
+		rebuild_metric_rollup(metrics=[METRIC_APPOINTMENT_STATUS])
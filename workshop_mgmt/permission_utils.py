@@ -4,10 +4,14 @@
 """Row-level access helpers for Workshop Customer users (User Permissions on Customer)."""
 
 import frappe
+from frappe import _
 from frappe.core.doctype.user_permission.user_permission import get_user_permissions
 
 WORKSHOP_CUSTOMER_ROLE = "Workshop Customer"
 
+# "My branches" is resolved once per login session; User Permission changes apply from the next login.
+BRANCH_CACHE_SECONDS = 6 * 60 * 60
+
 
 def is_workshop_portal_user(user: str | None = None) -> bool:
 	"""True for desk users who should only see their own Customer's workshop data.
@@ -39,6 +43,37 @@ def get_allowed_customer_names(user: str | None = None) -> list[str] | None:
 	return [c.doc for c in customers]
 
 
+def get_branch_companies() -> list[str] | None:
+	"""Companies the session user is limited to by Company User Permissions ("my branches").
+
+	Return None when the user has no Company restriction (all companies).
+	"""
+	key = f"workshop_branch_companies:{frappe.session.sid}"
+	cache = frappe.cache()
+	cached = cache.get_value(key, expires=True)
+	if cached is not None:
+		return cached["companies"]
+	perms = get_user_permissions(frappe.session.user).get("Company") or []
+	companies = sorted({p.doc for p in perms}) or None
+	cache.set_value(key, {"companies": companies}, expires_in_sec=BRANCH_CACHE_SECONDS)
+	return companies
+
+
+def resolve_company_scope(company: str | None = None) -> tuple[str, ...] | None:
+	"""Companies a dashboard / report read is partitioned to: the requested one, else the user's branches.
+
+	Return None for all companies. Throw if the requested company is outside the user's branches.
+	"""
+	branches = get_branch_companies()
+	if company:
+		if branches is not None and company not in branches:
+			frappe.throw(
+				_("You are not permitted to view data of Company {0}").format(company), frappe.PermissionError
+			)
+		return (company,)
+	return tuple(branches) if branches else None
+
+
 def merge_customer_filters(doctype: str, filters: dict | None) -> dict | None:
 	"""Narrow filters by allowed customers for portal users. Returns None if no rows may match."""
 	allowed = get_allowed_customer_names()
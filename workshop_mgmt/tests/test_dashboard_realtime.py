@@ -0,0 +1,70 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from workshop_mgmt.workshop_management import dashboard_realtime
+
+SNAPSHOT = "workshop_mgmt.workshop_management.page.garage_business_dashboard.garage_business_dashboard.build_realtime_snapshot"
+
+
+def _snapshot(companies=None):
+	return {
+		"kpis": {"open_jobs": 1},
+		"job_status": [],
+		"appointment_status": [],
+		"recent_jobs": [],
+		"upcoming_appointments": [],
+	}
+
+
+def _run_now(method, **kwargs):
+	frappe.get_attr(method)(**kwargs)
+
+
+class TestDashboardRealtime(FrappeTestCase):
+	def setUp(self):
+		cache = frappe.cache()
+		cache.delete(cache.make_key(dashboard_realtime._PENDING_KEY))
+		cache.delete_value(dashboard_realtime._PENDING_COMPANIES_KEY)
+		for company in ("", "_Test Realtime Co"):
+			cache.delete_value(f"{dashboard_realtime._LAST_SNAPSHOT_KEY}:{company}")
+
+	def test_schedule_publish_round_trip(self):
+		with (
+			patch.object(dashboard_realtime, "DEBOUNCE_SECONDS", 0),
+			patch(SNAPSHOT, side_effect=_snapshot),
+			patch("frappe.enqueue", side_effect=_run_now) as enqueue,
+			patch("frappe.publish_realtime") as publish,
+		):
+			dashboard_realtime.schedule_publish(("_Test Realtime Co",))
+
+		enqueue.assert_called_once()
+		published = [call.args[1]["company"] for call in publish.call_args_list]
+		self.assertEqual(published, [None, "_Test Realtime Co"])
+		for call in publish.call_args_list:
+			# Broadcast to the whole site, so the message carries no dashboard figures or names.
+			self.assertEqual(call.args[0], dashboard_realtime.REALTIME_EVENT)
+			self.assertEqual(set(call.args[1]), {"company", "version"})
+			self.assertFalse({"room", "user", "doctype"} & set(call.kwargs))
+		self.assertFalse(frappe.cache().smembers(dashboard_realtime._PENDING_COMPANIES_KEY))
+
+		# The flag was cleared, so the next write schedules a fresh message.
+		with patch("frappe.enqueue") as enqueue:
+			dashboard_realtime.schedule_publish(("_Test Realtime Co",))
+		enqueue.assert_called_once()
+
+	def test_unchanged_figures_send_no_signal(self):
+		with (
+			patch.object(dashboard_realtime, "DEBOUNCE_SECONDS", 0),
+			patch(SNAPSHOT, side_effect=_snapshot),
+			patch("frappe.enqueue", side_effect=_run_now),
+			patch("frappe.publish_realtime") as publish,
+		):
+			dashboard_realtime.schedule_publish(("_Test Realtime Co",))
+			publish.reset_mock()
+			dashboard_realtime.schedule_publish(("_Test Realtime Co",))
+		publish.assert_not_called()
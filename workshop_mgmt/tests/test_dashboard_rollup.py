@@ -0,0 +1,43 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from workshop_mgmt.tests.utils import make_appointment, make_job_card, make_vehicle
+from workshop_mgmt.workshop_management import dashboard_rollup
+from workshop_mgmt.workshop_management.page.garage_business_dashboard import garage_business_dashboard as dashboard
+
+
+class TestDashboardRollup(FrappeTestCase):
+	def setUp(self):
+		cache = frappe.cache()
+		cache.delete_value(dashboard_rollup._PENDING_REFRESH_KEY)
+		cache.delete(cache.make_key(dashboard_rollup._REFRESH_RUNNING_KEY))
+
+	def test_dashboard_shows_save_once_queued_refresh_ran(self):
+		start = add_to_date(now_datetime(), hours=1)
+		with (
+			patch.object(dashboard, "is_rollup_ready", return_value=True),
+			# Keep the test transaction open: the job commits per key, the rollback undoes it all.
+			patch.object(frappe.db, "commit"),
+			patch("frappe.enqueue"),
+		):
+			open_jobs = dashboard.get_dashboard_data(days=7)["kpis"]["open_jobs"]
+			held = dashboard.get_dashboard_sections(days=7, sections=["kpis"])["versions"]
+
+			appointment = make_appointment(
+				start, add_to_date(start, hours=1), vehicle=make_vehicle("_TEST-WS-ROLLUP")
+			)
+			make_job_card(appointment)
+			# The save's commit only queues its keys; until the job runs the cached numbers stand.
+			frappe.db.after_commit.run()
+			self.assertEqual(dashboard.get_dashboard_data(days=7)["kpis"]["open_jobs"], open_jobs)
+
+			self.assertGreater(dashboard_rollup.apply_queued_refreshes(), 0)
+			self.assertEqual(dashboard.get_dashboard_data(days=7)["kpis"]["open_jobs"], open_jobs + 1)
+			sections = dashboard.get_dashboard_sections(days=7, versions=held, sections=["kpis"])
+			self.assertEqual(sections["sections"]["kpis"]["open_jobs"], open_jobs + 1)
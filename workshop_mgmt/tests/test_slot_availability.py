@@ -0,0 +1,25 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate
+
+from workshop_mgmt.tests.utils import get_company
+from workshop_mgmt.workshop_management import slot_availability
+
+# One bay open 08:00-17:00 every day of the week.
+_RESOURCES = {"Bay": {"_Test Bay": {weekday: [(8 * 60, 17 * 60)] for weekday in range(7)}}, "Advisor": {}}
+
+
+class TestSlotAvailability(FrappeTestCase):
+	def test_days_before_today_have_no_slots(self):
+		today = getdate()
+		with patch.object(slot_availability, "get_resources", return_value=_RESOURCES):
+			days = slot_availability.free_slots(get_company(), add_days(today, -2), 4, 60, 30)
+
+		self.assertEqual([d["date"] for d in days], [str(add_days(today, i)) for i in range(-2, 2)])
+		self.assertEqual(days[0]["slots"], [])
+		self.assertEqual(days[1]["slots"], [])
+		self.assertTrue(days[3]["slots"])
@@ -0,0 +1,85 @@
+# Copyright (c) 2026, Infoney and contributors
+# Shared records for workshop tests.
+
+import frappe
+
+TEST_CUSTOMER = "_Test Workshop Customer"
+TEST_PLATE = "_TEST-WS-001"
+
+
+def get_company() -> str:
+	return frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+
+
+def make_customer(name: str = TEST_CUSTOMER) -> str:
+	if not frappe.db.exists("Customer", name):
+		frappe.get_doc(
+			{
+				"doctype": "Customer",
+				"customer_name": name,
+				"customer_type": "Individual",
+				"customer_group": frappe.db.get_value("Customer Group", {"is_group": 0}, "name"),
+				"territory": frappe.db.get_value("Territory", {"is_group": 0}, "name"),
+			}
+		).insert(ignore_permissions=True, ignore_mandatory=True)
+	return name
+
+
+def make_vehicle(license_plate: str = TEST_PLATE, customer: str | None = None) -> str:
+	name = frappe.db.get_value("Vehicle", {"license_plate": license_plate}, "name")
+	if not name:
+		name = (
+			frappe.get_doc(
+				{"doctype": "Vehicle", "license_plate": license_plate, "customer": customer or make_customer()}
+			)
+			.insert(ignore_permissions=True)
+			.name
+		)
+	return name
+
+
+def make_appointment(start: str, end: str, vehicle: str | None = None, **values):
+	return frappe.get_doc(
+		{
+			"doctype": "Service Appointment",
+			"company": get_company(),
+			"customer": make_customer(),
+			"vehicle": vehicle or make_vehicle(),
+			"scheduled_start": start,
+			"scheduled_end": end,
+			"status": "Scheduled",
+			**values,
+		}
+	).insert(ignore_permissions=True)
+
+
+def make_inspection(appointment) -> str:
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Vehicle Inspection",
+				"inspection_date": appointment.scheduled_start,
+				"customer": appointment.customer,
+				"vehicle": appointment.vehicle,
+				"appointment": appointment.name,
+			}
+		)
+		.insert(ignore_permissions=True)
+		.name
+	)
+
+
+def make_job_card(appointment, inspection: str | None = None):
+	company = appointment.company
+	return frappe.get_doc(
+		{
+			"doctype": "Job Card",
+			"company": company,
+			"customer": appointment.customer,
+			"vehicle": appointment.vehicle,
+			"appointment": appointment.name,
+			"inspection": inspection,
+			"posting_date": frappe.utils.getdate(appointment.scheduled_start),
+			"warehouse": frappe.db.get_value("Warehouse", {"company": company, "is_group": 0}, "name"),
+		}
+	).insert(ignore_permissions=True)
@@ -0,0 +1,175 @@
+# Copyright (c) 2026, Infoney and contributors
+# Double-booking checks for Service Appointments: one indexed range query per save, a sweep for whole schedules.
+
+from __future__ import annotations
+
+import heapq
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime
+
+from workshop_mgmt.workshop_management.slot_availability import FREE_STATUSES
+
+# Fields that must not be booked twice at the same time; each has a (field, scheduled_start) index.
+RESOURCE_FIELDS = ("vehicle", "service_advisor", "bay")
+SCHEDULE_FIELDS = ("scheduled_start", "scheduled_end", *RESOURCE_FIELDS)
+
+
+def find_overlaps(start, end, values: dict, exclude: str | None = None) -> list[dict]:
+	"""Booked appointments sharing a vehicle / advisor / bay with values and overlapping [start, end).
+
+	One statement: a UNION ALL branch per set field, each an equality plus `scheduled_start < end`
+	range on that field's index, with `scheduled_end > start` checked on the rows it returns.
+	"""
+	fields = [f for f in RESOURCE_FIELDS if values.get(f)]
+	if not fields or not (start and end):
+		return []
+	branches = [
+		f"""
+		(select %(field_{field})s as field, name, {field} as value, scheduled_start, scheduled_end
+		from `tabService Appointment`
+		where {field} = %(value_{field})s
+			and scheduled_start < %(end)s and scheduled_end > %(start)s
+			and status not in %(free)s and name != %(exclude)s
+		order by scheduled_start
+		limit 5)
+		"""
+		for field in fields
+	]
+	params = {
+		"start": get_datetime(start),
+		"end": get_datetime(end),
+		"free": FREE_STATUSES,
+		"exclude": exclude or "",
+	}
+	for field in fields:
+		params[f"field_{field}"] = field
+		params[f"value_{field}"] = values[field]
+	return frappe.db.sql(" union all ".join(branches), params, as_dict=True)
+
+
+def validate_appointment_overlap(doc) -> None:
+	"""Service Appointment validate: refuse a booking that double-books its vehicle, advisor or bay.
+
+	Runs only when the appointment holds capacity and is new, was moved, changed resources or takes
+	capacity again (e.g. Cancelled -> Scheduled), so status updates on older (already overlapping)
+	records, such as check-in or completion, still save.
+	"""
+	if doc.status in FREE_STATUSES or not (doc.scheduled_start and doc.scheduled_end):
+		return
+	if not doc.is_new() and not _needs_overlap_check(doc):
+		return
+	overlaps = find_overlaps(
+		doc.scheduled_start, doc.scheduled_end, {f: doc.get(f) for f in RESOURCE_FIELDS}, exclude=doc.name
+	)
+	if not overlaps:
+		return
+	lines = [
+		_("{0} {1} is already booked by {2} ({3} to {4})").format(
+			_(doc.meta.get_label(r.field)), r.value, r.name, r.scheduled_start, r.scheduled_end
+		)
+		for r in overlaps
+	]
+	frappe.throw("<br>".join(lines), title=_("Double Booking"))
+
+
+def _needs_overlap_check(doc) -> bool:
+	if any(doc.has_value_changed(f) for f in SCHEDULE_FIELDS):
+		return True
+	before = doc.get_doc_before_save()
+	return bool(before and before.status in FREE_STATUSES)
+
+
+def _sweep(intervals: list[tuple]) -> list[tuple]:
+	"""Overlapping pairs among (start, end, key) intervals of one resource: sort by start and keep the
+	bookings still running in a heap by end, so each start is compared only with those."""
+	pairs = []
+	running: list[tuple] = []
+	ordered = sorted(intervals, key=lambda i: (i[0], i[1]))
+	for seq, (start, end, key) in enumerate(ordered):
+		while running and running[0][0] <= start:
+			heapq.heappop(running)
+		pairs.extend((other, key) for _end, _seq, other in running)
+		heapq.heappush(running, (end, seq, key))
+	return pairs
+
+
+def _existing_bookings(rows: list[dict]) -> list[dict]:
+	"""Booked appointments over the schedule's whole range that share one of its resources (one query)."""
+	clauses, params = [], {"free": FREE_STATUSES}
+	for field in RESOURCE_FIELDS:
+		values = {r[field] for r in rows if r.get(field)}
+		if values:
+			clauses.append(f"{field} in %({field})s")
+			params[field] = tuple(values)
+	names = {r["name"] for r in rows if r.get("name")}
+	if not clauses:
+		return []
+	params.update(
+		start=min(r["scheduled_start"] for r in rows),
+		end=max(r["scheduled_end"] for r in rows),
+		names=tuple(names) or ("",),
+	)
+	return frappe.db.sql(
+		f"""
+		select name, scheduled_start, scheduled_end, {", ".join(RESOURCE_FIELDS)}
+		from `tabService Appointment`
+		where scheduled_start < %(end)s and scheduled_end > %(start)s
+			and status not in %(free)s and name not in %(names)s
+			and ({" or ".join(clauses)})
+		""",
+		params,
+		as_dict=True,
+	)
+
+
+def find_schedule_conflicts(appointments: list[dict], include_existing: bool = True) -> list[dict]:
+	"""Double bookings within a whole schedule (e.g. an import) and against what is already booked.
+
+	appointments: dicts with scheduled_start, scheduled_end and any of vehicle / service_advisor / bay
+	(plus name / status when known). Returns [{"field", "value", "rows": [i, j]}] where i / j are
+	schedule positions, or {"appointment": name} for an existing booking. Rows with an end not after the
+	start are reported with field "scheduled_end".
+	"""
+	rows, conflicts = [], []
+	for i, appt in enumerate(appointments):
+		if appt.get("status") in FREE_STATUSES:
+			continue
+		start, end = get_datetime(appt.get("scheduled_start")), get_datetime(appt.get("scheduled_end"))
+		if not (start and end):
+			continue
+		if end <= start:
+			conflicts.append({"field": "scheduled_end", "value": appt.get("scheduled_end"), "rows": [i]})
+			continue
+		row = {f: appt.get(f) for f in RESOURCE_FIELDS}
+		row.update(name=appt.get("name"), key=i, scheduled_start=start, scheduled_end=end)
+		rows.append(row)
+	if not rows:
+		return conflicts
+
+	existing = _existing_bookings(rows) if include_existing else []
+	for r in existing:
+		r["key"] = {"appointment": r.name}
+		r["scheduled_start"], r["scheduled_end"] = get_datetime(r.scheduled_start), get_datetime(r.scheduled_end)
+
+	for field in RESOURCE_FIELDS:
+		groups: dict[str, list] = {}
+		for r in (*rows, *existing):
+			if r.get(field):
+				groups.setdefault(r[field], []).append((r["scheduled_start"], r["scheduled_end"], r["key"]))
+		for value, intervals in groups.items():
+			for a, b in _sweep(intervals):
+				# Two existing bookings overlapping each other are not this schedule's problem.
+				if isinstance(a, dict) and isinstance(b, dict):
+					continue
+				conflicts.append({"field": field, "value": value, "rows": [a, b]})
+	return conflicts
+
+
+@frappe.whitelist()
+def validate_appointment_schedule(appointments, include_existing=1):
+	"""Check an imported schedule for double bookings in one pass before inserting it."""
+	frappe.has_permission("Service Appointment", "create", throw=True)
+	appointments = frappe.parse_json(appointments) if isinstance(appointments, str) else appointments
+	return find_schedule_conflicts(list(appointments or []), include_existing=bool(cint(include_existing)))
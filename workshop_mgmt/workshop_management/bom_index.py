@@ -0,0 +1,86 @@
+# Copyright (c) 2026, Infoney and contributors
+# Cached BOM explosion index: flattened per-unit stock components of each item's active BOM, per company.
+
+from __future__ import annotations
+
+import frappe
+from frappe.utils import flt
+
+_PREFIX = "workshop_bom_index"
+_CACHE_TTL = 24 * 60 * 60
+
+
+def _cache_key(company: str | None) -> str:
+	return f"{_PREFIX}:{company or ''}"
+
+
+def _load(item_codes: set[str], company: str | None) -> dict[str, dict[str, float]]:
+	"""Explode the active BOM (default first, then latest) of every item in one query.
+
+	Reads ERPNext's BOM Explosion Item rows, which already flatten sub-assemblies to leaf components
+	with qty_consumed_per_unit per finished unit. Items without an active BOM map to {}.
+	"""
+	company_clause = "and b.company = %(company)s" if company else ""
+	rows = frappe.db.sql(
+		f"""
+		select b.item, b.name as bom, e.item_code, e.qty_consumed_per_unit
+		from `tabBOM` b
+		left join `tabBOM Explosion Item` e
+			on e.parent = b.name and e.parenttype = 'BOM' and e.parentfield = 'exploded_items'
+		where b.item in %(items)s and b.docstatus = 1 and b.is_active = 1 {company_clause}
+		order by b.item, b.is_default desc, b.modified desc, b.name, e.idx
+		""",
+		{"items": tuple(item_codes), "company": company},
+		as_dict=True,
+	)
+	index: dict[str, dict[str, float]] = {code: {} for code in item_codes}
+	chosen: dict[str, str] = {}
+	for r in rows:
+		if chosen.setdefault(r.item, r.bom) != r.bom or not r.item_code:
+			continue
+		components = index[r.item]
+		components[r.item_code] = components.get(r.item_code, 0) + flt(r.qty_consumed_per_unit)
+	return index
+
+
+def get_exploded_components(item_codes, company: str | None = None) -> dict[str, dict[str, float]]:
+	"""{item: {component: qty per unit}} for the items' active BOMs; {} for items without one.
+
+	Served from a per-company cache hash; misses (including items with no BOM) are loaded together.
+	"""
+	item_codes = {code for code in item_codes if code}
+	if not item_codes or not frappe.db.table_exists("BOM"):
+		return {code: {} for code in item_codes}
+	cache = frappe.cache()
+	key = _cache_key(company)
+	index = {}
+	for code in item_codes:
+		components = cache.hget(key, code)
+		if components is not None:
+			index[code] = components
+	missing = item_codes.difference(index)
+	if missing:
+		loaded = _load(missing, company)
+		for code, components in loaded.items():
+			cache.hset(key, code, components)
+		cache.expire(cache.make_key(key), _CACHE_TTL)
+		index.update(loaded)
+	return index
+
+
+def invalidate_bom(doc, method=None):
+	"""BOM on_submit / on_cancel / on_update_after_submit (active / default flags): re-explode its item."""
+	cache = frappe.cache()
+	for company in {doc.company, None}:
+		cache.hdel(_cache_key(company), doc.item)
+
+
+def clear_bom_index() -> None:
+	"""Drop the whole index for every company."""
+	frappe.cache().delete_keys(_PREFIX)
+
+
+def on_bom_update_log_change(doc, method=None):
+	"""BOM Update Log on_change: the BOM Update Tool rewrites parent BOMs in place, so start over."""
+	if doc.status == "Completed":
+		clear_bom_index()
@@ -0,0 +1,193 @@
+# Copyright (c) 2026, Infoney and contributors
+# Redis cache for garage dashboard payloads: event invalidation, single-flight recompute, stale-while-revalidate.
+
+from __future__ import annotations
+
+import hashlib
+import time
+
+import frappe
+
+from workshop_mgmt.permission_utils import get_allowed_customer_names
+
+_PREFIX = "workshop_dashboard"
+_GENERATION_KEY = f"{_PREFIX}:generation"
+_SOURCE_EPOCH_KEY = f"{_PREFIX}:source_epoch"
+_STATS_FIELDS = ("hits", "misses", "stale")
+
+# An entry is fresh while its generation matches and it is younger than FRESH_SECONDS (covers writes that
+# do not fire doc events, e.g. Journal Entry payments). Stale entries are kept for STALE_SECONDS and served
+# while one worker recomputes.
+FRESH_SECONDS = 300
+STALE_SECONDS = 3600
+LOCK_SECONDS = 30
+WAIT_FOR_LEADER_SECONDS = 2.0
+
+
+def _cache():
+	return frappe.cache()
+
+
+def _raw_key(name: str) -> str:
+	return _cache().make_key(name)
+
+
+def _bump_stat(field: str):
+	try:
+		_cache().incr(_raw_key(f"{_PREFIX}:stats:{field}"))
+	except Exception:
+		pass
+
+
+def current_generation() -> int:
+	value = _cache().get(_raw_key(_GENERATION_KEY))
+	return int(value) if value else 0
+
+
+def invalidate():
+	"""Mark every cached dashboard payload stale (entries are swapped lazily on next read)."""
+	_cache().incr(_raw_key(_GENERATION_KEY))
+
+
+def _source_key(source: str, company: str | None = None) -> str:
+	suffix = f":{company}" if company else ""
+	return _raw_key(f"{_PREFIX}:source:{source}{suffix}")
+
+
+def bump_sources(sources, companies=()):
+	"""Advance the site-wide and per-company change counters of each source (revenue, appointment, job)."""
+	cache = _cache()
+	for source in sources:
+		cache.incr(_source_key(source))
+		for company in companies:
+			if company:
+				cache.incr(_source_key(source, company))
+
+
+def source_versions(sources, companies=None) -> dict[str, str]:
+	"""Change counters per source for the given companies (site-wide when None).
+
+	Prefixed with an epoch that changes if Redis lost the counters, so stamps never repeat.
+	"""
+	cache = _cache()
+	epoch_key = _raw_key(_SOURCE_EPOCH_KEY)
+	scopes = sorted(companies) if companies else [None]
+	keys = [_source_key(s, c) for s in sources for c in scopes]
+	epoch, *counters = cache.mget([epoch_key, *keys])
+	if not epoch:
+		cache.set(epoch_key, frappe.generate_hash(length=8), nx=True)
+		epoch = cache.get(epoch_key)
+	epoch = frappe.safe_decode(epoch)
+	width = len(scopes)
+	return {
+		s: f"{epoch}." + ".".join(str(int(c or 0)) for c in counters[i * width : (i + 1) * width])
+		for i, s in enumerate(sources)
+	}
+
+
+def user_scope(user: str | None = None) -> str:
+	"""'staff' for unrestricted users, otherwise a digest of the Customers a portal user may see."""
+	allowed = get_allowed_customer_names(user)
+	if allowed is None:
+		return "staff"
+	return "customers:" + hashlib.md5("\n".join(sorted(allowed)).encode()).hexdigest()
+
+
+def entry_key(*parts) -> str:
+	return f"{_PREFIX}:data:" + ":".join(str(p if p is not None else "") for p in parts)
+
+
+def _acquire(key: str) -> bool:
+	return bool(_cache().set(_raw_key(f"{key}:lock"), 1, nx=True, ex=LOCK_SECONDS))
+
+
+def _release(key: str):
+	_cache().delete(_raw_key(f"{key}:lock"))
+
+
+def store(key: str, data, generation: int):
+	_cache().set_value(
+		key,
+		{"generation": generation, "computed_at": time.time(), "data": data},
+		expires_in_sec=STALE_SECONDS,
+	)
+
+
+def _is_fresh(entry: dict, generation: int) -> bool:
+	return entry.get("generation") == generation and time.time() - entry.get("computed_at", 0) < FRESH_SECONDS
+
+
+def get_or_compute(key: str, compute, revalidate_method: str | None = None, revalidate_kwargs=None):
+	"""Return the cached payload for key, computing it at most once across workers.
+
+	- fresh entry: served as is (hit)
+	- stale entry: served as is; the first worker to take the lock enqueues revalidate_method
+	  (or recomputes inline when none is given)
+	- no entry: the lock holder computes; other workers wait briefly for its result
+	"""
+	generation = current_generation()
+	entry = _cache().get_value(key, expires=True)
+
+	if entry and _is_fresh(entry, generation):
+		_bump_stat("hits")
+		return entry["data"]
+
+	if entry:
+		_bump_stat("stale")
+		if _acquire(key):
+			if revalidate_method:
+				frappe.enqueue(
+					revalidate_method,
+					queue="short",
+					job_id=f"{key}:revalidate",
+					deduplicate=True,
+					**(revalidate_kwargs or {}),
+				)
+			else:
+				try:
+					store(key, compute(), generation)
+				finally:
+					_release(key)
+		return entry["data"]
+
+	_bump_stat("misses")
+	if _acquire(key):
+		try:
+			data = compute()
+			store(key, data, generation)
+			return data
+		finally:
+			_release(key)
+
+	deadline = time.monotonic() + WAIT_FOR_LEADER_SECONDS
+	while time.monotonic() < deadline:
+		time.sleep(0.05)
+		entry = _cache().get_value(key, expires=True)
+		if entry:
+			return entry["data"]
+	return compute()
+
+
+def revalidate(key: str, compute):
+	"""Recompute and store one entry; used by background revalidation jobs (lock already held)."""
+	generation = current_generation()
+	try:
+		store(key, compute(), generation)
+	finally:
+		_release(key)
+
+
+@frappe.whitelist()
+def get_dashboard_cache_stats():
+	"""Hit / miss / stale-serve counters for monitoring (System Manager)."""
+	frappe.only_for("System Manager")
+	cache = _cache()
+	stats = {}
+	for field in _STATS_FIELDS:
+		value = cache.get(_raw_key(f"{_PREFIX}:stats:{field}"))
+		stats[field] = int(value) if value else 0
+	served = stats["hits"] + stats["stale"]
+	total = served + stats["misses"]
+	stats["hit_ratio"] = round(served / total, 4) if total else 0
+	stats["generation"] = current_generation()
+	return stats
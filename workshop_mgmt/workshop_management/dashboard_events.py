@@ -0,0 +1,97 @@
+# Copyright (c) 2026, Infoney and contributors
+# doc_events handlers that keep garage dashboard aggregates in step with workshop documents.
+
+from __future__ import annotations
+
+import frappe
+from frappe.utils import getdate
+
+from workshop_mgmt.workshop_management.dashboard_rollup import (
+	METRIC_APPOINTMENT_STATUS,
+	METRIC_JOB_STATUS,
+	METRIC_PART_ITEM,
+	METRIC_REVENUE,
+	METRIC_SERVICE_ITEM,
+	refresh_metrics,
+)
+from workshop_mgmt.workshop_management.link_cache import get_header, prefetch
+
+_JOB_CARD_METRICS = (METRIC_JOB_STATUS, METRIC_SERVICE_ITEM, METRIC_PART_ITEM)
+
+
+def _touched_days(doc, company_field: str | None, date_field: str) -> set[tuple[str, object]]:
+	"""(company, date) for the current values and, on update, the values before save."""
+	days = set()
+	for d in (doc, doc.get_doc_before_save()):
+		if not d or not d.get(date_field):
+			continue
+		company = d.get(company_field) if company_field else ""
+		days.add((company or "", getdate(d.get(date_field))))
+	return days
+
+
+def _appointment_days(names) -> set[tuple[str, object]]:
+	"""(company, date) of the given appointments, from the headers the Job Card save already loaded."""
+	names = [n for n in names if n]
+	if not names:
+		return set()
+	prefetch({"Service Appointment": names})
+	rows = [get_header("Service Appointment", name) for name in names]
+	return {(r.company or "", getdate(r.scheduled_start)) for r in rows if r and r.scheduled_start}
+
+
+def on_sales_invoice_change(doc, method=None):
+	"""Sales Invoice on_submit / on_cancel: job-linked revenue and outstanding."""
+	if not doc.get("custom_job_card"):
+		return
+	days = {(doc.company, getdate(doc.posting_date))}
+	if doc.get("is_return") and doc.get("return_against"):
+		against = frappe.db.get_value(
+			"Sales Invoice", doc.return_against, ["company", "posting_date"], as_dict=True
+		)
+		if against:
+			days.add((against.company, getdate(against.posting_date)))
+	refresh_metrics((METRIC_REVENUE,), days)
+	# create_sales_invoice moves the job card status with db_set (no doc events).
+	job = frappe.db.get_value("Job Card", doc.custom_job_card, ["company", "posting_date"], as_dict=True)
+	if job and job.posting_date:
+		refresh_metrics((METRIC_JOB_STATUS,), {(job.company or "", getdate(job.posting_date))})
+
+
+def on_payment_entry_change(doc, method=None):
+	"""Payment Entry on_submit / on_cancel: outstanding on the job-linked invoices it settles."""
+	invoices = [
+		r.reference_name
+		for r in doc.get("references") or []
+		if r.reference_doctype == "Sales Invoice" and r.reference_name
+	]
+	if not invoices:
+		return
+	rows = frappe.get_all(
+		"Sales Invoice",
+		filters={"name": ["in", invoices], "custom_job_card": ["is", "set"]},
+		fields=["company", "posting_date"],
+	)
+	if rows:
+		days = {(r.company, getdate(r.posting_date)) for r in rows}
+		refresh_metrics((METRIC_REVENUE,), days)
+
+
+def on_job_card_change(doc, method=None):
+	"""Job Card on_change / after_delete: status counts, line items and the appointment it drives."""
+	days = _touched_days(doc, "company", "posting_date")
+	refresh_metrics(_JOB_CARD_METRICS, days)
+
+	# update_appointment_link moves the appointment status with a plain UPDATE (no doc events), queued by
+	# link_sync until commit; the rollup refresh runs after commit, so it sees that status.
+	before = doc.get_doc_before_save()
+	appointments = {doc.get("appointment"), before.get("appointment") if before else None}
+	appointment_days = _appointment_days(appointments)
+	if appointment_days:
+		refresh_metrics((METRIC_APPOINTMENT_STATUS,), appointment_days)
+
+
+def on_service_appointment_change(doc, method=None):
+	"""Service Appointment on_change / after_delete: status counts per scheduled day."""
+	days = _touched_days(doc, "company", "scheduled_start")
+	refresh_metrics((METRIC_APPOINTMENT_STATUS,), days)
@@ -0,0 +1,77 @@
+# Copyright (c) 2026, Infoney and contributors
+# Tell open garage dashboards over Frappe realtime that their figures changed, debounced and coalesced per site.
+
+from __future__ import annotations
+
+import hashlib
+import time
+
+import frappe
+
+REALTIME_EVENT = "workshop_dashboard"
+
+# Writes within this window after the first one are folded into a single message.
+DEBOUNCE_SECONDS = 2
+_PENDING_KEY = "workshop_dashboard:realtime_pending"
+_PENDING_COMPANIES_KEY = "workshop_dashboard:realtime_companies"
+_PENDING_TTL = 60
+# Version last signalled per company scope; a recompute that leaves the figures unchanged sends nothing.
+_LAST_SNAPSHOT_KEY = "workshop_dashboard:realtime_last"
+
+
+def schedule_publish(companies=()):
+	"""Enqueue one publish job per debounce window; later writes in the window only find the flag set.
+
+	Touched companies are collected in a set so the job publishes one signal per branch.
+	"""
+	cache = frappe.cache()
+	if companies:
+		cache.sadd(_PENDING_COMPANIES_KEY, *companies)
+	if not cache.set(cache.make_key(_PENDING_KEY), 1, nx=True, ex=_PENDING_TTL):
+		return
+	frappe.enqueue(
+		"workshop_mgmt.workshop_management.dashboard_realtime.publish_dashboard_delta",
+		queue="short",
+	)
+
+
+def _pop_companies(cache) -> list[str]:
+	"""Drain the touched companies. Removed before the snapshots are built, so a company added later
+	(after its commit) is still in a snapshot or left in the set for the next job."""
+	members = cache.smembers(_PENDING_COMPANIES_KEY)
+	if members:
+		cache.srem(_PENDING_COMPANIES_KEY, *members)
+	return sorted({frappe.safe_decode(c) for c in members})
+
+
+def _publish_scope(cache, company: str | None):
+	"""Publish a change signal for one company scope (None: all companies) if its figures moved.
+
+	The message only carries the company and a version: realtime events reach every session on the
+	site, so clients refetch through get_dashboard_sections, which applies their company permissions.
+	"""
+	from workshop_mgmt.workshop_management.page.garage_business_dashboard.garage_business_dashboard import (
+		build_realtime_snapshot,
+	)
+
+	snapshot = build_realtime_snapshot((company,) if company else None)
+	version = hashlib.md5(frappe.as_json(snapshot).encode()).hexdigest()[:12]
+	last_key = f"{_LAST_SNAPSHOT_KEY}:{company or ''}"
+	if cache.get_value(last_key, expires=True) == version:
+		return
+	cache.set_value(last_key, version, expires_in_sec=86400)
+	frappe.publish_realtime(REALTIME_EVENT, {"company": company, "version": version})
+
+
+def publish_dashboard_delta():
+	"""Background job: wait out the debounce window, then signal the scopes changed since the last message.
+
+	One signal for the all-companies view (company None) and one per touched company.
+	"""
+	time.sleep(DEBOUNCE_SECONDS)
+	cache = frappe.cache()
+	# Clear the flag before reading so writes committed from here on schedule a fresh message.
+	cache.delete(cache.make_key(_PENDING_KEY))
+
+	for company in (None, *_pop_companies(cache)):
+		_publish_scope(cache, company)
@@ -0,0 +1,384 @@
+# Copyright (c) 2026, Infoney and contributors
+# Per-day, per-company aggregates behind the garage dashboard (Workshop Metric Rollup).
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from functools import partial
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, get_last_day, getdate, now
+
+from workshop_mgmt.workshop_management.dashboard_cache import bump_sources, invalidate
+from workshop_mgmt.workshop_management.dashboard_realtime import schedule_publish
+
+ROLLUP_DOCTYPE = "Workshop Metric Rollup"
+
+# Global default set once a full rebuild has completed; the dashboard reads raw tables until then.
+ROLLUP_READY_KEY = "workshop_metric_rollup_ready"
+
+# Keys touched by committed saves, recomputed by apply_queued_refreshes; the flag marks a queued / running job.
+_PENDING_REFRESH_KEY = "workshop_metric_rollup:pending"
+_REFRESH_RUNNING_KEY = "workshop_metric_rollup:refresh_running"
+_REFRESH_RUNNING_TTL = 600
+
+METRIC_REVENUE = "Revenue"
+METRIC_APPOINTMENT_STATUS = "Appointment Status"
+METRIC_JOB_STATUS = "Job Status"
+METRIC_SERVICE_ITEM = "Service Item"
+METRIC_PART_ITEM = "Part Item"
+
+# Each source query returns metric_date, company, dimension, record_count, qty, amount and outstanding
+# for the rows matched by {conditions} (a date range plus an optional company).
+_METRIC_SOURCES = {
+	METRIC_REVENUE: {
+		"source_table": "`tabSales Invoice` si",
+		"date_column": "si.posting_date",
+		"company_column": "si.company",
+		"query": """
+			select
+				si.posting_date as metric_date,
+				si.company,
+				'' as dimension,
+				count(*) as record_count,
+				0 as qty,
+				sum(si.base_grand_total) as amount,
+				sum(si.outstanding_amount) as outstanding
+			from `tabSales Invoice` si
+			where si.docstatus = 1
+				and ifnull(si.custom_job_card, '') != ''
+				{conditions}
+			group by si.posting_date, si.company
+		""",
+	},
+	METRIC_APPOINTMENT_STATUS: {
+		"source_table": "`tabService Appointment` sa",
+		"date_column": "sa.scheduled_start",
+		"is_datetime": True,
+		"company_column": "sa.company",
+		"query": """
+			select
+				date(sa.scheduled_start) as metric_date,
+				sa.company,
+				sa.status as dimension,
+				count(*) as record_count,
+				0 as qty,
+				0 as amount,
+				0 as outstanding
+			from `tabService Appointment` sa
+			where sa.scheduled_start is not null
+				{conditions}
+			group by date(sa.scheduled_start), sa.company, sa.status
+		""",
+	},
+	METRIC_JOB_STATUS: {
+		"source_table": "`tabJob Card` jc",
+		"date_column": "jc.posting_date",
+		"company_column": "jc.company",
+		"query": """
+			select
+				jc.posting_date as metric_date,
+				jc.company,
+				jc.status as dimension,
+				count(*) as record_count,
+				0 as qty,
+				0 as amount,
+				0 as outstanding
+			from `tabJob Card` jc
+			where jc.posting_date is not null
+				{conditions}
+			group by jc.posting_date, jc.company, jc.status
+		""",
+	},
+	METRIC_SERVICE_ITEM: {
+		"source_table": "`tabJob Card` jc",
+		"date_column": "jc.posting_date",
+		"company_column": "jc.company",
+		"query": """
+			select
+				jc.posting_date as metric_date,
+				jc.company,
+				jsi.item_code as dimension,
+				count(*) as record_count,
+				sum(jsi.qty) as qty,
+				sum(jsi.amount) as amount,
+				0 as outstanding
+			from `tabJob Card Service Item` jsi
+			inner join `tabJob Card` jc on jc.name = jsi.parent
+			where jsi.parenttype = 'Job Card'
+				and jc.posting_date is not null
+				{conditions}
+			group by jc.posting_date, jc.company, jsi.item_code
+		""",
+	},
+	METRIC_PART_ITEM: {
+		"source_table": "`tabJob Card` jc",
+		"date_column": "jc.posting_date",
+		"company_column": "jc.company",
+		"query": """
+			select
+				jc.posting_date as metric_date,
+				jc.company,
+				jpi.item_code as dimension,
+				count(*) as record_count,
+				sum(jpi.qty) as qty,
+				sum(jpi.amount) as amount,
+				0 as outstanding
+			from `tabJob Card Part Item` jpi
+			inner join `tabJob Card` jc on jc.name = jpi.parent
+			where jpi.parenttype = 'Job Card'
+				and jc.posting_date is not null
+				{conditions}
+			group by jc.posting_date, jc.company, jpi.item_code
+		""",
+	},
+}
+
+ALL_METRICS = tuple(_METRIC_SOURCES)
+
+# Dashboard change counter (dashboard_cache source) each metric feeds.
+_METRIC_DASHBOARD_SOURCE = {
+	METRIC_REVENUE: "revenue",
+	METRIC_APPOINTMENT_STATUS: "appointment",
+	METRIC_JOB_STATUS: "job",
+	METRIC_SERVICE_ITEM: "job",
+	METRIC_PART_ITEM: "job",
+}
+
+_INSERT_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"metric",
+	"metric_date",
+	"company",
+	"dimension",
+	"record_count",
+	"qty",
+	"amount",
+	"outstanding",
+)
+
+
+def is_rollup_ready() -> bool:
+	return frappe.db.get_global(ROLLUP_READY_KEY) == "1"
+
+
+def _row_name(metric: str, company: str, metric_date, dimension: str) -> str:
+	key = "|".join((metric, company or "", str(metric_date), dimension or ""))
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def _source_conditions(spec: dict, company: str | None) -> str:
+	col = spec["date_column"]
+	if spec.get("is_datetime"):
+		conditions = f" and {col} >= %(from_date)s and {col} < %(to_date_next)s"
+	else:
+		conditions = f" and {col} between %(from_date)s and %(to_date)s"
+	if company and spec["company_column"]:
+		conditions += f" and {spec['company_column']} = %(company)s"
+	return conditions
+
+
+def _replace_rows(metric: str, from_date: date, to_date: date, company: str | None = None) -> int:
+	"""Recompute one metric for a date range (optionally one company) and swap the stored rows."""
+	spec = _METRIC_SOURCES[metric]
+	params = {
+		"from_date": from_date,
+		"to_date": to_date,
+		"to_date_next": add_days(to_date, 1),
+		"company": company,
+	}
+	rows = frappe.db.sql(
+		spec["query"].format(conditions=_source_conditions(spec, company)),
+		params,
+		as_dict=True,
+	)
+
+	delete_filters = {"metric": metric, "metric_date": ["between", [from_date, to_date]]}
+	if company and spec["company_column"]:
+		delete_filters["company"] = company
+	frappe.db.delete(ROLLUP_DOCTYPE, delete_filters)
+
+	if not rows:
+		return 0
+
+	ts = now()
+	user = frappe.session.user
+	values = [
+		(
+			_row_name(metric, r.company, r.metric_date, r.dimension),
+			ts,
+			ts,
+			user,
+			user,
+			metric,
+			r.metric_date,
+			r.company or "",
+			r.dimension or "",
+			r.record_count or 0,
+			r.qty or 0,
+			r.amount or 0,
+			r.outstanding or 0,
+		)
+		for r in rows
+	]
+	frappe.db.bulk_insert(ROLLUP_DOCTYPE, _INSERT_FIELDS, values)
+	return len(values)
+
+
+def _refresh_keys(metrics, days) -> set[str]:
+	"""Deduplicated "metric|company|date" keys; metrics without a company column use company ''."""
+	pairs = {(company or "", getdate(day)) for company, day in days if day}
+	keys = set()
+	for metric in metrics:
+		has_company = bool(_METRIC_SOURCES[metric]["company_column"])
+		for company, day in pairs:
+			keys.add("|".join((metric, company if has_company else "", str(day))))
+	return keys
+
+
+def refresh_metrics(metrics, days) -> None:
+	"""Queue the given metrics for recomputation for each (company, date) pair touched by a document event.
+
+	Nothing runs in the saving transaction: once it commits the keys join a Redis set and a single
+	background job recomputes them from committed data, so concurrent saves on the same day cannot
+	write totals from stale snapshots or race on the same rollup rows. That job also bumps the dashboard
+	sources, drops cached payloads and schedules the realtime publish, once the new rows are committed.
+	"""
+	keys = _refresh_keys(metrics, days)
+	if keys:
+		frappe.db.after_commit.add(partial(_queue_refresh, tuple(keys)))
+
+
+def _queue_refresh(keys) -> None:
+	cache = frappe.cache()
+	cache.sadd(_PENDING_REFRESH_KEY, *keys)
+	# One job at a time: while the flag is set the running job picks the new keys up.
+	if cache.set(cache.make_key(_REFRESH_RUNNING_KEY), 1, nx=True, ex=_REFRESH_RUNNING_TTL):
+		frappe.enqueue(
+			"workshop_mgmt.workshop_management.dashboard_rollup.apply_queued_refreshes",
+			queue="short",
+			job_id="workshop_metric_rollup_refresh",
+		)
+
+
+def apply_queued_refreshes() -> int:
+	"""Background job: recompute queued (metric, company, date) keys until none are left, one commit each.
+
+	After each batch the dashboard is told (source versions, payload cache, realtime) for the companies
+	recomputed, so readers never pick up the totals from before the save that queued them.
+	"""
+	cache = frappe.cache()
+	running_key = cache.make_key(_REFRESH_RUNNING_KEY)
+	done = 0
+	while True:
+		members = cache.smembers(_PENDING_REFRESH_KEY)
+		if not members:
+			cache.delete(running_key)
+			# Keys added before the flag was cleared did not enqueue a job: take them over.
+			if cache.smembers(_PENDING_REFRESH_KEY) and cache.set(
+				running_key, 1, nx=True, ex=_REFRESH_RUNNING_TTL
+			):
+				continue
+			return done
+		cache.srem(_PENDING_REFRESH_KEY, *members)
+		cache.expire(running_key, _REFRESH_RUNNING_TTL)
+		sources, companies = set(), set()
+		for member in sorted({frappe.safe_decode(m) for m in members}):
+			metric, company, day = member.split("|")
+			if metric not in _METRIC_SOURCES:
+				continue
+			day = getdate(day)
+			_replace_rows(metric, day, day, company or None)
+			frappe.db.commit()
+			sources.add(_METRIC_DASHBOARD_SOURCE[metric])
+			if company:
+				companies.add(company)
+			done += 1
+		if sources:
+			bump_sources(sorted(sources), sorted(companies))
+			invalidate()
+			schedule_publish(sorted(companies))
+
+
+def _source_bounds(metric: str) -> tuple[date | None, date | None]:
+	spec = _METRIC_SOURCES[metric]
+	col = spec["date_column"]
+	row = frappe.db.sql(f"select min({col}), max({col}) from {spec['source_table']}")
+	lo, hi = row[0] if row else (None, None)
+	return (getdate(lo) if lo else None, getdate(hi) if hi else None)
+
+
+def rebuild_metric_rollup(from_date=None, to_date=None, company=None, metrics=None, commit=True) -> dict:
+	"""Backfill or repair rollup rows from the source tables, one calendar month per transaction.
+
+	Without a date range every metric is rebuilt from its earliest to its latest source row, stale rows
+	are dropped first and the rollup is marked ready for the dashboard once done.
+	"""
+	if isinstance(metrics, str):
+		metrics = frappe.parse_json(metrics)
+	full = not (from_date or to_date or company or metrics)
+	metrics = list(metrics or ALL_METRICS)
+	if full:
+		frappe.db.set_global(ROLLUP_READY_KEY, "0")
+
+	summary = {}
+	for metric in metrics:
+		lo, hi = _source_bounds(metric)
+		start = getdate(from_date) if from_date else lo
+		end = getdate(to_date) if to_date else hi
+		if full:
+			frappe.db.delete(ROLLUP_DOCTYPE, {"metric": metric})
+		if not start or not end or start > end:
+			summary[metric] = 0
+			continue
+
+		written = 0
+		window_start = start
+		while window_start <= end:
+			window_end = min(getdate(get_last_day(window_start)), end)
+			written += _replace_rows(metric, window_start, window_end, company)
+			if commit:
+				frappe.db.commit()
+			window_start = getdate(add_months(get_first_day(window_start), 1))
+		summary[metric] = written
+
+	if full:
+		frappe.db.set_global(ROLLUP_READY_KEY, "1")
+		if commit:
+			frappe.db.commit()
+	return summary
+
+
+@frappe.whitelist()
+def enqueue_rebuild_metric_rollup(from_date=None, to_date=None, company=None):
+	"""Run rebuild_metric_rollup on the long queue (desk / API entry point for backfill and drift repair)."""
+	frappe.only_for("System Manager")
+	frappe.enqueue(
+		"workshop_mgmt.workshop_management.dashboard_rollup.rebuild_metric_rollup",
+		queue="long",
+		timeout=3600,
+		job_id="workshop_metric_rollup_rebuild",
+		deduplicate=True,
+		from_date=from_date,
+		to_date=to_date,
+		company=company,
+	)
+	return {"queued": True}
+
+
+def ensure_metric_rollup():
+	"""Queue the initial backfill after install / migrate when the rollup has never been built."""
+	if not frappe.db.table_exists(ROLLUP_DOCTYPE) or is_rollup_ready():
+		return
+	frappe.enqueue(
+		"workshop_mgmt.workshop_management.dashboard_rollup.rebuild_metric_rollup",
+		queue="long",
+		timeout=3600,
+		job_id="workshop_metric_rollup_rebuild",
+		deduplicate=True,
+	)
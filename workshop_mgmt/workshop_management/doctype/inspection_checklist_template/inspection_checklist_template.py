@@ -0,0 +1,25 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from workshop_mgmt.workshop_management.vehicle_inspection_template import invalidate_checklist_bundle
+
+
+class InspectionChecklistTemplate(Document):
+	"""Checklist variant picked for vehicles matching its make / model / fuel type (blank matches any)."""
+
+	def validate(self):
+		self.make = (self.make or "").strip() or None
+		self.model = (self.model or "").strip() or None
+		self.set("items", [row for row in self.items if (row.check_item or "").strip()])
+		if not self.items:
+			frappe.throw(_("Add at least one check item."))
+
+	def on_update(self):
+		invalidate_checklist_bundle()
+
+	def on_trash(self):
+		invalidate_checklist_bundle()
@@ -63,34 +63,23 @@ frappe.ui.form.on("Job Card", {
 				frappe.confirm(
 					__("This will create a Sales Invoice and update stock. Continue?"),
 					function() {
-						// User confirmed, proceed with invoice creation
+						// User confirmed: the invoice is built by a background job (large jobs outlast the request)
 						frappe.call({
-							method: "create_sales_invoice",
-							doc: frm.doc,
+							method: "workshop_mgmt.api.job_card_enqueue_sales_invoice",
+							args: { name: frm.doc.name },
 							freeze: true,
-							freeze_message: __("Creating Sales Invoice..."),
+							freeze_message: __("Queueing Sales Invoice..."),
 							callback: function(r) {
-								if (r.message) {
-									frm.reload_doc();
-									frappe.show_alert({
-										message: __("Sales Invoice {0} created successfully", [r.message]),
-										indicator: "green"
-									}, 5);
-									
-									// Prompt to view the invoice
-									setTimeout(function() {
-										frappe.msgprint({
-											title: __("Invoice Created"),
-											message: __("Sales Invoice {0} has been created. Would you like to view it?", [r.message]),
-											primary_action: {
-												label: __("View Invoice"),
-												action: function() {
-													frappe.set_route("Form", "Sales Invoice", r.message);
-												}
-											}
-										});
-									}, 1000);
+								const run = r.message || {};
+								if (run.status === "done" || run.status === "failed") {
+									workshop_mgmt_on_invoice_run(frm, run);
+									return;
 								}
+								frappe.show_alert({
+									message: __("Creating Sales Invoice in the background..."),
+									indicator: "blue"
+								}, 5);
+								workshop_mgmt_wait_for_invoice(frm);
 							},
 							error: function(r) {
 								frappe.show_alert({
@@ -263,3 +252,52 @@ function calculate_part_item_amount(frm, cdt, cdn) {
 	let amount = (row.qty || 0) * (row.rate || 0);
 	frappe.model.set_value(cdt, cdn, "amount", amount);
 }
+
+// Background invoice run: settle on the workshop_invoice realtime event, polling as a fallback.
+function workshop_mgmt_wait_for_invoice(frm) {
+	const job_card = frm.doc.name;
+	let timer = null;
+	const handler = (run) => {
+		if (run && run.job_card === job_card && ["done", "failed"].includes(run.status)) {
+			finish(run);
+		}
+	};
+	const finish = (run) => {
+		clearTimeout(timer);
+		frappe.realtime.off("workshop_invoice", handler);
+		workshop_mgmt_on_invoice_run(frm, run);
+	};
+	const poll = () => {
+		frappe.xcall("workshop_mgmt.api.job_card_invoice_status", { name: job_card }).then((run) => {
+			if (["done", "failed"].includes(run.status)) {
+				finish(run);
+			} else {
+				timer = setTimeout(poll, 5000);
+			}
+		});
+	};
+	frappe.realtime.on("workshop_invoice", handler);
+	timer = setTimeout(poll, 5000);
+}
+
+function workshop_mgmt_on_invoice_run(frm, run) {
+	frm.reload_doc();
+	if (run.status === "failed") {
+		frappe.msgprint({
+			title: __("Sales Invoice Not Created"),
+			message: run.error || __("Failed to create Sales Invoice"),
+			indicator: "red"
+		});
+		return;
+	}
+	frappe.msgprint({
+		title: __("Invoice Created"),
+		message: __("Sales Invoice {0} has been created. Would you like to view it?", [run.sales_invoice]),
+		primary_action: {
+			label: __("View Invoice"),
+			action: function() {
+				frappe.set_route("Form", "Sales Invoice", run.sales_invoice);
+			}
+		}
+	});
+}
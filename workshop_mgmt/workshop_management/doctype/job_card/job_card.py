@@ -5,16 +5,37 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 
+from workshop_mgmt.workshop_management import link_sync
+from workshop_mgmt.workshop_management.link_cache import get_header, prefetch
+from workshop_mgmt.workshop_management.pricing import get_item_rates, get_selling_price_list
+from workshop_mgmt.workshop_management.stock_availability import release_reservations, validate_job_card_stock
+
 
 class JobCard(Document):
 	def validate(self):
 		"""Validate Job Card data"""
+		# One query per linked doctype; the fetches below read the memoized rows.
+		prefetch(
+			{
+				"Vehicle": [self.vehicle],
+				"Service Appointment": [self.appointment],
+				"Vehicle Inspection": [self.inspection],
+			}
+		)
 		self.validate_vehicle_customer_match()
 		self.validate_duplicate_invoice()
 		self.calculate_amounts()
 		self.fetch_from_appointment()
 		self.fetch_from_inspection()
+		# Any save is activity; the status sweep flags the card again if it goes idle
+		self.is_stale = 0
 	
+	def validate_workflow(self):
+		"""Skip the single-transition check on a fast-forward save (workflow_graph.fast_forward checked each hop)."""
+		if self.flags.workflow_fast_forward:
+			return
+		super().validate_workflow()
+
 	def after_insert(self):
 		"""Link job card back to the appointment and inspection"""
 		self.update_appointment_link()
@@ -27,23 +48,12 @@ class JobCard(Document):
 
 	def sync_inspection_job_card_link(self):
 		"""Set Vehicle Inspection.job_card to this Job Card when linked."""
-		if not self.inspection:
-			return
-		current = frappe.db.get_value("Vehicle Inspection", self.inspection, "job_card")
-		if current != self.name:
-			frappe.db.set_value(
-				"Vehicle Inspection",
-				self.inspection,
-				"job_card",
-				self.name,
-				update_modified=False,
-			)
+		link_sync.queue("Vehicle Inspection", self.inspection, {"job_card": self.name})
 	
 	def fetch_from_appointment(self):
 		"""Fetch customer and vehicle from appointment if set"""
 		if self.appointment:
-			appointment = frappe.db.get_value("Service Appointment", self.appointment,
-				["customer", "vehicle", "service_advisor"], as_dict=True)
+			appointment = get_header("Service Appointment", self.appointment)
 			if appointment:
 				if not self.customer:
 					self.customer = appointment.customer
@@ -56,12 +66,7 @@ class JobCard(Document):
 		"""Fill header links from Vehicle Inspection when set (e.g. manual link on Job Card)."""
 		if not self.inspection:
 			return
-		row = frappe.db.get_value(
-			"Vehicle Inspection",
-			self.inspection,
-			["customer", "vehicle", "appointment"],
-			as_dict=True,
-		)
+		row = get_header("Vehicle Inspection", self.inspection)
 		if not row:
 			return
 		if not self.customer and row.customer:
@@ -73,37 +78,28 @@ class JobCard(Document):
 	
 	def update_appointment_link(self):
 		"""Update the job_card field in the linked Service Appointment"""
-		if self.appointment:
-			# Check if appointment doesn't already have this job card linked
-			current_job_card = frappe.db.get_value("Service Appointment", 
-				self.appointment, "job_card")
-			if current_job_card != self.name:
-				frappe.db.set_value("Service Appointment", self.appointment, 
-					"job_card", self.name, update_modified=False)
-				# Also update appointment status to In Progress
-				frappe.db.set_value("Service Appointment", self.appointment,
-					"status", "In Progress", update_modified=False)
+		# Only when the appointment doesn't already have this job card linked; status moves to In Progress too.
+		link_sync.queue(
+			"Service Appointment",
+			self.appointment,
+			{"job_card": self.name, "status": "In Progress"},
+			when_changed=("job_card",),
+		)
 	
 	def on_trash(self):
 		"""Clear job card link from appointment and inspection when deleted"""
-		if self.appointment:
-			frappe.db.set_value("Service Appointment", self.appointment, 
-				"job_card", None, update_modified=False)
-		if self.inspection:
-			linked = frappe.db.get_value("Vehicle Inspection", self.inspection, "job_card")
-			if linked == self.name:
-				frappe.db.set_value(
-					"Vehicle Inspection",
-					self.inspection,
-					"job_card",
-					None,
-					update_modified=False,
-				)
+		link_sync.queue("Service Appointment", self.appointment, {"job_card": None})
+		link_sync.queue(
+			"Vehicle Inspection", self.inspection, {"job_card": None}, expect={"job_card": self.name}
+		)
+		# Not deferred: delete_doc checks for documents still linking here right after on_trash.
+		link_sync.flush()
 	
 	def validate_vehicle_customer_match(self):
 		"""Ensure vehicle belongs to the customer"""
 		if self.vehicle and self.customer:
-			vehicle_customer = frappe.db.get_value("Vehicle", self.vehicle, "customer")
+			vehicle = get_header("Vehicle", self.vehicle)
+			vehicle_customer = vehicle.customer if vehicle else None
 			if vehicle_customer != self.customer:
 				frappe.throw(_("Vehicle {0} does not belong to Customer {1}").format(
 					self.vehicle, self.customer
@@ -138,20 +134,24 @@ class JobCard(Document):
 		quotation.party_name = self.customer
 		quotation.company = self.company
 		
-		# Add service items
-		for service_item in self.service_items:
-			quotation.append("items", {
-				"item_code": service_item.item_code,
-				"qty": service_item.qty,
-				"rate": service_item.rate
-			})
+		# Quote from the customer's price list; lines without a rate take its rate
+		price_list = get_selling_price_list(self.customer)
+		if price_list:
+			quotation.selling_price_list = price_list
+		lines = [*self.service_items, *self.part_items]
+		rates = get_item_rates(
+			[row.item_code for row in lines if not row.rate],
+			customer=self.customer,
+			date=self.posting_date,
+			price_list=price_list,
+		)
 		
-		# Add part items
-		for part_item in self.part_items:
+		# Add service and part items
+		for row in lines:
 			quotation.append("items", {
-				"item_code": part_item.item_code,
-				"qty": part_item.qty,
-				"rate": part_item.rate
+				"item_code": row.item_code,
+				"qty": row.qty,
+				"rate": row.rate or rates.get(row.item_code, 0)
 			})
 		
 		quotation.insert()
@@ -163,10 +163,8 @@ class JobCard(Document):
 		frappe.msgprint(_("Quotation {0} created successfully").format(quotation.name))
 		return quotation.name
 	
-	@frappe.whitelist()
-	def create_sales_invoice(self):
-		"""Create Sales Invoice from Job Card with Update Stock"""
-		self.check_permission("write")
+	def validate_can_invoice(self):
+		"""Cheap pre-checks shared by the synchronous and the queued invoice paths"""
 		# Validate status
 		if self.status not in ["Approved", "Ready to Invoice"]:
 			frappe.throw(_("Job Card must be Approved or Ready to Invoice to create Sales Invoice"))
@@ -178,9 +176,28 @@ class JobCard(Document):
 		# Validate items exist
 		if not self.service_items and not self.part_items:
 			frappe.throw(_("Please add at least one service or part item before creating invoice"))
+
+	def get_existing_invoice(self):
+		"""Draft or submitted Sales Invoice already made for this Job Card (e.g. by an earlier queued run)"""
+		return frappe.db.get_value(
+			"Sales Invoice", {"custom_job_card": self.name, "docstatus": ["<", 2]}, "name"
+		)
+
+	@frappe.whitelist()
+	def create_sales_invoice(self):
+		"""Create Sales Invoice from Job Card with Update Stock"""
+		self.check_permission("write")
+		self.validate_can_invoice()
+
+		# Idempotent: link an invoice a previous attempt already created instead of making another
+		existing = self.get_existing_invoice()
+		if existing:
+			self._mark_invoiced(existing)
+			return existing
 		
-		# Validate stock availability for parts
-		self.validate_stock_availability()
+		# Validate stock availability for parts (a Workshop Invoice Run checks its whole batch up front)
+		if not self.flags.stock_prevalidated:
+			self.validate_stock_availability()
 		
 		try:
 			# Create Sales Invoice
@@ -211,17 +228,9 @@ class JobCard(Document):
 					"warehouse": warehouse
 				})
 			
-			# Calculate taxes and totals
-			invoice.calculate_taxes_and_totals()
+			# insert() validates the invoice, which calculates taxes and totals
 			invoice.insert()
-			
-			# Update job card status to Invoiced and link the invoice
-			self.db_set("sales_invoice", invoice.name)
-			self.db_set("status", "Invoiced")
-			self.reload()
-			
-			# Add comment to track the change
-			self.add_comment("Comment", _("Sales Invoice {0} created and Job Card status changed to Invoiced").format(invoice.name))
+			self._mark_invoiced(invoice.name)
 			
 			frappe.msgprint(_("Sales Invoice {0} created successfully and Job Card status updated to Invoiced").format(invoice.name))
 			return invoice.name
@@ -230,33 +239,15 @@ class JobCard(Document):
 			frappe.log_error(frappe.get_traceback(), _("Job Card Invoice Creation Error"))
 			frappe.throw(_("Error creating Sales Invoice: {0}").format(str(e)))
 	
-	def validate_stock_availability(self):
-		"""Check if sufficient stock exists for all part items"""
-		insufficient_items = []
-		
-		for part_item in self.part_items:
-			warehouse = part_item.warehouse or self.warehouse
-			
-			# Get available stock
-			available_qty = frappe.db.get_value(
-				"Bin",
-				{"item_code": part_item.item_code, "warehouse": warehouse},
-				"actual_qty"
-			) or 0
-			
-			if available_qty < part_item.qty:
-				insufficient_items.append({
-					"item": part_item.item_code,
-					"warehouse": warehouse,
-					"available": available_qty,
-					"required": part_item.qty
-				})
-		
-		if insufficient_items:
-			error_msg = _("Insufficient stock for the following items:") + "<br><br>"
-			for item in insufficient_items:
-				error_msg += _("• Item: {0} | Warehouse: {1} | Available: {2} | Required: {3}").format(
-					item["item"], item["warehouse"], item["available"], item["required"]
-				) + "<br>"
-			frappe.throw(error_msg, title=_("Stock Not Available"))
+	def _mark_invoiced(self, invoice_name):
+		"""Link the invoice and move to Invoiced in one UPDATE (db_set: no doc events)"""
+		self.db_set({"sales_invoice": invoice_name, "status": "Invoiced"})
+		# db_set skips doc events; the invoiced parts are no longer held for this card.
+		release_reservations(self.name)
 
+		# Add comment to track the change
+		self.add_comment("Comment", _("Sales Invoice {0} created and Job Card status changed to Invoiced").format(invoice_name))
+
+	def validate_stock_availability(self):
+		"""Check if sufficient stock exists for all part items, net of other open job cards' reservations"""
+		validate_job_card_stock(self)
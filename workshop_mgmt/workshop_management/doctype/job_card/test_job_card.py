@@ -0,0 +1,95 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+import os
+import sys
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from workshop_mgmt.tests.utils import make_appointment, make_inspection, make_job_card
+from workshop_mgmt.workshop_management import link_cache, link_sync
+
+_LINKED = ("Vehicle", "Service Appointment", "Vehicle Inspection")
+_LINKED_TABLES = tuple(f"`tab{doctype}`" for doctype in _LINKED)
+
+# Statements on the linked tables a steady-state save issued from the workshop hooks before the shared
+# lookups: Vehicle, Service Appointment and Vehicle Inspection reads in validate, the appointment and
+# inspection back-link reads in on_update and the dashboard's appointment lookup in on_change.
+_BASELINE_LINK_STATEMENTS = 6
+_LINK_STATEMENT_BUDGET = _BASELINE_LINK_STATEMENTS // 2
+
+_FRAPPE_PATH = os.path.dirname(frappe.__file__)
+_APP_PATH = frappe.get_app_path("workshop_mgmt")
+
+
+def _issued_by_app(frame) -> bool:
+	"""Whether the innermost caller outside frappe is app code (not framework work a test triggers)."""
+	while frame and frame.f_code.co_filename.startswith(_FRAPPE_PATH):
+		frame = frame.f_back
+	if not frame:
+		return False
+	path = frame.f_code.co_filename
+	return path.startswith(_APP_PATH) and not os.path.basename(path).startswith("test_")
+
+
+class TestJobCard(FrappeTestCase):
+	def setUp(self):
+		appointment = make_appointment("2031-04-07 09:00:00", "2031-04-07 10:00:00")
+		self.inspection = make_inspection(appointment)
+		self.job_card = make_job_card(appointment, self.inspection)
+		self.appointment = appointment.name
+		link_sync.flush()
+		link_cache.clear()
+
+	def test_links_are_written_back(self):
+		name = self.job_card.name
+		self.assertEqual(frappe.db.get_value("Service Appointment", self.appointment, "job_card"), name)
+		self.assertEqual(frappe.db.get_value("Vehicle Inspection", self.inspection, "job_card"), name)
+
+	def test_save_prefetches_each_linked_doctype_once(self):
+		doc = frappe.get_doc("Job Card", self.job_card.name)
+		with patch.object(frappe, "get_all", wraps=frappe.get_all) as get_all:
+			doc.save()
+
+		header_queries = [
+			call.args[0]
+			for call in get_all.call_args_list
+			if call.args
+			and call.args[0] in _LINKED
+			and call.kwargs.get("fields") == ["name", *link_cache._HEADER_FIELDS[call.args[0]]]
+		]
+		self.assertEqual(sorted(header_queries), sorted(_LINKED))
+
+	def test_unchanged_links_issue_no_update(self):
+		doc = frappe.get_doc("Job Card", self.job_card.name)
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+			doc.save()
+			link_sync.flush()
+
+		updates = [
+			str(call.args[0])
+			for call in sql.call_args_list
+			if "update `tabService Appointment`" in str(call.args[0])
+			or "update `tabVehicle Inspection`" in str(call.args[0])
+		]
+		self.assertEqual(updates, [])
+
+	def test_save_link_statement_budget(self):
+		doc = frappe.get_doc("Job Card", self.job_card.name)
+		real_sql = frappe.db.sql
+		statements = []
+
+		def sql(query, *args, **kwargs):
+			if _issued_by_app(sys._getframe(1)):
+				statements.append(str(query))
+			return real_sql(query, *args, **kwargs)
+
+		with patch.object(frappe.db, "sql", new=sql):
+			doc.save()
+			link_sync.flush()
+
+		# Framework link validation is left out: it runs from Document.save, not from the hooks.
+		linked = [q for q in statements if any(table in q for table in _LINKED_TABLES)]
+		self.assertLessEqual(len(linked), _LINK_STATEMENT_BUDGET, "\n\n".join(linked))
@@ -14,6 +14,16 @@ frappe.ui.form.on("Service Appointment", {
 			}
 		});
 		
+		frm.set_query("bay", function() {
+			return {
+				filters: {
+					resource_type: "Bay",
+					enabled: 1,
+					company: frm.doc.company || undefined
+				}
+			};
+		});
+		
 		// Show action buttons only when appointment is saved and status is Checked-In
 		if (!frm.is_new() && frm.doc.status === "Checked-In") {
 			// Add Create Inspection button if no inspection exists
@@ -5,10 +5,16 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import get_datetime
 
+from workshop_mgmt.workshop_management.appointment_overlap import validate_appointment_overlap
+from workshop_mgmt.workshop_management.link_cache import get_header, prefetch
+
 
 class ServiceAppointment(Document):
 	def validate(self):
 		"""Validate Service Appointment data"""
+		prefetch({"Vehicle": [self.vehicle], "Job Card": [self.job_card]})
+		self.set_company()
+
 		# Validate scheduled_end is after scheduled_start
 		if self.scheduled_start and self.scheduled_end:
 			start_dt = get_datetime(self.scheduled_start)
@@ -16,15 +22,27 @@ class ServiceAppointment(Document):
 			
 			if end_dt <= start_dt:
 				frappe.throw(frappe._("Scheduled End must be after Scheduled Start"))
+
+			# Same vehicle, advisor or bay booked twice over the same time
+			validate_appointment_overlap(self)
 		
 		# Validate vehicle belongs to customer
 		if self.vehicle and self.customer:
-			vehicle_customer = frappe.db.get_value("Vehicle", self.vehicle, "customer")
+			vehicle = get_header("Vehicle", self.vehicle)
+			vehicle_customer = vehicle.customer if vehicle else None
 			if vehicle_customer != self.customer:
 				frappe.throw(frappe._("Vehicle {0} does not belong to Customer {1}").format(
 					self.vehicle, self.customer
 				))
 
-
-
-
+	def set_company(self):
+		"""Default the branch from the linked Job Card, else the user's / global default company."""
+		if self.company:
+			return
+		if self.job_card:
+			job_card = get_header("Job Card", self.job_card)
+			self.company = job_card.company if job_card else None
+		if not self.company:
+			self.company = frappe.defaults.get_user_default("Company") or frappe.defaults.get_global_default(
+				"company"
+			)
@@ -0,0 +1,35 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from workshop_mgmt.api import appointment_check_in
+from workshop_mgmt.tests.utils import make_appointment
+
+
+class TestServiceAppointment(FrappeTestCase):
+	def test_overlapping_booking_is_refused(self):
+		make_appointment("2031-03-03 09:00:00", "2031-03-03 10:00:00")
+		with self.assertRaises(frappe.ValidationError):
+			make_appointment("2031-03-03 09:30:00", "2031-03-03 10:30:00")
+
+	def test_check_in_of_already_overlapping_appointment(self):
+		make_appointment("2031-03-04 09:00:00", "2031-03-04 10:00:00")
+		later = make_appointment("2031-03-04 11:00:00", "2031-03-04 12:00:00")
+		# A double booking from before the check existed: written without validation.
+		frappe.db.set_value(
+			"Service Appointment",
+			later.name,
+			{"scheduled_start": "2031-03-04 09:30:00", "scheduled_end": "2031-03-04 10:30:00"},
+		)
+
+		self.assertEqual(appointment_check_in(later.name)["status"], "Checked-In")
+
+	def test_reopening_cancelled_appointment_is_checked(self):
+		make_appointment("2031-03-05 09:00:00", "2031-03-05 10:00:00")
+		cancelled = make_appointment("2031-03-05 09:00:00", "2031-03-05 10:00:00", status="Cancelled")
+
+		cancelled.status = "Scheduled"
+		with self.assertRaises(frappe.ValidationError):
+			cancelled.save()
@@ -99,6 +99,7 @@ function load_standard_checklist(frm) {
 	const apply = () => {
 		frappe.call({
 			method: "workshop_mgmt.workshop_management.vehicle_inspection_template.get_standard_vehicle_inspection_checklist",
+			args: { vehicle: frm.doc.vehicle || null },
 			callback: (r) => {
 				if (!r.message || !r.message.length) {
 					return;
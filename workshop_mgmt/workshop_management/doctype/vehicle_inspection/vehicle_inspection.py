@@ -5,18 +5,18 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import flt
 
+from workshop_mgmt.workshop_management import link_sync
+from workshop_mgmt.workshop_management.link_cache import get_header, prefetch
+
 
 class VehicleInspection(Document):
 	def validate(self):
 		"""Fetch vehicle and customer from linked documents; sum optional line estimates."""
+		prefetch({"Job Card": [self.job_card], "Service Appointment": [self.appointment]})
+
 		# Fetch from Job Card if set
 		if self.job_card:
-			job_card = frappe.db.get_value(
-				"Job Card",
-				self.job_card,
-				["vehicle", "customer", "appointment"],
-				as_dict=True,
-			)
+			job_card = get_header("Job Card", self.job_card)
 			if job_card:
 				if not self.vehicle:
 					self.vehicle = job_card.vehicle
@@ -27,8 +27,7 @@ class VehicleInspection(Document):
 		
 		# Fetch from Appointment if set
 		if self.appointment:
-			appointment = frappe.db.get_value("Service Appointment", self.appointment,
-				["vehicle", "customer"], as_dict=True)
+			appointment = get_header("Service Appointment", self.appointment)
 			if appointment:
 				if not self.vehicle:
 					self.vehicle = appointment.vehicle
@@ -40,10 +39,17 @@ class VehicleInspection(Document):
 
 	def get_inspection_results(self):
 		"""Structured rows for integrations / printing (check_item, status, notes, recommended service, optional price)."""
+		rows = self.inspection_items or []
+		codes = list({r.recommended_service for r in rows if r.recommended_service})
+		item_names = (
+			dict(frappe.get_all("Item", filters={"name": ["in", codes]}, fields=["name", "item_name"], as_list=True))
+			if codes
+			else {}
+		)
 		out = []
-		for r in self.inspection_items or []:
+		for r in rows:
 			rec_item = r.recommended_service or None
-			rec_name = frappe.db.get_value("Item", rec_item, "item_name") if rec_item else None
+			rec_name = item_names.get(rec_item) if rec_item else None
 			out.append(
 				{
 					"section": r.section,
@@ -67,19 +73,13 @@ class VehicleInspection(Document):
 	
 	def update_appointment_link(self):
 		"""Update the inspection field in the linked Service Appointment"""
-		if self.appointment:
-			# Check if appointment doesn't already have this inspection linked
-			current_inspection = frappe.db.get_value("Service Appointment", 
-				self.appointment, "inspection")
-			if current_inspection != self.name:
-				frappe.db.set_value("Service Appointment", self.appointment, 
-					"inspection", self.name, update_modified=False)
+		link_sync.queue("Service Appointment", self.appointment, {"inspection": self.name})
 	
 	def on_trash(self):
 		"""Clear inspection link from appointment when deleted"""
-		if self.appointment:
-			frappe.db.set_value("Service Appointment", self.appointment, 
-				"inspection", None, update_modified=False)
+		link_sync.queue("Service Appointment", self.appointment, {"inspection": None})
+		# Not deferred: delete_doc checks for documents still linking here right after on_trash.
+		link_sync.flush()
 
 
 @frappe.whitelist()
@@ -0,0 +1,28 @@
+// Copyright (c) 2026, Infoney and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Workshop Invoice Run", {
+	onload(frm) {
+		frappe.realtime.on("workshop_invoice_run", (data) => {
+			if (data && data.run === frm.doc.name) {
+				frm.reload_doc();
+			}
+		});
+	},
+
+	refresh(frm) {
+		if (frm.is_new()) {
+			return;
+		}
+		const finished = frm.doc.status === "Completed";
+		const pending = (frm.doc.items || []).some((row) => row.status === "Pending");
+		if (!finished && pending) {
+			frm.add_custom_button(__("Resume"), () => {
+				frm.call("resume").then(() => frm.reload_doc());
+			});
+		}
+		if (["Queued", "Running"].includes(frm.doc.status)) {
+			frm.dashboard.set_headline(__("Invoicing in the background; this form refreshes when the run finishes."));
+		}
+	},
+});
@@ -0,0 +1,196 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+import time
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import now, strip_html, time_diff_in_seconds
+
+from workshop_mgmt.workshop_management import link_sync
+from workshop_mgmt.workshop_management.invoicing import JOB_TIMEOUT, _claim_key
+from workshop_mgmt.workshop_management.link_cache import clear as clear_link_headers
+from workshop_mgmt.workshop_management.stock_availability import allocate_stock, get_part_requirements
+
+ITEM_DOCTYPE = "Workshop Invoice Run Item"
+CHUNK_SIZE = 10
+_SAVEPOINT = "workshop_invoice_run"
+
+
+class WorkshopInvoiceRun(Document):
+	"""Invoices every Ready to Invoice Job Card of a company up to a date on the long queue.
+
+	Rows are fixed when the run is created and move from Pending to Invoiced / Failed / Skipped in
+	committed chunks, so a run interrupted by a crash or worker restart is resumed from its Pending rows.
+	"""
+
+	def before_insert(self):
+		self.status = "Queued"
+		self.set("items", [])
+		cards = frappe.get_all(
+			"Job Card",
+			filters={
+				"company": self.company,
+				"status": "Ready to Invoice",
+				"posting_date": ["<=", self.posting_date],
+				"sales_invoice": ["is", "not set"],
+				"docstatus": ["<", 2],
+			},
+			fields=["name", "customer"],
+			order_by="posting_date asc, name asc",
+		)
+		if not cards:
+			frappe.throw(
+				_("No Ready to Invoice Job Cards for {0} up to {1}.").format(self.company, self.posting_date)
+			)
+		for card in cards:
+			self.append("items", {"job_card": card.name, "customer": card.customer, "status": "Pending"})
+		self.total_cards = len(cards)
+
+	def after_insert(self):
+		self.enqueue()
+
+	def enqueue(self):
+		frappe.enqueue(
+			"workshop_mgmt.workshop_management.doctype.workshop_invoice_run.workshop_invoice_run.process_invoice_run",
+			queue="long",
+			timeout=JOB_TIMEOUT * 3,
+			job_id=f"workshop_invoice_run::{self.name}",
+			deduplicate=True,
+			enqueue_after_commit=True,
+			run=self.name,
+		)
+
+	@frappe.whitelist()
+	def resume(self):
+		"""Queue the run again for its Pending rows (after a crash, a worker restart or a timeout, or for
+		cards another invoice job was busy with)."""
+		self.check_permission("write")
+		if self.status == "Completed":
+			frappe.throw(_("Invoice Run {0} has already finished.").format(self.name))
+		if not frappe.db.exists(ITEM_DOCTYPE, {"parent": self.name, "status": "Pending"}):
+			frappe.throw(_("Invoice Run {0} has no pending Job Cards.").format(self.name))
+		self.db_set("status", "Queued")
+		self.enqueue()
+
+
+def _pending_rows(run: str) -> list:
+	return frappe.get_all(
+		ITEM_DOCTYPE,
+		filters={"parent": run, "parenttype": "Workshop Invoice Run", "status": "Pending"},
+		fields=["name", "job_card"],
+		order_by="idx asc",
+	)
+
+
+def _set_row(row_name: str, values: dict) -> None:
+	frappe.db.set_value(ITEM_DOCTYPE, row_name, values, update_modified=False)
+
+
+def _skip_short_cards(rows: list) -> list:
+	"""Prevalidate stock for every pending card in one set-based pass; mark the short ones Skipped.
+
+	Cards draw on stock in run order, so two cards competing for the last units do not both pass.
+	"""
+	order = [row.job_card for row in rows]
+	shortages = allocate_stock(get_part_requirements(order), order)
+	for row in rows:
+		short = shortages.get(row.job_card)
+		if short:
+			_set_row(
+				row.name,
+				{
+					"status": "Skipped",
+					"error": _("Insufficient stock: {0}").format(
+						", ".join(
+							_("{0} in {1} ({2} available, {3} required)").format(
+								s["item_code"], s["warehouse"], s["available"], s["required"]
+							)
+							for s in short
+						)
+					),
+				},
+			)
+	frappe.db.commit()
+	return [row for row in rows if row.job_card not in shortages]
+
+
+def _invoice_card(job_card: str) -> dict:
+	"""Invoice one card under a savepoint; the outcome is written to its row in the same transaction."""
+	cache = frappe.cache()
+	if not cache.set(_claim_key(job_card), 1, nx=True, ex=JOB_TIMEOUT):
+		# Left Pending: the other job may still fail, so Resume tries the card again.
+		return {"status": "Pending", "error": _("An invoice for this Job Card is already being created.")}
+	started = time.perf_counter()
+	link_sync.flush()
+	frappe.db.savepoint(_SAVEPOINT)
+	try:
+		doc = frappe.get_doc("Job Card", job_card)
+		doc.flags.stock_prevalidated = True
+		outcome = {"status": "Invoiced", "sales_invoice": doc.create_sales_invoice(), "error": None}
+	except Exception as e:
+		frappe.db.rollback(save_point=_SAVEPOINT)
+		link_sync.discard()
+		clear_link_headers()
+		outcome = {"status": "Failed", "error": strip_html(str(e)) or _("Invoice creation failed.")}
+	finally:
+		cache.delete(_claim_key(job_card))
+		frappe.clear_messages()
+	outcome["duration_ms"] = int((time.perf_counter() - started) * 1000)
+	return outcome
+
+
+def _update_summary(run: str, **values) -> dict:
+	counts = dict(
+		frappe.db.sql(
+			f"select status, count(*) from `tab{ITEM_DOCTYPE}` where parent = %s group by status",
+			run,
+		)
+	)
+	values.update(
+		invoiced=counts.get("Invoiced", 0),
+		failed=counts.get("Failed", 0),
+		skipped=counts.get("Skipped", 0),
+	)
+	frappe.db.set_value("Workshop Invoice Run", run, values)
+	return counts
+
+
+def process_invoice_run(run: str):
+	"""Worker: invoice the run's Pending cards CHUNK_SIZE at a time, committing after every chunk.
+
+	A card's row is updated in the same transaction as its invoice, so after a crash every row still
+	Pending is exactly the work left; create_sales_invoice links an invoice that already exists.
+	"""
+	doc = frappe.get_doc("Workshop Invoice Run", run)
+	started_at = doc.started_at or now()
+	_update_summary(run, status="Running", started_at=started_at)
+	frappe.db.commit()
+
+	try:
+		rows = _skip_short_cards(_pending_rows(run))
+		for offset in range(0, len(rows), CHUNK_SIZE):
+			for row in rows[offset : offset + CHUNK_SIZE]:
+				_set_row(row.name, _invoice_card(row.job_card))
+			_update_summary(run)
+			frappe.db.commit()
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(frappe.get_traceback(), _("Workshop Invoice Run Error"))
+		_update_summary(run, status="Failed")
+		frappe.db.commit()
+		raise
+
+	finished_at = now()
+	counts = _update_summary(
+		run,
+		finished_at=finished_at,
+		duration_seconds=time_diff_in_seconds(finished_at, started_at),
+	)
+	status = "Completed with Errors" if counts.get("Failed") or counts.get("Pending") else "Completed"
+	frappe.db.set_value("Workshop Invoice Run", run, "status", status)
+	frappe.db.commit()
+	frappe.publish_realtime(
+		"workshop_invoice_run", {"run": run, "status": status, **counts}, user=frappe.session.user
+	)
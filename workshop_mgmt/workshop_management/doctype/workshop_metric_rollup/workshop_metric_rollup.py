@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class WorkshopMetricRollup(Document):
+	"""One aggregate row per (metric, company, day, dimension); maintained by dashboard_rollup."""
+
+	pass
+
+
+def on_doctype_update():
+	# Company-leading after metric: dashboard reads are partitioned by branch, then ranged by date.
+	frappe.db.add_index("Workshop Metric Rollup", ["metric", "company", "metric_date"])
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Infoney and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Workshop Resource", {
+	refresh(frm) {
+		frm.set_query("user", () => ({ filters: { enabled: 1, user_type: "System User" } }));
+	},
+});
@@ -0,0 +1,26 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import to_timedelta
+
+from workshop_mgmt.workshop_management.slot_availability import invalidate_resources
+
+
+class WorkshopResource(Document):
+	"""A bay or service advisor with weekly working hours; capacity for appointment slot availability."""
+
+	def validate(self):
+		if self.resource_type != "Advisor":
+			self.user = None
+		for row in self.working_hours:
+			if to_timedelta(row.end_time) <= to_timedelta(row.start_time):
+				frappe.throw(_("Row {0}: working hours must end after they start.").format(row.idx))
+
+	def on_update(self):
+		invalidate_resources(self)
+
+	def on_trash(self):
+		invalidate_resources(self)
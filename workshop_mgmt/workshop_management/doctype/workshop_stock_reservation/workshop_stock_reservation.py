@@ -0,0 +1,16 @@
+# Copyright (c) 2026, Infoney and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class WorkshopStockReservation(Document):
+	"""Part qty promised by one open Job Card per (item, warehouse); maintained by stock_availability."""
+
+	pass
+
+
+def on_doctype_update():
+	# Availability reads sum reservations per (item, warehouse) pair.
+	frappe.db.add_index("Workshop Stock Reservation", ["item_code", "warehouse"])
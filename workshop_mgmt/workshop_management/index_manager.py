@@ -0,0 +1,353 @@
+# Copyright (c) 2026, Infoney and contributors
+# Composite indexes for workshop access paths, created from after_migrate, plus an EXPLAIN-based plan check.
+
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, getdate, now, nowdate
+
+# (doctype, index name, columns). Leading columns follow the equality filters, then the range / sort column.
+WORKSHOP_INDEXES = (
+	("Service Appointment", "wm_appt_status_start", ("status", "scheduled_start")),
+	("Service Appointment", "wm_appt_company_start", ("company", "scheduled_start")),
+	("Service Appointment", "wm_appt_vehicle_start", ("vehicle", "scheduled_start")),
+	("Service Appointment", "wm_appt_advisor_start", ("service_advisor", "scheduled_start")),
+	("Service Appointment", "wm_appt_bay_start", ("bay", "scheduled_start")),
+	("Job Card", "wm_jc_status_posting", ("status", "posting_date")),
+	("Job Card", "wm_jc_company_posting", ("company", "posting_date")),
+	("Job Card", "wm_jc_company_status_posting", ("company", "status", "posting_date")),
+	("Job Card", "wm_jc_customer_posting", ("customer", "posting_date")),
+	("Job Card", "wm_jc_status_modified", ("status", "modified")),
+	("Vehicle", "wm_vehicle_customer", ("customer",)),
+	("Vehicle Inspection", "wm_vi_appointment", ("appointment",)),
+	("Vehicle Inspection", "wm_vi_vehicle", ("vehicle",)),
+	("Sales Invoice", "wm_si_job_card", ("custom_job_card", "docstatus")),
+	("Sales Invoice", "wm_si_company_posting", ("company", "posting_date")),
+)
+
+# Indexes created by earlier versions and no longer wanted: (doctype, index name). Dropped on migrate.
+OBSOLETE_INDEXES = (
+	# The scheduled_start search index serves the same prefix; (status, scheduled_start) covers the dashboard.
+	("Service Appointment", "wm_appt_start_status"),
+)
+
+
+def _existing_index_columns(doctype: str) -> dict[str, tuple[str, ...]]:
+	"""Index name -> ordered column tuple for one table."""
+	out: dict[str, list[tuple[int, str]]] = {}
+	for row in frappe.db.sql(f"show index from `tab{doctype}`", as_dict=True):
+		out.setdefault(row.Key_name, []).append((cint(row.Seq_in_index), row.Column_name))
+	return {name: tuple(col for _seq, col in sorted(cols)) for name, cols in out.items()}
+
+
+def _has_covering_index(existing: dict, columns: tuple[str, ...]) -> bool:
+	"""True when some index starts with exactly these columns (a wider index serves the same prefix)."""
+	return any(cols[: len(columns)] == columns for cols in existing.values())
+
+
+def ensure_workshop_indexes() -> list[str]:
+	"""Create missing indexes from WORKSHOP_INDEXES, drop OBSOLETE_INDEXES, and return the ones still missing."""
+	for doctype, index_name in OBSOLETE_INDEXES:
+		if frappe.db.table_exists(doctype) and index_name in _existing_index_columns(doctype):
+			frappe.db.sql_ddl(f"alter table `tab{doctype}` drop index `{index_name}`")
+
+	missing = []
+	for doctype, index_name, columns in WORKSHOP_INDEXES:
+		if not frappe.db.table_exists(doctype):
+			continue
+		if not all(frappe.db.has_column(doctype, col) for col in columns):
+			continue
+		if _has_covering_index(_existing_index_columns(doctype), columns):
+			continue
+		try:
+			frappe.db.add_index(doctype, list(columns), index_name)
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), f"Workshop index {index_name}")
+
+		if not _has_covering_index(_existing_index_columns(doctype), columns):
+			missing.append(f"{doctype}: {index_name} ({', '.join(columns)})")
+
+	if missing:
+		frappe.log_error("\n".join(missing), "Workshop indexes missing after migrate")
+	return missing
+
+
+def _plan_queries() -> list[tuple[str, str, tuple]]:
+	"""(label, query, params) for the selective workshop queries that must be served by an index."""
+	today = getdate(nowdate())
+	tomorrow = add_days(today, 1)
+	month_start = today.replace(day=1)
+	return [
+		(
+			"Upcoming appointments (dashboard)",
+			"""
+			select name, customer, status, scheduled_start
+			from `tabService Appointment`
+			where scheduled_start >= %s
+				and status not in ('Completed', 'Cancelled', 'No-Show')
+			order by scheduled_start asc
+			limit 6
+			""",
+			(today,),
+		),
+		(
+			"Appointments scheduled today",
+			"""
+			select count(*)
+			from `tabService Appointment`
+			where scheduled_start >= %s and scheduled_start < %s
+			""",
+			(today, tomorrow),
+		),
+		(
+			"Upcoming appointments of a branch (dashboard)",
+			"""
+			select name, customer, status, scheduled_start
+			from `tabService Appointment`
+			where company in %s and scheduled_start >= %s
+			order by scheduled_start asc
+			limit 6
+			""",
+			(("_explain_company",), today),
+		),
+		(
+			"Bookings of a branch over a date range (slot availability)",
+			"""
+			select scheduled_start, scheduled_end, service_advisor, bay
+			from `tabService Appointment`
+			where company = %s and status not in ('Cancelled', 'No-Show')
+				and scheduled_start < %s and scheduled_end > %s
+			""",
+			("_explain_company", add_days(today, 7), today),
+		),
+		(
+			"Bookings of one vehicle overlapping a new appointment (double-booking check)",
+			"""
+			select name, scheduled_start, scheduled_end
+			from `tabService Appointment`
+			where vehicle = %s and scheduled_start < %s and scheduled_end > %s
+				and status not in ('Cancelled', 'No-Show')
+			""",
+			("_explain_vehicle", tomorrow, today),
+		),
+		(
+			"Job Cards of a branch by status (report)",
+			"""
+			select name
+			from `tabJob Card`
+			where company in %s and status = %s and posting_date >= %s
+			order by posting_date desc
+			""",
+			(("_explain_company",), "In Progress", month_start),
+		),
+		(
+			"Job-linked invoices of a branch (dashboard)",
+			"""
+			select name
+			from `tabSales Invoice`
+			where company in %s and posting_date >= %s and docstatus = 1
+			""",
+			(("_explain_company",), month_start),
+		),
+		(
+			"Job Cards by status and date (report)",
+			"""
+			select name
+			from `tabJob Card`
+			where status = %s and posting_date >= %s
+			""",
+			("In Progress", month_start),
+		),
+		(
+			"Job Cards by company and date (report)",
+			"""
+			select name
+			from `tabJob Card`
+			where company = %s and posting_date between %s and %s
+			""",
+			("_explain_company", month_start, today),
+		),
+		(
+			"Job Cards by customer",
+			"select name from `tabJob Card` where customer = %s order by posting_date desc",
+			("_explain_customer",),
+		),
+		(
+			"Vehicles of a customer",
+			"select name from `tabVehicle` where customer = %s",
+			("_explain_customer",),
+		),
+		(
+			"Inspections of an appointment",
+			"select name from `tabVehicle Inspection` where appointment = %s",
+			("_explain_appointment",),
+		),
+		(
+			"Inspections of a vehicle",
+			"select name from `tabVehicle Inspection` where vehicle = %s",
+			("_explain_vehicle",),
+		),
+		(
+			"Invoices of a job card",
+			"select name from `tabSales Invoice` where custom_job_card = %s and docstatus = 1",
+			("_explain_job_card",),
+		),
+	]
+
+
+def check_query_plans(raise_on_full_scan: bool = True) -> list[dict]:
+	"""EXPLAIN each listed query; report (and by default raise on) any full table scan.
+
+	Run against a realistically sized dataset (see seed_explain_dataset): on near-empty tables the
+	optimizer legitimately prefers scans.
+	"""
+	results = []
+	for label, query, params in _plan_queries():
+		plan = frappe.db.sql(f"explain {query}", params, as_dict=True)
+		full_scans = [row for row in plan if (row.get("type") or "").upper() == "ALL"]
+		results.append(
+			{
+				"query": label,
+				"plan": [
+					{
+						"table": row.get("table"),
+						"type": row.get("type"),
+						"key": row.get("key"),
+						"rows": row.get("rows"),
+					}
+					for row in plan
+				],
+				"full_scan": bool(full_scans),
+			}
+		)
+
+	failed = [r["query"] for r in results if r["full_scan"]]
+	if failed and raise_on_full_scan:
+		frappe.throw(
+			_("Full table scan in workshop queries: {0}").format(", ".join(failed)),
+			title=_("Query plan check failed"),
+		)
+	return results
+
+
+_EXPLAIN_PREFIX = "EXPLAIN-SEED-"
+_EXPLAIN_DOCTYPES = ("Service Appointment", "Job Card", "Vehicle", "Vehicle Inspection", "Sales Invoice")
+
+
+def seed_explain_dataset(rows: int = 100000):
+	"""Insert synthetic rows into workshop tables for the plan check (developer mode only).
+
+	Rows bypass controllers (bulk_insert) and are named with a fixed prefix so purge_explain_dataset
+	can remove them.
+	"""
+	if not frappe.conf.developer_mode:
+		frappe.throw(_("Seeding the EXPLAIN dataset is only allowed in developer mode."))
+
+	rows = cint(rows) or 100000
+	today = getdate(nowdate())
+	appt_statuses = ("Scheduled", "Checked-In", "In Progress", "Completed", "Cancelled", "No-Show")
+	job_statuses = ("Draft", "Approved", "In Progress", "Ready to Invoice", "Invoiced", "Closed")
+	common = ("creation", "modified", "owner", "modified_by")
+	ts = now()
+	stamp = (ts, ts, "Administrator", "Administrator")
+
+	appointments, job_cards, vehicles, inspections, invoices = [], [], [], [], []
+	for i in range(rows):
+		day = add_days(today, (i % 730) - 365)
+		company = f"{_EXPLAIN_PREFIX}CO-{i % 6}"
+		customer = f"{_EXPLAIN_PREFIX}CUST-{i % 5000}"
+		vehicle = f"{_EXPLAIN_PREFIX}VEH-{i % 20000}"
+		appointment = f"{_EXPLAIN_PREFIX}APT-{i}"
+		appointments.append(
+			(
+				appointment,
+				*stamp,
+				company,
+				customer,
+				vehicle,
+				appt_statuses[i % 6],
+				f"{day} 09:00:00",
+				f"{day} 10:00:00",
+			)
+		)
+		job_card = f"{_EXPLAIN_PREFIX}JOB-{i}"
+		job_cards.append(
+			(
+				job_card,
+				*stamp,
+				company,
+				customer,
+				vehicle,
+				job_statuses[i % 6],
+				day,
+			)
+		)
+		inspections.append((f"{_EXPLAIN_PREFIX}INS-{i}", *stamp, appointment, customer, vehicle, day))
+		if i < 20000:
+			vehicles.append((vehicle, *stamp, customer, vehicle))
+		# A third of the cards invoiced; the rest of the invoice table is what the filters must skip.
+		invoices.append(
+			(
+				f"{_EXPLAIN_PREFIX}SINV-{i}",
+				*stamp,
+				company,
+				customer,
+				day,
+				1 if i % 3 == 0 else 0,
+				job_card if i % 3 == 0 else None,
+				1000,
+				0,
+			)
+		)
+
+	frappe.db.bulk_insert(
+		"Service Appointment",
+		("name", *common, "company", "customer", "vehicle", "status", "scheduled_start", "scheduled_end"),
+		appointments,
+		ignore_duplicates=True,
+	)
+	frappe.db.bulk_insert(
+		"Job Card",
+		("name", *common, "company", "customer", "vehicle", "status", "posting_date"),
+		job_cards,
+		ignore_duplicates=True,
+	)
+	frappe.db.bulk_insert(
+		"Vehicle",
+		("name", *common, "customer", "license_plate"),
+		vehicles,
+		ignore_duplicates=True,
+	)
+	frappe.db.bulk_insert(
+		"Vehicle Inspection",
+		("name", *common, "appointment", "customer", "vehicle", "inspection_date"),
+		inspections,
+		ignore_duplicates=True,
+	)
+	frappe.db.bulk_insert(
+		"Sales Invoice",
+		(
+			"name",
+			*common,
+			"company",
+			"customer",
+			"posting_date",
+			"docstatus",
+			"custom_job_card",
+			"base_grand_total",
+			"outstanding_amount",
+		),
+		invoices,
+		ignore_duplicates=True,
+	)
+	for doctype in _EXPLAIN_DOCTYPES:
+		frappe.db.sql(f"analyze table `tab{doctype}`")
+	frappe.db.commit()
+
+
+def purge_explain_dataset():
+	"""Delete rows created by seed_explain_dataset."""
+	for doctype in _EXPLAIN_DOCTYPES:
+		frappe.db.sql(f"delete from `tab{doctype}` where name like %s", (f"{_EXPLAIN_PREFIX}%",))
+	frappe.db.commit()
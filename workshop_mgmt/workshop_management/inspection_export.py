@@ -0,0 +1,142 @@
+# Copyright (c) 2026, Infoney and contributors
+# Streaming NDJSON / CSV export of inspection result rows across many Vehicle Inspections.
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+EXPORT_PAGE_SIZE = 200
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+COLUMNS = (
+	"inspection",
+	"inspection_date",
+	"customer",
+	"vehicle",
+	"appointment",
+	"job_card",
+	"idx",
+	"section",
+	"check_item",
+	"status",
+	"notes",
+	"recommended_service",
+	"recommended_service_name",
+	"estimated_price",
+)
+
+
+def _as_filter_list(filters) -> list:
+	"""Desk-style filters ({field: value | [op, value]} or [[field, op, value], ...]) as a list."""
+	filters = frappe.parse_json(filters) if isinstance(filters, str) else filters
+	if isinstance(filters, dict):
+		return [[field, *(value if isinstance(value, (list, tuple)) else ("=", value))] for field, value in filters.items()]
+	return list(filters or [])
+
+
+def iter_inspection_rows(filters=None, page_size: int = EXPORT_PAGE_SIZE):
+	"""Yield one dict per inspection line, in (inspection, idx) order, a page of inspections at a time.
+
+	Pages are keyset-paginated on the inspection name through get_list (so the user's permissions apply),
+	and each page's lines come from one join of the inspections, their Inspection Item rows and Item
+	(for the recommended service name). Memory stays bounded by page_size whatever the export size.
+	"""
+	base = _as_filter_list(filters)
+	last = ""
+	while True:
+		names = frappe.get_list(
+			"Vehicle Inspection",
+			filters=[*base, ["name", ">", last]],
+			pluck="name",
+			order_by="name asc",
+			limit_page_length=page_size,
+		)
+		if not names:
+			return
+		yield from frappe.db.sql(
+			"""
+			select vi.name as inspection, vi.inspection_date, vi.customer, vi.vehicle, vi.appointment,
+				vi.job_card, ii.idx, ii.section, ii.check_item, ii.status, ii.notes, ii.recommended_service,
+				it.item_name as recommended_service_name, ii.estimated_price
+			from `tabVehicle Inspection` vi
+			inner join `tabInspection Item` ii
+				on ii.parent = vi.name and ii.parenttype = 'Vehicle Inspection'
+				and ii.parentfield = 'inspection_items'
+			left join `tabItem` it on it.name = ii.recommended_service
+			where vi.name in %(names)s
+			order by vi.name, ii.idx
+			""",
+			{"names": tuple(names)},
+			as_dict=True,
+		)
+		if len(names) < page_size:
+			return
+		last = names[-1]
+
+
+def _ndjson_lines(rows):
+	for row in rows:
+		yield json.dumps({c: row.get(c) for c in COLUMNS}, default=str, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(rows):
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+
+	def flush():
+		value = buffer.getvalue()
+		buffer.seek(0)
+		buffer.truncate(0)
+		return value
+
+	writer.writerow(COLUMNS)
+	yield flush()
+	for row in rows:
+		writer.writerow(["" if row.get(c) is None else row.get(c) for c in COLUMNS])
+		yield flush()
+
+
+def _stream(site: str, user: str, fmt: str, filters, page_size: int):
+	"""Response body. The WSGI server iterates it after the request has released its database
+	connection, so it opens its own (as the requesting user) unless a request is still active."""
+	own = not getattr(frappe.local, "initialised", False)
+	if own:
+		frappe.init(site=site)
+		frappe.connect()
+		frappe.set_user(user)
+	try:
+		rows = iter_inspection_rows(filters, page_size)
+		yield from (_csv_lines(rows) if fmt == "csv" else _ndjson_lines(rows))
+	finally:
+		if own:
+			frappe.destroy()
+
+
+@frappe.whitelist()
+def export_inspection_results(filters=None, format="ndjson", page_size=EXPORT_PAGE_SIZE):
+	"""Stream inspection result rows for every Vehicle Inspection matching filters as NDJSON or CSV.
+
+	One row per inspection line with the inspection header fields repeated (see COLUMNS); rows are
+	written as they are read, so nightly integrations can export any number of inspections.
+	"""
+	from werkzeug.wrappers import Response
+
+	fmt = (format or "ndjson").lower()
+	if fmt not in EXPORT_FORMATS:
+		frappe.throw(_("Export format must be one of: {0}").format(", ".join(EXPORT_FORMATS)))
+	frappe.has_permission("Vehicle Inspection", "read", throw=True)
+	filters = _as_filter_list(filters)
+	page_size = min(max(cint(page_size) or EXPORT_PAGE_SIZE, 1), 1000)
+
+	return Response(
+		_stream(frappe.local.site, frappe.session.user, fmt, filters, page_size),
+		mimetype=EXPORT_FORMATS[fmt],
+		headers={"Content-Disposition": f'attachment; filename="inspection-results.{fmt}"'},
+		direct_passthrough=True,
+	)
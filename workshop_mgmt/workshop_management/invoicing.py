@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Infoney and contributors
+# Queued Sales Invoice generation from Job Cards: one job per card, status polled or pushed over realtime.
+
+from __future__ import annotations
+
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import now, strip_html
+
+REALTIME_EVENT = "workshop_invoice"
+
+_PREFIX = "workshop_invoice"
+# The claim outlives any sane job (the worker timeout is 20 minutes); the status record stays for a day.
+_CLAIM_TTL = 30 * 60
+_STATUS_TTL = 24 * 60 * 60
+JOB_TIMEOUT = 20 * 60
+
+
+def _claim_key(job_card: str) -> str:
+	return frappe.cache().make_key(f"{_PREFIX}:claim:{job_card}")
+
+
+def _status_key(job_card: str) -> str:
+	return f"{_PREFIX}:status:{job_card}"
+
+
+def _job_id(job_card: str) -> str:
+	return f"{_PREFIX}::{job_card}"
+
+
+def _set_status(job_card: str, status: str, **extra) -> dict:
+	record = {"job_card": job_card, "status": status, "updated_at": now(), **extra}
+	frappe.cache().set_value(_status_key(job_card), record, expires_in_sec=_STATUS_TTL)
+	return record
+
+
+def _abandon_claim(job_card: str) -> None:
+	"""after_rollback of the enqueueing request: the job was never queued, so free the card again."""
+	cache = frappe.cache()
+	cache.delete(_claim_key(job_card))
+	cache.delete_value(_status_key(job_card))
+
+
+def get_status(job_card: str) -> dict:
+	"""Last known run for the Job Card: queued / running / done / failed, or none."""
+	record = frappe.cache().get_value(_status_key(job_card), expires=True)
+	if record:
+		return record
+	invoice = frappe.db.get_value("Job Card", job_card, "sales_invoice")
+	if invoice:
+		return {"job_card": job_card, "status": "done", "sales_invoice": invoice}
+	return {"job_card": job_card, "status": "none"}
+
+
+@frappe.whitelist()
+def enqueue_sales_invoice(job_card: str) -> dict:
+	"""Queue Sales Invoice creation for a Job Card; the Job Card name is the idempotency key.
+
+	Repeated calls while a run is queued or running return that run's status instead of queueing
+	another, and a card that already has an invoice reports it as done. Pre-checks (status, lines,
+	existing invoice) run here so obvious errors come back synchronously.
+	"""
+	doc = frappe.get_doc("Job Card", job_card)
+	doc.check_permission("write")
+	if doc.sales_invoice:
+		return {"job_card": doc.name, "status": "done", "sales_invoice": doc.sales_invoice}
+	doc.validate_can_invoice()
+
+	if not frappe.cache().set(_claim_key(doc.name), 1, nx=True, ex=_CLAIM_TTL):
+		return get_status(doc.name)
+	# The job is enqueued after commit; if this request rolls back instead it never runs.
+	frappe.db.after_rollback.add(partial(_abandon_claim, doc.name))
+
+	record = _set_status(doc.name, "queued")
+	frappe.enqueue(
+		"workshop_mgmt.workshop_management.invoicing.generate_sales_invoice",
+		queue="long",
+		timeout=JOB_TIMEOUT,
+		job_id=_job_id(doc.name),
+		deduplicate=True,
+		enqueue_after_commit=True,
+		job_card=doc.name,
+	)
+	return record
+
+
+def generate_sales_invoice(job_card: str):
+	"""Worker: create (or link an already created) Sales Invoice, record the outcome and notify the user."""
+	_set_status(job_card, "running")
+	try:
+		invoice = frappe.get_doc("Job Card", job_card).create_sales_invoice()
+		frappe.db.commit()
+		record = _set_status(job_card, "done", sales_invoice=invoice)
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.clear_messages()
+		record = _set_status(job_card, "failed", error=strip_html(str(e)) or _("Invoice creation failed."))
+	finally:
+		frappe.cache().delete(_claim_key(job_card))
+	frappe.publish_realtime(REALTIME_EVENT, record, user=frappe.session.user)
+	return record
+
+
+@frappe.whitelist()
+def get_invoice_job_status(job_card: str) -> dict:
+	"""Polling endpoint for a queued invoice run (the same record is pushed as the workshop_invoice event)."""
+	frappe.has_permission("Job Card", "read", job_card, throw=True)
+	return get_status(job_card)
@@ -0,0 +1,83 @@
+# Copyright (c) 2026, Infoney and contributors
+# Request-scoped header lookups for the links Job Card, Vehicle Inspection and Service Appointment hooks follow.
+
+from __future__ import annotations
+
+import frappe
+
+# Header fields the save hooks read from each linked doctype; one row per document is fetched and memoized.
+_HEADER_FIELDS = {
+	"Vehicle": ("customer",),
+	"Service Appointment": (
+		"customer",
+		"vehicle",
+		"service_advisor",
+		"company",
+		"scheduled_start",
+		"job_card",
+		"inspection",
+	),
+	"Vehicle Inspection": ("customer", "vehicle", "appointment", "job_card"),
+	"Job Card": ("customer", "vehicle", "appointment", "company"),
+}
+
+
+def _store() -> dict[str, dict]:
+	store = getattr(frappe.local, "workshop_link_headers", None)
+	if store is None:
+		store = frappe.local.workshop_link_headers = {}
+	return store
+
+
+def prefetch(links: dict) -> None:
+	"""Load headers for {doctype: names} not yet memoized in this request, one query per doctype."""
+	store = _store()
+	for doctype, names in links.items():
+		cached = store.setdefault(doctype, {})
+		missing = {n for n in names if n and n not in cached}
+		if not missing:
+			continue
+		rows = frappe.get_all(
+			doctype,
+			filters={"name": ["in", list(missing)]},
+			fields=["name", *_HEADER_FIELDS[doctype]],
+		)
+		for row in rows:
+			cached[row.name] = row
+		for name in missing.difference(cached):
+			cached[name] = None
+
+
+def get_header(doctype: str, name: str | None):
+	"""Memoized header row (frappe._dict of the fields in _HEADER_FIELDS), or None for a missing document."""
+	if not name:
+		return None
+	prefetch({doctype: [name]})
+	return _store()[doctype][name]
+
+
+def get_memoized(doctype: str, name: str | None):
+	"""Header row already memoized in this request, without loading it (None when not loaded)."""
+	return _store().get(doctype, {}).get(name) if name else None
+
+
+def update_header(doctype: str, name: str, values: dict, when_changed=(), expect: dict | None = None) -> None:
+	"""Apply a pending link_sync write to the memoized row, under the same conditions the UPDATE uses."""
+	row = _store().get(doctype, {}).get(name)
+	if not row:
+		return
+	if any(row.get(f) != v for f, v in (expect or {}).items()):
+		return
+	if when_changed and all(row.get(f) == values[f] for f in when_changed):
+		return
+	row.update(values)
+
+
+def forget(doc, method=None):
+	"""doc_events on_update / on_trash: drop the memoized header of a saved or deleted document."""
+	_store().get(doc.doctype, {}).pop(doc.name, None)
+
+
+def clear() -> None:
+	"""Drop every memoized header, e.g. after rolling back to a savepoint."""
+	frappe.local.workshop_link_headers = {}
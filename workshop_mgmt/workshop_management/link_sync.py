@@ -0,0 +1,143 @@
+# Copyright (c) 2026, Infoney and contributors
+# Deferred, conditional back-link writes between Job Card, Service Appointment and Vehicle Inspection.
+
+from __future__ import annotations
+
+import frappe
+
+from workshop_mgmt.workshop_management.link_cache import get_memoized, update_header
+
+BULK_BATCH_SIZE = 500
+
+
+def _pending() -> dict:
+	pending = getattr(frappe.local, "workshop_link_sync", None)
+	if pending is None:
+		pending = frappe.local.workshop_link_sync = {}
+	return pending
+
+
+def queue(doctype: str, name: str, values: dict, when_changed=None, expect: dict | None = None) -> None:
+	"""Write values to one row just before the transaction commits, only if it would change something.
+
+	when_changed: fields whose difference triggers the write (default: every field in values), so
+	update_appointment_link can set status only when job_card actually moves. expect: {field: value} the row
+	must still hold (e.g. clear a back-link only while it points at us). Writes to the same row with the
+	same conditions coalesce, later values winning; the memoized link header is updated right away.
+	A write the memoized header shows would change nothing is not queued at all.
+	"""
+	if not name:
+		return
+	when_changed = tuple(sorted(when_changed or values))
+	row = get_memoized(doctype, name)
+	if (
+		row
+		and all(row.get(f) == v for f, v in (expect or {}).items())
+		and all(row.get(f) == values[f] for f in when_changed)
+	):
+		return
+	expect = tuple(sorted((expect or {}).items()))
+	pending = _pending()
+	if not pending:
+		frappe.db.before_commit.add(flush)
+		frappe.db.after_rollback.add(discard)
+	pending.setdefault((doctype, name, when_changed, expect), {}).update(values)
+	update_header(doctype, name, values, when_changed, dict(expect))
+
+
+def flush() -> None:
+	"""Issue the queued writes now (before_commit callback; also safe to call mid-transaction)."""
+	pending = _pending()
+	groups: dict[tuple, dict] = {}
+	for (doctype, name, when_changed, expect), values in pending.items():
+		key = (doctype, tuple(sorted(values)), when_changed, tuple(field for field, _v in expect))
+		groups.setdefault(key, {})[name] = {**values, **{f"expect:{f}": v for f, v in expect}}
+	pending.clear()
+	for (doctype, fields, when_changed, expect_fields), rows in groups.items():
+		_write(doctype, fields, when_changed, expect_fields, rows)
+
+
+def discard() -> None:
+	"""Drop queued writes (after_rollback callback, or after rolling back to a savepoint)."""
+	_pending().clear()
+
+
+def sync_links(doctype: str, rows: dict, when_changed=None, expect_fields=(), batch_size=BULK_BATCH_SIZE) -> int:
+	"""Bulk mode for imports and patches: write {name: values} now, batch_size rows per UPDATE.
+
+	Every row must carry the same fields; rows whose when_changed fields already match are skipped in SQL.
+	expect_fields read their expected value from "expect:<field>" keys in each row. Return rows updated.
+	"""
+	if not rows:
+		return 0
+	first = next(iter(rows.values()))
+	fields = tuple(sorted(k for k in first if not k.startswith("expect:")))
+	return _write(doctype, fields, tuple(sorted(when_changed or fields)), tuple(expect_fields), rows, batch_size)
+
+
+def _null_safe_eq(column: str, value_sql: str) -> str:
+	if frappe.db.db_type == "postgres":
+		return f"{column} is not distinct from {value_sql}"
+	return f"{column} <=> {value_sql}"
+
+
+def _value_sql(key: str, batch: list, rows: dict, params: dict) -> str:
+	"""Placeholder for rows[name][key]: a plain value for one row, CASE on name for a batch."""
+	if len(batch) == 1:
+		param = f"p{len(params)}"
+		params[param] = rows[batch[0]][key]
+		return f"%({param})s"
+	whens = []
+	for i, name in enumerate(batch):
+		param = f"p{len(params)}"
+		params[param] = rows[name][key]
+		whens.append(f"when %(n{i})s then %({param})s")
+	return f"case `name` {' '.join(whens)} end"
+
+
+def _write(doctype, fields, when_changed, expect_fields, rows, batch_size=BULK_BATCH_SIZE) -> int:
+	"""One conditional UPDATE per batch of rows; return the number of rows changed."""
+	updated = 0
+	names = list(rows)
+	for offset in range(0, len(names), batch_size):
+		batch = names[offset : offset + batch_size]
+		params = {"names": tuple(batch)}
+		if len(batch) > 1:
+			params.update({f"n{i}": name for i, name in enumerate(batch)})
+
+		assignments = {f: _value_sql(f, batch, rows, params) for f in fields}
+		changed = " or ".join(f"not ({_null_safe_eq(f'`{f}`', assignments[f])})" for f in when_changed)
+		conditions = ["`name` in %(names)s", f"({changed})"]
+		conditions += [
+			_null_safe_eq(f"`{f}`", _value_sql(f"expect:{f}", batch, rows, params)) for f in expect_fields
+		]
+		frappe.db.sql(
+			f"""
+			update `tab{doctype}`
+			set {", ".join(f"`{f}` = {sql}" for f, sql in assignments.items())}
+			where {" and ".join(conditions)}
+			""",
+			params,
+		)
+		updated += frappe.db._cursor.rowcount
+	return updated
+
+
+def resync_links() -> dict:
+	"""Repair every back-link from the forward links (Job Card -> appointment / inspection, inspection ->
+	appointment) in bulk; the latest-modified linking document wins. Appointment status is left alone."""
+	job_cards = frappe.get_all(
+		"Job Card", fields=["name", "appointment", "inspection"], order_by="modified asc"
+	)
+	inspections = frappe.get_all("Vehicle Inspection", fields=["name", "appointment"], order_by="modified asc")
+
+	appointment_job_cards = {r.appointment: {"job_card": r.name} for r in job_cards if r.appointment}
+	inspection_job_cards = {r.inspection: {"job_card": r.name} for r in job_cards if r.inspection}
+	appointment_inspections = {r.appointment: {"inspection": r.name} for r in inspections if r.appointment}
+	summary = {
+		"Service Appointment.job_card": sync_links("Service Appointment", appointment_job_cards),
+		"Vehicle Inspection.job_card": sync_links("Vehicle Inspection", inspection_job_cards),
+		"Service Appointment.inspection": sync_links("Service Appointment", appointment_inspections),
+	}
+	frappe.db.commit()
+	return summary
@@ -3,6 +3,11 @@
 
 const GARAGE_DASHBOARD_METHOD =
 	"workshop_mgmt.workshop_management.page.garage_business_dashboard.garage_business_dashboard.get_dashboard_data";
+const GARAGE_DASHBOARD_SECTIONS_METHOD =
+	"workshop_mgmt.workshop_management.page.garage_business_dashboard.garage_business_dashboard.get_dashboard_sections";
+// Realtime change signals trigger a refetch; the poll only covers a dropped socket.
+const GARAGE_DASHBOARD_EVENT = "workshop_dashboard";
+const GARAGE_DASHBOARD_FALLBACK_POLL_MS = 10 * 60 * 1000;
 
 function getMountNode(wrapper) {
 	if (!wrapper) {
@@ -307,6 +312,8 @@ function mountGarageDashboard(wrapper) {
 				topServices: [],
 				topParts: [],
 				recentJobs: [],
+				sectionVersions: {},
+				companyScope: null,
 			};
 		},
 		computed: {
@@ -374,17 +381,20 @@ function mountGarageDashboard(wrapper) {
 			loadData() {
 				this.loading = true;
 				frappe.call({
-					method: GARAGE_DASHBOARD_METHOD,
-					args: { days: 7 },
+					method: GARAGE_DASHBOARD_SECTIONS_METHOD,
+					args: { days: 7, versions: this.sectionVersions },
 					callback: (r) => {
-						const data = (r && r.message) || {};
-						this.kpi = data.kpis || {};
-						this.jobStatus = data.job_status || [];
-						this.appointmentStatus = data.appointment_status || [];
-						this.revenueTrend = data.revenue_trend || [];
-						this.topServices = data.top_services || [];
-						this.topParts = data.top_parts || [];
-						this.recentJobs = data.recent_jobs || [];
+						const msg = (r && r.message) || {};
+						this.sectionVersions = msg.versions || {};
+						this.companyScope = msg.company_scope || null;
+						const data = msg.sections || {};
+						if (data.kpis) this.kpi = data.kpis;
+						if (data.job_status) this.jobStatus = data.job_status;
+						if (data.appointment_status) this.appointmentStatus = data.appointment_status;
+						if (data.revenue_trend) this.revenueTrend = data.revenue_trend;
+						if (data.top_services) this.topServices = data.top_services;
+						if (data.top_parts) this.topParts = data.top_parts;
+						if (data.recent_jobs) this.recentJobs = data.recent_jobs;
 						this.refreshedAt = frappe.datetime.now_datetime();
 					},
 					always: () => {
@@ -392,10 +402,28 @@ function mountGarageDashboard(wrapper) {
 					},
 				});
 			},
+			onChanged(message) {
+				if (!message) {
+					return;
+				}
+				// Signals carry no figures (every session receives them): refetch through the permission-checked call.
+				const scope = this.companyScope;
+				const inScope = scope ? scope.includes(message.company) : !message.company;
+				if (inScope) {
+					this.loadData();
+				}
+			},
 		},
 		mounted() {
 			this.loadData();
 			mountNode.__garage_dashboard_refresh = () => this.loadData();
+			this.onRealtime = (message) => this.onChanged(message);
+			frappe.realtime.on(GARAGE_DASHBOARD_EVENT, this.onRealtime);
+			this.fallbackPoll = setInterval(() => this.loadData(), GARAGE_DASHBOARD_FALLBACK_POLL_MS);
+		},
+		beforeUnmount() {
+			frappe.realtime.off(GARAGE_DASHBOARD_EVENT, this.onRealtime);
+			clearInterval(this.fallbackPoll);
 		},
 	}).mount(mountPoint);
 }
@@ -3,256 +3,625 @@
 
 from __future__ import annotations
 
+import hashlib
+import time
 from datetime import timedelta
 
 import frappe
-from frappe.utils import cint, flt, getdate, nowdate
+from frappe import _
+from frappe.utils import add_months, cint, flt, getdate, nowdate
 
+from workshop_mgmt.permission_utils import resolve_company_scope
+from workshop_mgmt.workshop_management import dashboard_cache
+from workshop_mgmt.workshop_management.dashboard_rollup import (
+	METRIC_APPOINTMENT_STATUS,
+	METRIC_JOB_STATUS,
+	METRIC_PART_ITEM,
+	METRIC_REVENUE,
+	METRIC_SERVICE_ITEM,
+	ROLLUP_DOCTYPE,
+	is_rollup_ready,
+)
 
-def _sum_value(query: str, params: tuple | None = None) -> float:
-	row = frappe.db.sql(query, params or (), as_dict=True)
-	if not row:
-		return 0.0
-	return flt(row[0].get("value"))
+_CLOSED_APPOINTMENT_STATUSES = ("Completed", "Cancelled", "No-Show")
+_CLOSED_JOB_STATUSES = ("Closed", "Cancelled", "Invoiced")
 
+# Dashboard sections and the source families (change counters) each one reads.
+_SOURCES = ("revenue", "appointment", "job")
+_SECTION_SOURCES = {
+	"kpis": _SOURCES,
+	"job_status": ("job",),
+	"appointment_status": ("appointment",),
+	"revenue_trend": ("revenue",),
+	"top_services": ("job",),
+	"top_parts": ("job",),
+	"recent_jobs": ("job",),
+	"upcoming_appointments": ("appointment",),
+}
+SECTIONS = tuple(_SECTION_SOURCES)
+# Sections computed from the grouped planner statements (the rest run their own query).
+_PLANNED_SECTIONS = frozenset({"kpis", "job_status", "appointment_status", "revenue_trend"})
 
-def _count_value(query: str, params: tuple | None = None) -> int:
-	row = frappe.db.sql(query, params or (), as_dict=True)
-	if not row:
-		return 0
-	return cint(row[0].get("value"))
+# Revenue trend buckets: SQL expression for the bucket start of a date column, and the longest range
+# (in days) served per granularity.
+GRANULARITIES = ("day", "week", "month")
+_BUCKET_SQL = {
+	"day": "{col}",
+	"week": "date_sub({col}, interval weekday({col}) day)",
+	"month": "date_sub({col}, interval dayofmonth({col}) - 1 day)",
+}
+_MAX_SPAN_DAYS = {"day": 92, "week": 371, "month": 731}
+_BUCKET_LABEL = {"day": "%d %b", "week": "%d %b", "month": "%b %Y"}
 
+# Trend rows are bucketed in the current window and, for year-over-year, the same window a year back
+# (52 weeks for day / week buckets so weekdays line up, 12 months for month buckets).
+_TREND_GROUP = (
+	"case when {date} >= %(trend_start)s and {date} < %(tomorrow)s then {bucket}"
+	" when {date} >= %(compare_start)s and {date} < %(compare_end)s then {bucket} end"
+)
 
-@frappe.whitelist(allow_guest=True)
-def get_dashboard_data(days: int = 7):
-	"""Return high-level operational and financial metrics for the garage dashboard."""
 
-	span_days = min(max(cint(days) or 7, 7), 30)
-	today = getdate(nowdate())
-	month_start = today.replace(day=1)
-	trend_start = today - timedelta(days=span_days - 1)
-
-	today_revenue = _sum_value(
-		"""
-		select sum(base_grand_total) as value
-		from `tabSales Invoice`
-		where docstatus = 1
-			and ifnull(custom_job_card, '') != ''
-			and posting_date = %s
-		""",
-		(today,),
-	)
-	month_revenue = _sum_value(
-		"""
-		select sum(base_grand_total) as value
-		from `tabSales Invoice`
-		where docstatus = 1
-			and ifnull(custom_job_card, '') != ''
-			and posting_date between %s and %s
-		""",
-		(month_start, today),
-	)
-	outstanding = _sum_value(
-		"""
-		select sum(outstanding_amount) as value
-		from `tabSales Invoice`
-		where docstatus = 1
-			and ifnull(custom_job_card, '') != ''
-		"""
-	)
+# Query planner
+# -------------
+# Every KPI is a conditional aggregate over one source family. Each family is read in a single grouped
+# pass (by status, or by trend day for revenue): KPIs fold the group rows, and the same rows give the
+# status distributions and the revenue trend, so the aggregates cost one statement per family.
+#
+# Specs: (key, family, value, condition). Placeholders resolve per source: {amount}, {outstanding},
+# {date} (date or datetime column, always compared as a half-open range), {weight} (1 per source row,
+# record_count per rollup row) and {group} (the grouping column).
+#
+# Company is the partition key: with a company scope every statement is restricted to
+# `company in %(companies)s`, served by the company-leading indexes (see index_manager).
+_KPI_SPECS = (
+	("today_revenue", "revenue", "{amount}", "{date} >= %(today)s and {date} < %(tomorrow)s"),
+	("month_revenue", "revenue", "{amount}", "{date} >= %(month_start)s and {date} < %(tomorrow)s"),
+	("outstanding", "revenue", "{outstanding}", ""),
+	("today_appointments", "appointment", "{weight}", "{date} >= %(today)s and {date} < %(tomorrow)s"),
+	(
+		"upcoming_appointments",
+		"appointment",
+		"{weight}",
+		"{date} >= %(today)s and {group} not in %(closed_appointment_statuses)s",
+	),
+	("in_progress_appointments", "appointment", "{weight}", "{group} = 'In Progress'"),
+	(
+		"total_appointments_month",
+		"appointment",
+		"{weight}",
+		"{date} >= %(month_start)s and {date} < %(tomorrow)s",
+	),
+	(
+		"completed_appointments_month",
+		"appointment",
+		"{weight}",
+		"{group} = 'Completed' and {date} >= %(month_start)s and {date} < %(tomorrow)s",
+	),
+	("open_jobs", "job", "{weight}", "{group} not in %(closed_job_statuses)s"),
+	("ready_to_invoice", "job", "{weight}", "{group} = 'Ready to Invoice'"),
+)
 
-	today_appointments = _count_value(
-		"""
-		select count(*) as value
-		from `tabService Appointment`
-		where date(scheduled_start) = %s
-		""",
-		(today,),
-	)
-	upcoming_appointments = _count_value(
-		"""
-		select count(*) as value
-		from `tabService Appointment`
-		where date(scheduled_start) >= %s
-			and status not in ('Completed', 'Cancelled', 'No-Show')
-		""",
-		(today,),
-	)
-	in_progress_appointments = _count_value(
-		"""
-		select count(*) as value
-		from `tabService Appointment`
-		where status = 'In Progress'
-		"""
-	)
-	open_jobs = _count_value(
-		"""
-		select count(*) as value
-		from `tabJob Card`
-		where status not in ('Closed', 'Cancelled', 'Invoiced')
-		"""
-	)
-	ready_to_invoice = _count_value(
-		"""
-		select count(*) as value
-		from `tabJob Card`
-		where status = 'Ready to Invoice'
-		"""
-	)
+_COUNT_FAMILIES = frozenset({"appointment", "job"})
 
-	total_appointments_month = _count_value(
-		"""
-		select count(*) as value
-		from `tabService Appointment`
-		where date(scheduled_start) between %s and %s
-		""",
-		(month_start, today),
-	)
-	completed_appointments_month = _count_value(
-		"""
-		select count(*) as value
-		from `tabService Appointment`
-		where status = 'Completed'
-			and date(scheduled_start) between %s and %s
-		""",
-		(month_start, today),
-	)
-	completion_rate = (
-		flt(completed_appointments_month) / flt(total_appointments_month) * 100
-		if total_appointments_month
-		else 0
-	)
+# A full load runs the planner's three family statements plus three list reads outside it: top items
+# (services and parts in one UNION ALL), recent jobs and upcoming appointments. The lists are ordered,
+# limited row sets rather than aggregates, so they do not fold into the grouped passes.
+_SOURCE_PLAN = {
+	"revenue": {
+		"from": "`tabSales Invoice`",
+		"where": "docstatus = 1 and ifnull(custom_job_card, '') != ''",
+		"group": _TREND_GROUP,
+		"columns": {
+			"amount": "base_grand_total",
+			"outstanding": "outstanding_amount",
+			"date": "posting_date",
+			"weight": "1",
+			"company": "company",
+		},
+	},
+	"appointment": {
+		"from": "`tabService Appointment`",
+		"where": "1 = 1",
+		"group": "status",
+		"columns": {"date": "scheduled_start", "weight": "1", "company": "company"},
+	},
+	"job": {
+		"from": "`tabJob Card`",
+		"where": "1 = 1",
+		"group": "status",
+		"columns": {"weight": "1", "company": "company"},
+	},
+}
 
-	job_status = frappe.db.sql(
-		"""
-		select status, count(*) as count
-		from `tabJob Card`
-		group by status
-		order by count desc
-		""",
-		as_dict=True,
-	)
-	appointment_status = frappe.db.sql(
-		"""
-		select status, count(*) as count
-		from `tabService Appointment`
-		group by status
-		order by count desc
-		""",
-		as_dict=True,
-	)
+_ROLLUP_PLAN = {
+	"revenue": {
+		"from": f"`tab{ROLLUP_DOCTYPE}`",
+		"where": f"metric = '{METRIC_REVENUE}'",
+		"group": _TREND_GROUP,
+		"columns": {
+			"amount": "amount",
+			"outstanding": "outstanding",
+			"date": "metric_date",
+			"weight": "record_count",
+			"company": "company",
+		},
+	},
+	"appointment": {
+		"from": f"`tab{ROLLUP_DOCTYPE}`",
+		"where": f"metric = '{METRIC_APPOINTMENT_STATUS}'",
+		"group": "dimension",
+		"columns": {"date": "metric_date", "weight": "record_count", "company": "company"},
+	},
+	"job": {
+		"from": f"`tab{ROLLUP_DOCTYPE}`",
+		"where": f"metric = '{METRIC_JOB_STATUS}'",
+		"group": "dimension",
+		"columns": {"weight": "record_count", "company": "company"},
+	},
+}
 
-	revenue_rows = frappe.db.sql(
-		"""
-		select posting_date, sum(base_grand_total) as amount
-		from `tabSales Invoice`
-		where docstatus = 1
-			and ifnull(custom_job_card, '') != ''
-			and posting_date between %s and %s
-		group by posting_date
-		order by posting_date asc
-		""",
-		(trend_start, today),
-		as_dict=True,
-	)
-	revenue_map = {str(r.posting_date): flt(r.amount) for r in revenue_rows}
-	revenue_trend = []
-	for i in range(span_days):
-		day = trend_start + timedelta(days=i)
-		key = str(day)
-		revenue_trend.append(
-			{
-				"date": key,
-				"label": day.strftime("%d %b"),
-				"amount": revenue_map.get(key, 0),
-			}
+
+def _company_condition(column: str, companies) -> str:
+	return f" and {column} in %(companies)s" if companies else ""
+
+
+def _compile_family(source: dict, specs, granularity: str = "day", companies=None) -> str:
+	"""One grouped statement computing every KPI of a family as SUM(CASE ...) columns."""
+	cols = dict(source["columns"])
+	if "date" in cols:
+		cols["bucket"] = _BUCKET_SQL[granularity].format(col=cols["date"])
+	cols["group"] = source["group"].format(**cols)
+	selects = [f"{cols['group']} as bucket", f"sum({cols['weight']}) as row_count"]
+	if "amount" in cols:
+		selects.append(f"sum({cols['amount']}) as row_amount")
+	for key, _family, value, condition in specs:
+		value_sql = value.format(**cols)
+		if condition:
+			selects.append(f"sum(case when {condition.format(**cols)} then {value_sql} else 0 end) as {key}")
+		else:
+			selects.append(f"sum({value_sql}) as {key}")
+	return f"""
+		select {", ".join(selects)}
+		from {source["from"]}
+		where {source["where"]}{_company_condition(cols["company"], companies)}
+		group by bucket
+	"""
+
+
+def _run_plan(plan: dict, params: dict, granularity: str = "day") -> tuple[dict, dict[str, list]]:
+	"""Execute one statement per family; return (kpis, grouped rows per family)."""
+	kpis = {}
+	groups = {}
+	for family, source in plan.items():
+		specs = [spec for spec in _KPI_SPECS if spec[1] == family]
+		rows = frappe.db.sql(
+			_compile_family(source, specs, granularity, params.get("companies")), params, as_dict=True
 		)
+		groups[family] = rows
+		cast = cint if family in _COUNT_FAMILIES else flt
+		for key, *_rest in specs:
+			kpis[key] = cast(sum(flt(r.get(key)) for r in rows))
+	return kpis, groups
 
-	top_services = frappe.db.sql(
-		"""
-		select
-			jsi.item_code,
-			coalesce(i.item_name, jsi.item_code) as item_name,
-			sum(jsi.qty) as qty,
-			sum(jsi.amount) as amount
-		from `tabJob Card Service Item` jsi
-		inner join `tabJob Card` jc on jc.name = jsi.parent
-		left join `tabItem` i on i.name = jsi.item_code
-		where jc.posting_date between %s and %s
-		group by jsi.item_code, i.item_name
+
+def _status_distribution(rows: list) -> list[dict]:
+	out = [{"status": r.bucket, "count": cint(r.row_count)} for r in rows if cint(r.row_count)]
+	out.sort(key=lambda r: r["count"], reverse=True)
+	return out
+
+
+# Top items sections and the rollup metric / source child table each one ranks.
+_TOP_ITEM_SECTIONS = {
+	"top_services": (METRIC_SERVICE_ITEM, "Job Card Service Item"),
+	"top_parts": (METRIC_PART_ITEM, "Job Card Part Item"),
+}
+
+
+def _top_items_rollup_branch(section: str, companies=None) -> str:
+	return f"""
+		(select
+			%(section_{section})s as section,
+			r.dimension as item_code,
+			coalesce(i.item_name, r.dimension) as item_name,
+			sum(r.qty) as qty,
+			sum(r.amount) as amount
+		from `tab{ROLLUP_DOCTYPE}` r
+		left join `tabItem` i on i.name = r.dimension
+		where r.metric = %(metric_{section})s
+			{_company_condition("r.company", companies)}
+			and r.metric_date between %(from_date)s and %(to_date)s
+		group by r.dimension, i.item_name
 		order by amount desc
-		limit 6
-		""",
-		(month_start, today),
-		as_dict=True,
-	)
-	top_parts = frappe.db.sql(
-		"""
-		select
-			jpi.item_code,
-			coalesce(i.item_name, jpi.item_code) as item_name,
-			sum(jpi.qty) as qty,
-			sum(jpi.amount) as amount
-		from `tabJob Card Part Item` jpi
-		inner join `tabJob Card` jc on jc.name = jpi.parent
-		left join `tabItem` i on i.name = jpi.item_code
-		where jc.posting_date between %s and %s
-		group by jpi.item_code, i.item_name
+		limit 6)
+	"""
+
+
+def _top_items_source_branch(section: str, companies=None) -> str:
+	return f"""
+		(select
+			%(section_{section})s as section,
+			li.item_code,
+			coalesce(i.item_name, li.item_code) as item_name,
+			sum(li.qty) as qty,
+			sum(li.amount) as amount
+		from `tab{_TOP_ITEM_SECTIONS[section][1]}` li
+		inner join `tabJob Card` jc on jc.name = li.parent
+		left join `tabItem` i on i.name = li.item_code
+		where jc.posting_date between %(from_date)s and %(to_date)s
+			{_company_condition("jc.company", companies)}
+		group by li.item_code, i.item_name
 		order by amount desc
-		limit 6
-		""",
-		(month_start, today),
-		as_dict=True,
+		limit 6)
+	"""
+
+
+def _top_items(from_date, to_date, companies=None, use_rollup: bool = True) -> dict[str, list]:
+	"""Top services and top parts by amount, one UNION ALL statement with a limited branch per section."""
+	branch = _top_items_rollup_branch if use_rollup else _top_items_source_branch
+	params = {"from_date": from_date, "to_date": to_date, "companies": companies}
+	for section, (metric, _child) in _TOP_ITEM_SECTIONS.items():
+		params[f"section_{section}"] = section
+		params[f"metric_{section}"] = metric
+	rows = frappe.db.sql(
+		" union all ".join(branch(section, companies) for section in _TOP_ITEM_SECTIONS), params, as_dict=True
 	)
+	out = {section: [] for section in _TOP_ITEM_SECTIONS}
+	for row in sorted(rows, key=lambda r: flt(r.amount), reverse=True):
+		out[row.pop("section")].append(row)
+	return out
+
+
+def _aggregates(
+	today,
+	month_start,
+	trend_start,
+	with_top_items: bool = True,
+	families=None,
+	granularity: str = "day",
+	compare_window=None,
+	companies=None,
+) -> dict:
+	"""KPIs, status distributions, revenue trend rows and top items from the rollup (or source tables).
+
+	families limits the planner to some of revenue / appointment / job; only their keys are returned.
+	compare_window is an optional (start, end) half-open range also bucketed into revenue_by_bucket.
+	companies partitions every read to those companies (None: all companies).
+	"""
+	compare_start, compare_end = compare_window or (trend_start, trend_start)
+	params = {
+		"today": today,
+		"tomorrow": today + timedelta(days=1),
+		"month_start": month_start,
+		"trend_start": trend_start,
+		"compare_start": compare_start,
+		"compare_end": compare_end,
+		"closed_appointment_statuses": _CLOSED_APPOINTMENT_STATUSES,
+		"closed_job_statuses": _CLOSED_JOB_STATUSES,
+		"companies": tuple(companies) if companies else None,
+	}
+	use_rollup = is_rollup_ready()
+	plan = _ROLLUP_PLAN if use_rollup else _SOURCE_PLAN
+	if families is not None:
+		plan = {family: source for family, source in plan.items() if family in families}
+	kpis, groups = _run_plan(plan, params, granularity)
 
-	recent_jobs = frappe.db.sql(
-		"""
+	out = dict(kpis)
+	if "job" in groups:
+		out["job_status"] = _status_distribution(groups["job"])
+	if "appointment" in groups:
+		out["appointment_status"] = _status_distribution(groups["appointment"])
+	if "revenue" in groups:
+		out["revenue_by_bucket"] = {str(r.bucket): flt(r.row_amount) for r in groups["revenue"] if r.bucket}
+	if not with_top_items:
+		return out
+
+	out.update(_top_items(month_start, today, params["companies"], use_rollup))
+	return out
+
+
+def _kpi_payload(agg: dict, today) -> dict:
+	total_appointments_month = agg["total_appointments_month"]
+	completion_rate = (
+		flt(agg["completed_appointments_month"]) / flt(total_appointments_month) * 100
+		if total_appointments_month
+		else 0
+	)
+	return {
+		"today_revenue": agg["today_revenue"],
+		"month_revenue": agg["month_revenue"],
+		"outstanding": agg["outstanding"],
+		"today_date": str(today),
+		"today_appointments": agg["today_appointments"],
+		"upcoming_appointments": agg["upcoming_appointments"],
+		"in_progress_appointments": agg["in_progress_appointments"],
+		"open_jobs": agg["open_jobs"],
+		"ready_to_invoice": agg["ready_to_invoice"],
+		"completion_rate": completion_rate,
+	}
+
+
+def _recent_jobs(companies=None) -> list[dict]:
+	return frappe.db.sql(
+		f"""
 		select
 			name,
 			customer,
 			status,
 			posting_date
 		from `tabJob Card`
+		where 1 = 1 {_company_condition("company", companies)}
 		order by modified desc
 		limit 8
 		""",
+		{"companies": companies},
 		as_dict=True,
 	)
-	upcoming_appointments_rows = frappe.db.sql(
-		"""
+
+
+def _upcoming_appointment_rows(today, companies=None) -> list[dict]:
+	return frappe.db.sql(
+		f"""
 		select
 			name,
 			customer,
 			status,
 			scheduled_start
 		from `tabService Appointment`
-		where date(scheduled_start) >= %s
+		where scheduled_start >= %(today)s
+			{_company_condition("company", companies)}
 			and status not in ('Completed', 'Cancelled', 'No-Show')
 		order by scheduled_start asc
 		limit 6
 		""",
-		(today,),
+		{"today": today, "companies": companies},
 		as_dict=True,
 	)
 
-	return {
-		"kpis": {
-			"today_revenue": today_revenue,
-			"month_revenue": month_revenue,
-			"outstanding": outstanding,
-			"today_date": str(today),
-			"today_appointments": today_appointments,
-			"upcoming_appointments": upcoming_appointments,
-			"in_progress_appointments": in_progress_appointments,
-			"open_jobs": open_jobs,
-			"ready_to_invoice": ready_to_invoice,
-			"completion_rate": completion_rate,
+
+def _granularity(granularity) -> str:
+	granularity = granularity or "day"
+	if granularity not in GRANULARITIES:
+		frappe.throw(_("Granularity must be one of: {0}").format(", ".join(GRANULARITIES)))
+	return granularity
+
+
+def _span_days(days, granularity: str = "day") -> int:
+	return min(max(cint(days) or 7, 7), _MAX_SPAN_DAYS[granularity])
+
+
+def _company_key(companies) -> str:
+	return ",".join(companies) if companies else ""
+
+
+def _cache_key(span_days: int, granularity: str, compare: int, companies=None) -> str:
+	return dashboard_cache.entry_key(
+		nowdate(), span_days, granularity, compare, _company_key(companies), dashboard_cache.user_scope()
+	)
+
+
+@frappe.whitelist(allow_guest=True)
+def get_dashboard_data(
+	days: int = 7, granularity: str = "day", compare: int = 0, company: str | None = None
+):
+	"""Return high-level operational and financial metrics for the garage dashboard (cached).
+
+	days is the revenue trend range, bucketed by granularity (day / week / month); compare adds the
+	same buckets a year back as previous_amount. company narrows to one branch; without it the user's
+	branches (Company User Permissions) apply, or all companies for unrestricted users.
+	"""
+	granularity = _granularity(granularity)
+	span_days = _span_days(days, granularity)
+	compare = cint(compare)
+	companies = resolve_company_scope(company)
+	data = dashboard_cache.get_or_compute(
+		_cache_key(span_days, granularity, compare, companies),
+		lambda: _build_dashboard(span_days, granularity, compare, companies),
+		revalidate_method=(
+			"workshop_mgmt.workshop_management.page.garage_business_dashboard"
+			".garage_business_dashboard.revalidate_dashboard_data"
+		),
+		revalidate_kwargs={
+			"days": span_days,
+			"granularity": granularity,
+			"compare": compare,
+			"companies": companies,
 		},
-		"job_status": job_status,
-		"appointment_status": appointment_status,
-		"revenue_trend": revenue_trend,
-		"top_services": top_services,
-		"top_parts": top_parts,
-		"recent_jobs": recent_jobs,
-		"upcoming_appointments": upcoming_appointments_rows,
+	)
+	return {**data, "company_scope": companies}
+
+
+def revalidate_dashboard_data(days: int = 7, granularity: str = "day", compare: int = 0, companies=None):
+	"""Background refresh of a stale cache entry (runs as the requesting user, with its resolved scope)."""
+	granularity = _granularity(granularity)
+	span_days = _span_days(days, granularity)
+	compare = cint(compare)
+	companies = tuple(companies) if companies else None
+	dashboard_cache.revalidate(
+		_cache_key(span_days, granularity, compare, companies),
+		lambda: _build_dashboard(span_days, granularity, compare, companies),
+	)
+
+
+def build_realtime_snapshot(companies=None) -> dict:
+	"""Live dashboard state (KPIs, status distributions, the two live lists) the realtime job fingerprints."""
+	today = getdate(nowdate())
+	agg = _aggregates(today, today.replace(day=1), today, with_top_items=False, companies=companies)
+	return {
+		"kpis": _kpi_payload(agg, today),
+		"job_status": agg["job_status"],
+		"appointment_status": agg["appointment_status"],
+		"recent_jobs": _recent_jobs(companies),
+		"upcoming_appointments": _upcoming_appointment_rows(today, companies),
+	}
+
+
+def _bucket_start(day, granularity: str):
+	if granularity == "week":
+		return day - timedelta(days=day.weekday())
+	if granularity == "month":
+		return day.replace(day=1)
+	return day
+
+
+def _year_back(day, granularity: str):
+	return add_months(day, -12) if granularity == "month" else day - timedelta(days=364)
+
+
+def _trend_buckets(today, span_days: int, granularity: str) -> list:
+	"""Bucket start dates covering the last span_days up to today (the first bucket may start earlier)."""
+	bucket = _bucket_start(today - timedelta(days=span_days - 1), granularity)
+	buckets = []
+	while bucket <= today:
+		buckets.append(bucket)
+		if granularity == "month":
+			bucket = add_months(bucket, 1)
+		else:
+			bucket += timedelta(days=7 if granularity == "week" else 1)
+	return buckets
+
+
+def _revenue_trend(revenue_map: dict, buckets: list, granularity: str, compare: bool) -> list[dict]:
+	"""Zero-filled series over buckets, with previous_amount from the year-back bucket when comparing."""
+	label = _BUCKET_LABEL[granularity]
+	trend = [
+		{"date": str(bucket), "label": bucket.strftime(label), "amount": revenue_map.get(str(bucket), 0)}
+		for bucket in buckets
+	]
+	if compare:
+		for row, bucket in zip(trend, buckets, strict=True):
+			row["previous_amount"] = revenue_map.get(str(_year_back(bucket, granularity)), 0)
+	return trend
+
+
+def _build_sections(
+	names, span_days: int, granularity: str = "day", compare: int = 0, companies=None
+) -> dict:
+	"""Compute the named sections, running only the planner families and queries they need."""
+	names = set(names)
+	today = getdate(nowdate())
+	month_start = today.replace(day=1)
+	buckets = _trend_buckets(today, span_days, granularity)
+	compare_window = None
+	if compare:
+		tomorrow = today + timedelta(days=1)
+		compare_window = (_year_back(buckets[0], granularity), _year_back(tomorrow, granularity))
+
+	families = {f for name in names & _PLANNED_SECTIONS for f in _SECTION_SOURCES[name]}
+	with_top_items = bool(names & {"top_services", "top_parts"})
+	agg = {}
+	if families or with_top_items:
+		agg = _aggregates(
+			today,
+			month_start,
+			buckets[0],
+			with_top_items=with_top_items,
+			families=families,
+			granularity=granularity,
+			compare_window=compare_window,
+			companies=companies,
+		)
+
+	builders = {
+		"kpis": lambda: _kpi_payload(agg, today),
+		"job_status": lambda: agg["job_status"],
+		"appointment_status": lambda: agg["appointment_status"],
+		"revenue_trend": lambda: _revenue_trend(agg["revenue_by_bucket"], buckets, granularity, compare),
+		"top_services": lambda: agg["top_services"],
+		"top_parts": lambda: agg["top_parts"],
+		"recent_jobs": lambda: _recent_jobs(companies),
+		"upcoming_appointments": lambda: _upcoming_appointment_rows(today, companies),
+	}
+	return {name: builders[name]() for name in SECTIONS if name in names}
+
+
+def _build_dashboard(span_days: int, granularity: str = "day", compare: int = 0, companies=None) -> dict:
+	return _build_sections(SECTIONS, span_days, granularity, compare, companies)
+
+
+# Sectioned API (v2)
+# ------------------
+# Each section's version stamp hashes the date, the company scope and the change counters of the source
+# families it reads in those companies (bumped after commit by dashboard_events), plus the range options
+# for the revenue trend. Revenue sections also carry a time bucket, since payments booked outside Payment
+# Entry fire no doc event.
+
+
+def _section_versions(span_days: int, granularity: str, compare: int, companies=None) -> dict[str, str]:
+	counters = dashboard_cache.source_versions(_SOURCES, companies)
+	today = nowdate()
+	time_bucket = int(time.time() // dashboard_cache.FRESH_SECONDS)
+	versions = {}
+	for name, sources in _SECTION_SOURCES.items():
+		parts = [today, _company_key(companies), *(f"{s}={counters[s]}" for s in sources)]
+		if name == "revenue_trend":
+			parts += [str(span_days), granularity, str(compare)]
+		if "revenue" in sources:
+			parts.append(str(time_bucket))
+		versions[name] = hashlib.md5("|".join(parts).encode()).hexdigest()[:12]
+	return versions
+
+
+def _versioned_sections(
+	names, versions: dict, span_days: int, granularity: str, compare: int, companies=None
+) -> dict:
+	"""Section payloads for the given stamps, from cache where possible; misses are computed together."""
+	cache = frappe.cache()
+	scope = dashboard_cache.user_scope()
+	# The stamp already covers the date, the company scope and, for the trend, its range options.
+	keys = {name: dashboard_cache.entry_key("v2", name, versions[name], scope) for name in names}
+	out = {}
+	for name, key in keys.items():
+		entry = cache.get_value(key, expires=True)
+		if entry is not None:
+			out[name] = entry
+
+	missing = [name for name in names if name not in out]
+	if missing:
+		for name, data in _build_sections(missing, span_days, granularity, compare, companies).items():
+			cache.set_value(keys[name], data, expires_in_sec=dashboard_cache.STALE_SECONDS)
+			out[name] = data
+	return out
+
+
+@frappe.whitelist(allow_guest=True)
+def get_dashboard_sections(
+	days: int = 7,
+	versions=None,
+	sections=None,
+	granularity: str = "day",
+	compare: int = 0,
+	company: str | None = None,
+):
+	"""Return only the dashboard sections whose data changed since the client's version stamps.
+
+	versions: {section: stamp} the client already holds. sections: optional subset to consider.
+	days / granularity / compare / company: as for get_dashboard_data.
+	Returns {"versions", "company_scope", "sections"} or {"versions", "company_scope", "not_modified"}.
+	"""
+	granularity = _granularity(granularity)
+	span_days = _span_days(days, granularity)
+	compare = cint(compare)
+	companies = resolve_company_scope(company)
+	held = frappe.parse_json(versions) or {}
+	wanted = [name for name in (frappe.parse_json(sections) or SECTIONS) if name in _SECTION_SOURCES]
+
+	current = _section_versions(span_days, granularity, compare, companies)
+	current = {name: current[name] for name in wanted}
+	changed = [name for name in wanted if held.get(name) != current[name]]
+	if not changed:
+		return {"versions": current, "company_scope": companies, "not_modified": True}
+	return {
+		"versions": current,
+		"company_scope": companies,
+		"sections": _versioned_sections(changed, current, span_days, granularity, compare, companies),
+	}
+
+
+@frappe.whitelist()
+def get_dashboard_companies():
+	"""Companies offered by the dashboard company picker: the user's branches, else every company."""
+	branches = resolve_company_scope()
+	return {
+		"companies": list(branches) if branches else frappe.get_all("Company", pluck="name", order_by="name"),
+		"restricted": bool(branches),
 	}
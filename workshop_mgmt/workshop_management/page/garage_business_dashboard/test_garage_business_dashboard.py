@@ -0,0 +1,49 @@
+# Copyright (c) 2026, Infoney and contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from workshop_mgmt.permission_utils import resolve_company_scope
+from workshop_mgmt.workshop_management.page.garage_business_dashboard import garage_business_dashboard as dashboard
+
+# Tables the dashboard reads; statements on anything else (permissions, defaults) are not counted.
+_DASHBOARD_TABLES = (
+	"`tabSales Invoice`",
+	"`tabService Appointment`",
+	"`tabJob Card`",
+	"`tabJob Card Service Item`",
+	"`tabJob Card Part Item`",
+	f"`tab{dashboard.ROLLUP_DOCTYPE}`",
+)
+
+
+class TestGarageBusinessDashboard(FrappeTestCase):
+	def _dashboard_statements(self, rollup_ready: bool) -> list[str]:
+		companies = resolve_company_scope(None)
+		frappe.cache().delete_value(dashboard._cache_key(7, "day", 0, companies))
+		with (
+			patch.object(dashboard, "is_rollup_ready", return_value=rollup_ready),
+			patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql,
+		):
+			data = dashboard.get_dashboard_data(days=7)
+		self.assertIn("kpis", data)
+		queries = [str(call.args[0]) for call in sql.call_args_list]
+		return [q for q in queries if any(table in q for table in _DASHBOARD_TABLES)]
+
+	def assert_query_budget(self, statements):
+		aggregates = [q for q in statements if "group by bucket" in q]
+		# One grouped statement per source family (revenue, appointment, job) for every KPI,
+		# the status distributions and the revenue trend.
+		self.assertEqual(len(aggregates), 3, "\n\n".join(aggregates))
+		# Plus the list reads documented at _SOURCE_PLAN: top items (one UNION ALL), recent jobs and
+		# upcoming appointments.
+		self.assertEqual(len(statements), 6, "\n\n".join(statements))
+
+	def test_query_budget_from_rollup(self):
+		self.assert_query_budget(self._dashboard_statements(rollup_ready=True))
+
+	def test_query_budget_from_source_tables(self):
+		self.assert_query_budget(self._dashboard_statements(rollup_ready=False))
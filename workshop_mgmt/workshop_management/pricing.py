@@ -0,0 +1,137 @@
+# Copyright (c) 2026, Infoney and contributors
+# Selling rates for workshop lines: customer price list, Item Price validity, then Item.standard_rate.
+
+from __future__ import annotations
+
+import frappe
+from frappe.utils import flt, getdate, nowdate
+
+_PREFIX = "workshop_item_prices"
+_CACHE_TTL = 24 * 60 * 60
+
+
+def _cache_key(price_list: str) -> str:
+	return f"{_PREFIX}:{price_list}"
+
+
+def get_selling_price_list(customer: str | None = None) -> str | None:
+	"""The price list ERPNext would pick for the customer: customer, customer group, Selling Settings."""
+	if customer:
+		price_list, customer_group = frappe.get_cached_value(
+			"Customer", customer, ["default_price_list", "customer_group"]
+		) or (None, None)
+		if price_list:
+			return price_list
+		if customer_group:
+			price_list = frappe.get_cached_value("Customer Group", customer_group, "default_price_list")
+			if price_list:
+				return price_list
+	return frappe.db.get_single_value("Selling Settings", "selling_price_list")
+
+
+def _load_entries(price_list: str | None, item_codes: set[str]) -> dict[str, dict]:
+	"""Standard rate, stock UOM and every selling Item Price of price_list per item, in one query."""
+	rows = frappe.db.sql(
+		"""
+		select i.name as item_code, i.standard_rate, i.stock_uom,
+			ip.price_list_rate, ip.customer, ip.uom, ip.valid_from, ip.valid_upto
+		from `tabItem` i
+		left join `tabItem Price` ip
+			on ip.item_code = i.name and ip.price_list = %(price_list)s and ip.selling = 1
+		where i.name in %(items)s
+		""",
+		{"price_list": price_list or "", "items": tuple(item_codes)},
+		as_dict=True,
+	)
+	entries: dict[str, dict] = {}
+	for r in rows:
+		entry = entries.setdefault(
+			r.item_code, {"standard_rate": flt(r.standard_rate), "stock_uom": r.stock_uom, "prices": []}
+		)
+		if r.price_list_rate is not None:
+			entry["prices"].append(
+				(
+					r.customer or None,
+					r.uom or None,
+					str(r.valid_from) if r.valid_from else None,
+					str(r.valid_upto) if r.valid_upto else None,
+					flt(r.price_list_rate),
+				)
+			)
+	return entries
+
+
+def _get_entries(price_list: str | None, item_codes: set[str]) -> dict[str, dict]:
+	"""Per-item price entries from the price list's cache hash, loading the misses in one query."""
+	cache = frappe.cache()
+	key = _cache_key(price_list or "")
+	entries = {}
+	for code in item_codes:
+		entry = cache.hget(key, code)
+		if entry is not None:
+			entries[code] = entry
+	missing = item_codes.difference(entries)
+	if missing:
+		loaded = _load_entries(price_list, missing)
+		for code, entry in loaded.items():
+			cache.hset(key, code, entry)
+		cache.expire(cache.make_key(key), _CACHE_TTL)
+		entries.update(loaded)
+	return entries
+
+
+def _pick_rate(entry: dict, customer: str | None, date) -> float:
+	"""Valid price for the date (customer-specific first, then latest valid_from), else standard rate."""
+	day = str(getdate(date))
+	candidates = [
+		p
+		for p in entry["prices"]
+		if p[0] in (None, customer)
+		and p[1] in (None, entry["stock_uom"])
+		and (not p[2] or p[2] <= day)
+		and (not p[3] or p[3] >= day)
+	]
+	if not candidates:
+		return entry["standard_rate"]
+	candidates.sort(key=lambda p: (p[0] is not None, p[2] or ""), reverse=True)
+	return candidates[0][4]
+
+
+def get_item_rates(item_codes, customer: str | None = None, date=None, price_list: str | None = None) -> dict:
+	"""Selling rate per item code for the customer's price list on date (default today).
+
+	Items missing from the database are left out of the result.
+	"""
+	item_codes = {code for code in item_codes if code}
+	if not item_codes:
+		return {}
+	price_list = price_list or get_selling_price_list(customer)
+	date = date or nowdate()
+	entries = _get_entries(price_list, item_codes)
+	return {code: _pick_rate(entry, customer, date) for code, entry in entries.items()}
+
+
+def get_job_card_rates(doc, item_codes) -> dict:
+	"""get_item_rates for a Job Card's customer and posting date."""
+	return get_item_rates(item_codes, customer=doc.customer, date=doc.get("posting_date"))
+
+
+def invalidate_item_price(doc, method=None):
+	"""Item Price on_update / on_trash: drop the cached entry of the item in its (old and new) price list."""
+	pairs = {(doc.price_list, doc.item_code)}
+	before = doc.get_doc_before_save()
+	if before:
+		pairs.add((before.price_list, before.item_code))
+	for price_list, item_code in pairs:
+		frappe.cache().hdel(_cache_key(price_list), item_code)
+
+
+def invalidate_item(doc, method=None):
+	"""Item on_update: drop every price list cache when the fallback rate or stock UOM changed.
+
+	New items are never cached (misses are not stored), so inserts need nothing.
+	"""
+	if not doc.get_doc_before_save():
+		return
+	if doc.has_value_changed("standard_rate") or doc.has_value_changed("stock_uom"):
+		frappe.cache().delete_keys(_PREFIX)
@@ -0,0 +1,49 @@
+// Copyright (c) 2026, Infoney and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Job Cards by Status"] = {
+	filters: [
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+			// Empty means "my branches": the companies in the user's Company User Permissions.
+			description: __("Leave empty for all of your branches"),
+		},
+		{
+			fieldname: "status",
+			label: __("Status"),
+			fieldtype: "Select",
+			options: [
+				"",
+				"Draft",
+				"Checked In",
+				"Inspected",
+				"Estimated",
+				"Approved",
+				"In Progress",
+				"Ready to Invoice",
+				"Invoiced",
+				"Closed",
+				"Cancelled",
+			],
+		},
+		{
+			fieldname: "service_advisor",
+			label: __("Service Advisor"),
+			fieldtype: "Link",
+			options: "User",
+		},
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+		},
+	],
+};
@@ -4,6 +4,8 @@
 import frappe
 from frappe import _
 
+from workshop_mgmt.permission_utils import resolve_company_scope
+
 
 def execute(filters=None):
 	columns = get_columns()
@@ -63,6 +65,9 @@ def get_columns():
 
 
 def get_data(filters):
+	filters = frappe._dict(filters or {})
+	# Company is the partition key: the selected company, else the user's branches, else all.
+	filters.companies = resolve_company_scope(filters.get("company"))
 	conditions = get_conditions(filters)
 	
 	data = frappe.db.sql("""
@@ -85,8 +90,8 @@ def get_data(filters):
 def get_conditions(filters):
 	conditions = []
 	
-	if filters.get("company"):
-		conditions.append("AND jc.company = %(company)s")
+	if filters.get("companies"):
+		conditions.append("AND jc.company IN %(companies)s")
 	
 	if filters.get("status"):
 		conditions.append("AND jc.status = %(status)s")
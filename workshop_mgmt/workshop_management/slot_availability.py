@@ -0,0 +1,295 @@
+# Copyright (c) 2026, Infoney and contributors
+# Appointment slot availability from bay / advisor capacity, working hours and a per-day interval index.
+
+from __future__ import annotations
+
+import bisect
+from datetime import datetime, timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, getdate, now_datetime, to_timedelta
+
+RESOURCE_DOCTYPE = "Workshop Resource"
+# Appointments in these states no longer hold a bay or an advisor.
+FREE_STATUSES = ("Cancelled", "No-Show")
+MAX_DAYS = 31
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+_PREFIX = "workshop_slots"
+_DAY_TTL = 24 * 60 * 60
+
+
+def _resources_key(company: str) -> str:
+	return f"{_PREFIX}:resources:{company}"
+
+
+def _day_key(company: str, day) -> str:
+	return f"{_PREFIX}:day:{company}:{day}"
+
+
+def _minutes(value) -> int:
+	return int(to_timedelta(value).total_seconds() // 60)
+
+
+# Capacity resources
+# ------------------
+
+
+def _load_resources(company: str) -> dict:
+	"""{"Bay": {name: hours}, "Advisor": {user: hours}} with hours = {weekday: [(start_min, end_min)]}."""
+	resources = frappe.get_all(
+		RESOURCE_DOCTYPE,
+		filters={"company": company, "enabled": 1},
+		fields=["name", "resource_type", "user"],
+	)
+	rows = frappe.get_all(
+		"Workshop Resource Hours",
+		filters={"parenttype": RESOURCE_DOCTYPE, "parent": ["in", [r.name for r in resources] or [""]]},
+		fields=["parent", "weekday", "start_time", "end_time"],
+	)
+	hours: dict[str, dict[int, list]] = {}
+	for r in rows:
+		hours.setdefault(r.parent, {}).setdefault(WEEKDAYS.index(r.weekday), []).append(
+			(_minutes(r.start_time), _minutes(r.end_time))
+		)
+	out = {"Bay": {}, "Advisor": {}}
+	for r in resources:
+		key = r.user if r.resource_type == "Advisor" else r.name
+		if key:
+			out[r.resource_type][key] = hours.get(r.name, {})
+	return out
+
+
+def get_resources(company: str) -> dict:
+	return frappe.cache().get_value(_resources_key(company), generator=lambda: _load_resources(company))
+
+
+def invalidate_resources(doc, method=None):
+	"""Workshop Resource on_update / on_trash: reload the company's capacity on next use."""
+	companies = {doc.company}
+	before = doc.get_doc_before_save()
+	if before:
+		companies.add(before.company)
+	for company in companies:
+		frappe.cache().delete_value(_resources_key(company))
+
+
+# Per-day interval index
+# ----------------------
+
+
+def _load_days(company: str, days: list) -> dict:
+	"""Busy intervals per day for the given days from one ranged query: [(start_min, end_min, advisor, bay)].
+
+	An appointment spanning midnight is clipped into each day it touches.
+	"""
+	start = datetime.combine(min(days), datetime.min.time())
+	end = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+	rows = frappe.db.sql(
+		"""
+		select scheduled_start, scheduled_end, service_advisor, bay
+		from `tabService Appointment`
+		where company = %(company)s and status not in %(free)s
+			and scheduled_start < %(end)s and scheduled_end > %(start)s
+		""",
+		{"company": company, "free": FREE_STATUSES, "start": start, "end": end},
+		as_dict=True,
+	)
+	wanted = set(days)
+	out = {day: [] for day in days}
+	for r in rows:
+		s, e = get_datetime(r.scheduled_start), get_datetime(r.scheduled_end)
+		day = s.date()
+		while datetime.combine(day, datetime.min.time()) < e:
+			if day in wanted:
+				midnight = datetime.combine(day, datetime.min.time())
+				out[day].append(
+					(
+						max(0, int((s - midnight).total_seconds() // 60)),
+						min(24 * 60, -int(-(e - midnight).total_seconds() // 60)),
+						r.service_advisor or None,
+						r.bay or None,
+					)
+				)
+			day += timedelta(days=1)
+	for intervals in out.values():
+		intervals.sort(key=lambda i: (i[0], i[1]))
+	return out
+
+
+def _busy_by_day(company: str, days: list) -> dict:
+	"""Cached day intervals; the days not cached are loaded together with one query."""
+	cache = frappe.cache()
+	out = {}
+	for day in days:
+		intervals = cache.get_value(_day_key(company, day), expires=True)
+		if intervals is not None:
+			out[day] = intervals
+	missing = [day for day in days if day not in out]
+	if missing:
+		for day, intervals in _load_days(company, missing).items():
+			cache.set_value(_day_key(company, day), intervals, expires_in_sec=_DAY_TTL)
+			out[day] = intervals
+	return out
+
+
+def _appointment_days(company, start, end) -> set:
+	if not (company and start and end):
+		return set()
+	day, last = getdate(start), getdate(end)
+	days = set()
+	while day <= last:
+		days.add((company, day))
+		day += timedelta(days=1)
+	return days
+
+
+def invalidate_appointment_days(doc, method=None):
+	"""Service Appointment on_change / on_trash: drop the cached days it covers (before and after the
+	change), again once committed so a request racing the save cannot cache the old schedule."""
+	bookings = [(doc.company, doc.scheduled_start, doc.scheduled_end)]
+	before = doc.get_doc_before_save()
+	if before:
+		bookings.append((before.company, before.scheduled_start, before.scheduled_end))
+	invalidate_bookings(bookings)
+
+
+def invalidate_bookings(bookings) -> None:
+	"""Drop the cached days covered by (company, start, end) bookings, now and once committed."""
+	keys = set()
+	for company, start, end in bookings:
+		keys |= _appointment_days(company, start, end)
+
+	def drop():
+		for company, day in keys:
+			frappe.cache().delete_value(_day_key(company, day))
+
+	drop()
+	frappe.db.after_commit.add(drop)
+
+
+class _DayIndex:
+	"""Busy intervals of one day, per bay / advisor plus the pools of appointments without one."""
+
+	def __init__(self, intervals):
+		self.by_bay: dict[str, list] = {}
+		self.by_advisor: dict[str, list] = {}
+		self.any_bay: list = []
+		self.any_advisor: list = []
+		for start, end, advisor, bay in intervals:
+			(self.by_bay.setdefault(bay, []) if bay else self.any_bay).append((start, end))
+			(self.by_advisor.setdefault(advisor, []) if advisor else self.any_advisor).append((start, end))
+		self.any_bay_starts = [s for s, _e in self.any_bay]
+		self.any_advisor_starts = [s for s, _e in self.any_advisor]
+
+	@staticmethod
+	def _overlaps(intervals, start, end) -> bool:
+		# Sorted by start: only intervals starting before `end` can overlap.
+		for s, e in intervals[: bisect.bisect_left(intervals, (end,))]:
+			if e > start:
+				return True
+		return False
+
+	@staticmethod
+	def _count(intervals, starts, start, end) -> int:
+		return sum(1 for _s, e in intervals[: bisect.bisect_left(starts, end)] if e > start)
+
+	def free(self, kind: str, hours: dict, weekday: int, start: int, end: int, only=None) -> list[str]:
+		"""Resources of kind working through [start, end) with no own booking in it, less the pool of
+		bookings that still need one (each takes one of the free resources)."""
+		by_resource = self.by_bay if kind == "Bay" else self.by_advisor
+		free = [
+			key
+			for key, week in hours.items()
+			if (only is None or key == only)
+			and any(s <= start and end <= e for s, e in week.get(weekday, ()))
+			and not self._overlaps(by_resource.get(key, ()), start, end)
+		]
+		if only is not None:
+			return free
+		if kind == "Bay":
+			pool, starts = self.any_bay, self.any_bay_starts
+		else:
+			pool, starts = self.any_advisor, self.any_advisor_starts
+		taken = self._count(pool, starts, start, end)
+		return free if len(free) > taken else []
+
+
+def free_slots(
+	company: str, from_date, days: int, duration: int, step: int, service_advisor=None
+) -> list[dict]:
+	"""Free slots per day: [{"date", "slots": [{"start", "end", "bays", "advisors"}]}].
+
+	A slot is free when a bay (if bays are set up) and an advisor (if advisors are set up, or the given
+	advisor) are working and unbooked for its whole duration. Slots in the past are left out: days before
+	today are listed without slots.
+	"""
+	resources = get_resources(company)
+	bays, advisors = resources["Bay"], resources["Advisor"]
+	if service_advisor and service_advisor not in advisors:
+		return []
+	now = now_datetime()
+	day_list = [getdate(from_date) + timedelta(days=i) for i in range(days)]
+	busy = _busy_by_day(company, [day for day in day_list if day >= now.date()])
+
+	out = []
+	for day in day_list:
+		weekday = day.weekday()
+		windows = [w for hours in (*bays.values(), *advisors.values()) for w in hours.get(weekday, ())]
+		if not windows or day < now.date():
+			out.append({"date": str(day), "slots": []})
+			continue
+		index = _DayIndex(busy[day])
+		first = min(s for s, _e in windows)
+		last = max(e for _s, e in windows)
+		if day == now.date():
+			current = now.hour * 60 + now.minute
+			first = max(first, first + -(-(current - first) // step) * step)
+		slots = []
+		for start in range(first, last - duration + 1, step):
+			end = start + duration
+			free_bays = index.free("Bay", bays, weekday, start, end) if bays else None
+			if free_bays == []:
+				continue
+			free_advisors = (
+				index.free("Advisor", advisors, weekday, start, end, only=service_advisor or None)
+				if advisors
+				else None
+			)
+			if free_advisors == []:
+				continue
+			slots.append(
+				{
+					"start": f"{start // 60:02d}:{start % 60:02d}",
+					"end": f"{end // 60:02d}:{end % 60:02d}",
+					"bays": free_bays or [],
+					"advisors": free_advisors or [],
+				}
+			)
+		out.append({"date": str(day), "slots": slots})
+	return out
+
+
+@frappe.whitelist()
+def get_available_slots(from_date=None, days=7, duration=60, step=30, company=None, service_advisor=None):
+	"""Free appointment slots for the next `days` days at `duration` minutes, on a `step`-minute grid.
+
+	Capacity (Workshop Resource bays and advisors with working hours) and each day's bookings are
+	cached, so repeated calls (the booking modal asks on every date change) are served from memory.
+	"""
+	frappe.has_permission("Service Appointment", "create", throw=True)
+	company = company or frappe.defaults.get_user_default("Company") or frappe.defaults.get_global_default(
+		"company"
+	)
+	if not company:
+		frappe.throw(_("Set a default Company to look up appointment slots."))
+	days = min(max(cint(days) or 1, 1), MAX_DAYS)
+	duration = max(cint(duration) or 60, 5)
+	step = max(cint(step) or 30, 5)
+	resources = get_resources(company)
+	return {
+		"company": company,
+		"configured": bool(resources["Bay"] or resources["Advisor"]),
+		"days": free_slots(company, from_date or getdate(), days, duration, step, service_advisor),
+	}
@@ -0,0 +1,165 @@
+# Copyright (c) 2026, Infoney and contributors
+# Scheduled sweep: overdue appointments to No-Show and long-idle In Progress Job Cards flagged stale.
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate, now_datetime
+
+from workshop_mgmt.workshop_management.dashboard_rollup import METRIC_APPOINTMENT_STATUS, refresh_metrics
+from workshop_mgmt.workshop_management.slot_availability import invalidate_bookings
+
+# Defaults; override per site in site_config.json (e.g. "workshop_no_show_grace_minutes": 240).
+DEFAULTS = {
+	# A Scheduled appointment becomes No-Show this long after its start.
+	"workshop_no_show_grace_minutes": 120,
+	# An In Progress Job Card not modified for this many days is flagged stale.
+	"workshop_stale_job_days": 14,
+	"workshop_sweep_batch_size": 500,
+	# Inside business hours [start, end) batches shrink and stale flagging waits for the night.
+	"workshop_business_hours": [7, 19],
+	"workshop_business_hours_batch_size": 50,
+}
+# Upper bound on batches per run; whatever is left is picked up by the next run.
+MAX_BATCHES = 20
+
+
+def _setting(key: str):
+	value = frappe.conf.get(key)
+	return DEFAULTS[key] if value is None else value
+
+
+def _in_business_hours(now) -> bool:
+	start, end = _setting("workshop_business_hours")
+	return cint(start) <= now.hour < cint(end)
+
+
+def _batch_size(now) -> int:
+	key = "workshop_business_hours_batch_size" if _in_business_hours(now) else "workshop_sweep_batch_size"
+	return max(cint(_setting(key)), 1)
+
+
+def _add_comments(doctype: str, names, content: str, ts) -> None:
+	"""One Info comment per document, written with a single multi-row insert."""
+	values = [
+		(frappe.generate_hash(length=10), ts, ts, "Administrator", "Administrator", "Info", doctype, name, content)
+		for name in names
+	]
+	frappe.db.bulk_insert(
+		"Comment",
+		(
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"comment_type",
+			"reference_doctype",
+			"reference_name",
+			"content",
+		),
+		values,
+	)
+
+
+def mark_no_show_appointments(now=None) -> int:
+	"""Move Scheduled appointments whose start is older than the grace window to No-Show.
+
+	Each batch locks its rows with SKIP LOCKED (an appointment being checked in right now is left for
+	the next run), updates them with one statement and commits, so locks last for one batch only.
+	UPDATEs skip controllers, so the status rollup (and with it the dashboard) and slot caches are
+	refreshed here.
+	"""
+	now = now or now_datetime()
+	cutoff = now - timedelta(minutes=cint(_setting("workshop_no_show_grace_minutes")))
+	batch_size = _batch_size(now)
+	content = _("Marked No-Show: not checked in within {0} minutes of the scheduled start.").format(
+		cint(_setting("workshop_no_show_grace_minutes"))
+	)
+	total = 0
+	for _batch in range(MAX_BATCHES):
+		rows = frappe.db.sql(
+			"""
+			select name, company, scheduled_start, scheduled_end
+			from `tabService Appointment`
+			where status = 'Scheduled' and scheduled_start < %(cutoff)s
+			order by scheduled_start
+			limit %(limit)s
+			for update skip locked
+			""",
+			{"cutoff": cutoff, "limit": batch_size},
+			as_dict=True,
+		)
+		if not rows:
+			break
+		names = tuple(r.name for r in rows)
+		frappe.db.sql(
+			"""
+			update `tabService Appointment`
+			set status = 'No-Show', modified = %(ts)s, modified_by = 'Administrator'
+			where name in %(names)s
+			""",
+			{"ts": now, "names": names},
+		)
+		_add_comments("Service Appointment", names, content, now)
+		days = {(r.company or "", getdate(r.scheduled_start)) for r in rows}
+		refresh_metrics((METRIC_APPOINTMENT_STATUS,), days)
+		invalidate_bookings((r.company, r.scheduled_start, r.scheduled_end) for r in rows)
+		frappe.db.commit()
+		total += len(names)
+		if len(rows) < batch_size:
+			break
+	return total
+
+
+def flag_stale_job_cards(now=None) -> int:
+	"""Flag In Progress Job Cards untouched for the configured number of days (Job Card.is_stale).
+
+	The flag is cleared by the card's next save. Batched and committed like mark_no_show_appointments.
+	"""
+	now = now or now_datetime()
+	days = cint(_setting("workshop_stale_job_days"))
+	cutoff = now - timedelta(days=days)
+	batch_size = _batch_size(now)
+	content = _("Flagged stale: In Progress with no update for {0} days.").format(days)
+	total = 0
+	for _batch in range(MAX_BATCHES):
+		names = frappe.db.sql_list(
+			"""
+			select name
+			from `tabJob Card`
+			where status = 'In Progress' and is_stale = 0 and modified < %(cutoff)s
+			order by modified
+			limit %(limit)s
+			for update skip locked
+			""",
+			{"cutoff": cutoff, "limit": batch_size},
+		)
+		if not names:
+			break
+		# modified is left alone: it is what "untouched" is measured by.
+		frappe.db.sql(
+			"""
+			update `tabJob Card`
+			set is_stale = 1
+			where name in %(names)s
+			""",
+			{"names": tuple(names)},
+		)
+		_add_comments("Job Card", names, content, now)
+		frappe.db.commit()
+		total += len(names)
+		if len(names) < batch_size:
+			break
+	return total
+
+
+def sweep_statuses():
+	"""Hourly scheduler job. Stale Job Cards are only flagged outside business hours."""
+	now = now_datetime()
+	no_shows = mark_no_show_appointments(now)
+	stale = 0 if _in_business_hours(now) else flag_stale_job_cards(now)
+	return {"no_show": no_shows, "stale_job_cards": stale}
@@ -0,0 +1,272 @@
+# Copyright (c) 2026, Infoney and contributors
+# Part availability for Job Cards: Bin stock minus qty reserved by other open Job Cards, in batch.
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import flt, now
+
+RESERVATION_DOCTYPE = "Workshop Stock Reservation"
+# Job Cards in these states no longer hold their parts (invoiced stock has left the warehouse).
+RELEASED_STATUSES = ("Invoiced", "Closed", "Cancelled")
+SHORTAGE_BATCH_LIMIT = 500
+
+_INSERT_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"job_card",
+	"company",
+	"item_code",
+	"warehouse",
+	"qty",
+)
+
+
+def _required(part_rows, default_warehouse) -> dict[tuple[str, str], float]:
+	"""Part qty per (item, warehouse), a row's warehouse falling back to the Job Card's."""
+	required = defaultdict(float)
+	for row in part_rows:
+		warehouse = row.get("warehouse") or default_warehouse
+		if row.get("item_code") and warehouse:
+			required[(row.get("item_code"), warehouse)] += flt(row.get("qty"))
+	return required
+
+
+# Reservation ledger
+# ------------------
+
+
+def _write_reservations(job_card: str, company: str | None, required: dict) -> None:
+	frappe.db.delete(RESERVATION_DOCTYPE, {"job_card": job_card})
+	if not required:
+		return
+	ts = now()
+	user = frappe.session.user
+	values = [
+		(frappe.generate_hash(length=10), ts, ts, user, user, job_card, company, item, warehouse, qty)
+		for (item, warehouse), qty in required.items()
+		if qty > 0
+	]
+	if values:
+		frappe.db.bulk_insert(RESERVATION_DOCTYPE, _INSERT_FIELDS, values)
+
+
+def sync_reservations(doc, method=None):
+	"""Job Card on_update / on_trash: mirror the card's part rows into the ledger while it is open."""
+	if method == "on_trash" or doc.status in RELEASED_STATUSES:
+		release_reservations(doc.name)
+		return
+	_write_reservations(doc.name, doc.company, _required(doc.part_items or [], doc.warehouse))
+
+
+def release_reservations(job_card: str) -> None:
+	"""Drop a Job Card's reservations (also for status moves done with db_set, which skip doc events)."""
+	frappe.db.delete(RESERVATION_DOCTYPE, {"job_card": job_card})
+
+
+def rebuild_reservations(commit=True) -> int:
+	"""Rebuild the ledger from every open Job Card (backfill / drift repair). Return rows written."""
+	frappe.db.delete(RESERVATION_DOCTYPE)
+	rows = frappe.db.sql(
+		"""
+		select jc.name as job_card, jc.company, pi.item_code,
+			coalesce(nullif(pi.warehouse, ''), jc.warehouse) as warehouse, sum(pi.qty) as qty
+		from `tabJob Card Part Item` pi
+		inner join `tabJob Card` jc on jc.name = pi.parent
+		where pi.parenttype = 'Job Card' and pi.parentfield = 'part_items'
+			and jc.status not in %(released)s and jc.docstatus < 2
+		group by jc.name, jc.company, pi.item_code, coalesce(nullif(pi.warehouse, ''), jc.warehouse)
+		having sum(pi.qty) > 0
+		""",
+		{"released": RELEASED_STATUSES},
+		as_dict=True,
+	)
+	ts = now()
+	user = frappe.session.user
+	values = [
+		(frappe.generate_hash(length=10), ts, ts, user, user, r.job_card, r.company, r.item_code, r.warehouse, r.qty)
+		for r in rows
+		if r.item_code and r.warehouse
+	]
+	if values:
+		frappe.db.bulk_insert(RESERVATION_DOCTYPE, _INSERT_FIELDS, values)
+	if commit:
+		frappe.db.commit()
+	return len(values)
+
+
+# Availability
+# ------------
+
+
+def _stock_and_reservations(pairs) -> tuple[dict, dict, dict]:
+	"""Bin actual qty, reserved qty and reserved qty per Job Card for (item, warehouse) pairs, one query.
+
+	Items and warehouses are filtered separately (index friendly); pairs outside the requested set are
+	dropped in Python.
+	"""
+	pairs = set(pairs)
+	if not pairs:
+		return {}, {}, {}
+	params = {
+		"items": tuple({item for item, _w in pairs}),
+		"warehouses": tuple({warehouse for _i, warehouse in pairs}),
+	}
+	rows = frappe.db.sql(
+		f"""
+		select item_code, warehouse, null as job_card, actual_qty as qty
+		from `tabBin`
+		where item_code in %(items)s and warehouse in %(warehouses)s
+		union all
+		select item_code, warehouse, job_card, qty
+		from `tab{RESERVATION_DOCTYPE}`
+		where item_code in %(items)s and warehouse in %(warehouses)s
+		""",
+		params,
+		as_dict=True,
+	)
+	actual = defaultdict(float)
+	reserved = defaultdict(float)
+	reserved_by = defaultdict(float)
+	for r in rows:
+		pair = (r.item_code, r.warehouse)
+		if pair not in pairs:
+			continue
+		if r.job_card is None:
+			actual[pair] += flt(r.qty)
+		else:
+			reserved[pair] += flt(r.qty)
+			reserved_by[(r.job_card, *pair)] += flt(r.qty)
+	return actual, reserved, reserved_by
+
+
+def _shortages(job_card, required, actual, reserved, reserved_by) -> list[dict]:
+	out = []
+	for (item, warehouse), qty in required.items():
+		pair = (item, warehouse)
+		elsewhere = reserved[pair] - reserved_by[(job_card, item, warehouse)]
+		available = actual[pair] - elsewhere
+		if available < qty:
+			out.append(
+				{
+					"item_code": item,
+					"warehouse": warehouse,
+					"required": qty,
+					"actual": actual[pair],
+					"reserved_elsewhere": elsewhere,
+					"available": available,
+					"shortage": qty - available,
+				}
+			)
+	return out
+
+
+def get_shortages(doc) -> list[dict]:
+	"""Part rows of one Job Card that the warehouse cannot cover after other open cards' reservations."""
+	required = _required(doc.part_items or [], doc.warehouse)
+	return _shortages(doc.name, required, *_stock_and_reservations(required))
+
+
+def validate_job_card_stock(doc) -> None:
+	"""Throw when any part of the Job Card is short (used before invoicing)."""
+	shortages = get_shortages(doc)
+	if not shortages:
+		return
+	error_msg = _("Insufficient stock for the following items:") + "<br><br>"
+	for item in shortages:
+		error_msg += (
+			_("• Item: {0} | Warehouse: {1} | Available: {2} | Required: {3}").format(
+				item["item_code"], item["warehouse"], item["available"], item["required"]
+			)
+			+ (
+				_(" (reserved by other open job cards: {0})").format(item["reserved_elsewhere"])
+				if item["reserved_elsewhere"]
+				else ""
+			)
+			+ "<br>"
+		)
+	frappe.throw(error_msg, title=_("Stock Not Available"))
+
+
+def get_part_requirements(job_cards) -> dict[str, dict]:
+	"""Part qty per (item, warehouse) for many Job Cards from one query; cards without parts are left out."""
+	if not job_cards:
+		return {}
+	rows = frappe.db.sql(
+		"""
+		select pi.parent, pi.item_code, pi.warehouse, pi.qty, jc.warehouse as default_warehouse
+		from `tabJob Card Part Item` pi
+		inner join `tabJob Card` jc on jc.name = pi.parent
+		where pi.parent in %(names)s and pi.parenttype = 'Job Card' and pi.parentfield = 'part_items'
+		""",
+		{"names": tuple(job_cards)},
+		as_dict=True,
+	)
+	by_card = defaultdict(list)
+	for r in rows:
+		by_card[r.parent].append(r)
+	return {card: _required(parts, parts[0].default_warehouse) for card, parts in by_card.items()}
+
+
+def allocate_stock(requirements: dict[str, dict], order) -> dict[str, list[dict]]:
+	"""Shortages when the cards in order draw on stock one after another (e.g. a batch invoicing run).
+
+	Each pair starts from Bin stock minus what open cards outside the batch reserve. A card that fits
+	takes its qty from the pool; a card that does not is reported and takes nothing.
+	"""
+	actual, reserved, reserved_by = _stock_and_reservations(
+		pair for required in requirements.values() for pair in required
+	)
+	pool = {}
+	for pair in actual.keys() | reserved.keys():
+		in_batch = sum(reserved_by[(card, *pair)] for card in requirements)
+		pool[pair] = actual[pair] - (reserved[pair] - in_batch)
+
+	out = {}
+	for card in order:
+		required = requirements.get(card) or {}
+		short = [
+			{"item_code": item, "warehouse": warehouse, "required": qty, "available": pool.get((item, warehouse), 0)}
+			for (item, warehouse), qty in required.items()
+			if pool.get((item, warehouse), 0) < qty
+		]
+		if short:
+			out[card] = short
+			continue
+		for pair, qty in required.items():
+			pool[pair] -= qty
+	return out
+
+
+@frappe.whitelist()
+def get_job_card_shortages(job_cards):
+	"""Part shortages for many Job Cards in one round trip (kanban board): {job_card: [shortage, ...]}.
+
+	Only readable, open cards with at least one short part appear in the result.
+	"""
+	names = frappe.parse_json(job_cards) if isinstance(job_cards, str) else job_cards
+	names = list(dict.fromkeys(n for n in names or [] if n))
+	if len(names) > SHORTAGE_BATCH_LIMIT:
+		frappe.throw(_("At most {0} Job Cards can be checked at once.").format(SHORTAGE_BATCH_LIMIT))
+	if not names:
+		return {}
+	names = frappe.get_list(
+		"Job Card",
+		filters={"name": ["in", names], "status": ["not in", RELEASED_STATUSES]},
+		pluck="name",
+		limit_page_length=0,
+	)
+	required = get_part_requirements(names)
+	stock = _stock_and_reservations(pair for card_required in required.values() for pair in card_required)
+	out = {}
+	for card, card_required in required.items():
+		shortages = _shortages(card, card_required, *stock)
+		if shortages:
+			out[card] = shortages
+	return out
@@ -3,38 +3,21 @@
 
 import frappe
 from frappe import _
-from frappe.utils import cint, flt
+from frappe.utils import cint, strip_html
+
+from workshop_mgmt.workshop_management.bom_index import get_exploded_components
+from workshop_mgmt.workshop_management.pricing import get_item_rates, get_job_card_rates
 
 # Inspection lines that should appear on the Job Card complaint summary
 _INSPECTION_COMPLAINT_STATUSES = frozenset({"Needs Attention", "Critical"})
 
-
-def _item_rate(item_code: str) -> float:
-	rate = frappe.db.get_value("Item", item_code, "standard_rate")
-	return flt(rate)
-
-
-def _active_bom_for_item(item_code: str, company: str) -> str | None:
-	if not frappe.db.table_exists("BOM"):
-		return None
-	filters = {"item": item_code, "docstatus": 1, "is_active": 1}
-	if company:
-		filters["company"] = company
-	return frappe.db.get_value("BOM", filters, "name", order_by="is_default desc, modified desc")
-
-
-def _bom_part_quantities(bom_name: str) -> dict[str, float]:
-	"""Per finished-unit quantities of stock components for one BOM."""
-	out: dict[str, float] = {}
-	bom = frappe.get_doc("BOM", bom_name)
-	base = flt(bom.quantity) or 1
-	for row in bom.items or []:
-		if not row.item_code:
-			continue
-		consumed = flt(row.stock_qty) if row.stock_qty else flt(row.qty)
-		per_fg = consumed / base
-		out[row.item_code] = out.get(row.item_code, 0) + per_fg
-	return out
+# Batch conversion (fleet inspection days)
+CONVERSION_BATCH_LIMIT = 200
+CONVERSION_CHUNK_SIZE = 10
+CONVERSION_TIMEOUT = 30 * 60
+CONVERSION_EVENT = "workshop_inspection_conversion"
+_CONVERSION_PREFIX = "workshop_inspection_conversion"
+_CONVERSION_TTL = 24 * 60 * 60
 
 
 def _build_complaint_summary_from_inspection(doc) -> str:
@@ -62,30 +45,70 @@ def _build_complaint_summary_from_inspection(doc) -> str:
 	return "\n\n".join(lines[:50])
 
 
-def _populate_job_lines_from_inspection(jc, inspection_doc, company: str):
-	"""Append service_items and part_items from inspection recommendations (+ BOM parts for services)."""
-	service_codes: list[str] = []
+def _item_meta(item_codes) -> dict:
+	"""is_stock_item / disabled for many items in one query; unknown items are left out."""
+	if not item_codes:
+		return {}
+	rows = frappe.get_all(
+		"Item",
+		filters={"name": ["in", list(item_codes)]},
+		fields=["name", "is_stock_item", "disabled"],
+	)
+	return {r.name: r for r in rows}
+
+
+def _line_lookups(inspection_docs, company: str, customers=()) -> dict:
+	"""Item metadata, BOM explosions and (optionally) rates per customer for a set of inspections.
+
+	Built once and shared by every Job Card of a batch: item metadata for the recommendations, the
+	cached BOM explosion index, metadata for the BOM components, and one price batch per customer.
+	"""
+	codes = {
+		row.recommended_service
+		for doc in inspection_docs
+		for row in doc.inspection_items or []
+		if row.recommended_service
+	}
+	meta = _item_meta(codes)
+	services = [code for code, item in meta.items() if not cint(item.disabled) and not cint(item.is_stock_item)]
+	exploded = get_exploded_components(services, company)
+	meta.update(_item_meta({part for components in exploded.values() for part in components}.difference(meta)))
+	rates = {customer: get_item_rates(meta, customer=customer) for customer in set(customers)}
+	return {"meta": meta, "exploded": exploded, "rates": rates}
+
+
+def _populate_job_lines_from_inspection(jc, inspection_doc, company: str, lookups: dict | None = None):
+	"""Append service_items and part_items from inspection recommendations (+ BOM parts for services).
+
+	A constant number of queries whatever the inspection size (see _line_lookups); a batch passes the
+	lookups it built for all of its inspections.
+	"""
+	lookups = lookups or _line_lookups([inspection_doc], company)
+	meta = lookups["meta"]
 	service_qty: dict[str, float] = {}
 	part_qty: dict[str, float] = {}
 
 	for row in inspection_doc.inspection_items or []:
 		code = row.recommended_service
-		if not code:
-			continue
-		meta = frappe.db.get_value(
-			"Item",
-			code,
-			["is_stock_item", "disabled"],
-			as_dict=True,
-		)
-		if not meta or cint(meta.disabled):
+		item = meta.get(code) if code else None
+		if not item or cint(item.disabled):
 			continue
-		if cint(meta.is_stock_item):
+		if cint(item.is_stock_item):
 			part_qty[code] = part_qty.get(code, 0) + 1
 		else:
 			service_qty[code] = service_qty.get(code, 0) + 1
-			if code not in service_codes:
-				service_codes.append(code)
+
+	for svc, svc_qty in service_qty.items():
+		for part_code, bom_qty in lookups["exploded"].get(svc, {}).items():
+			pmeta = meta.get(part_code)
+			if not pmeta or cint(pmeta.disabled) or not cint(pmeta.is_stock_item):
+				continue
+			part_qty[part_code] = part_qty.get(part_code, 0) + bom_qty * svc_qty
+
+	# Every line is priced in one batch against the customer's price list
+	rates = lookups["rates"].get(jc.customer)
+	if rates is None:
+		rates = get_job_card_rates(jc, [*service_qty, *part_qty])
 
 	for code, qty in service_qty.items():
 		jc.append(
@@ -93,42 +116,28 @@ def _populate_job_lines_from_inspection(jc, inspection_doc, company: str):
 			{
 				"item_code": code,
 				"qty": qty,
-				"rate": _item_rate(code),
+				"rate": rates.get(code, 0.0),
 			},
 		)
 
-	for svc in service_codes:
-		bom_name = _active_bom_for_item(svc, company)
-		if not bom_name:
-			continue
-		for part_code, bom_qty in _bom_part_quantities(bom_name).items():
-			pmeta = frappe.db.get_value("Item", part_code, ["is_stock_item", "disabled"], as_dict=True)
-			if not pmeta or cint(pmeta.disabled) or not cint(pmeta.is_stock_item):
-				continue
-			part_qty[part_code] = part_qty.get(part_code, 0) + bom_qty * service_qty.get(svc, 1)
-
 	for code, qty in sorted(part_qty.items()):
 		jc.append(
 			"part_items",
 			{
 				"item_code": code,
 				"qty": qty,
-				"rate": _item_rate(code),
+				"rate": rates.get(code, 0.0),
 				"warehouse": jc.warehouse,
 			},
 		)
 
 
-@frappe.whitelist()
-def create_job_card_from_inspection(
-	inspection: str,
-	company: str,
-	warehouse: str,
-	populate_from_recommendations=1,
-):
-	"""Create a Job Card linked to this inspection and appointment; optionally fill lines from recommendations."""
-	frappe.has_permission("Job Card", ptype="create", throw=True)
-	doc = frappe.get_doc("Vehicle Inspection", inspection)
+def _validate_warehouse(company: str, warehouse: str) -> None:
+	if not frappe.db.exists("Warehouse", {"name": warehouse, "company": company}):
+		frappe.throw(_("Warehouse {0} must belong to Company {1}").format(warehouse, company))
+
+
+def _validate_inspection(doc) -> None:
 	doc.check_permission("write")
 
 	if doc.job_card and frappe.db.exists("Job Card", doc.job_card):
@@ -137,11 +146,8 @@ def create_job_card_from_inspection(
 	if not doc.customer or not doc.vehicle:
 		frappe.throw(_("Customer and Vehicle are required on the inspection"))
 
-	if not frappe.db.exists("Warehouse", {"name": warehouse, "company": company}):
-		frappe.throw(_("Warehouse {0} must belong to Company {1}").format(warehouse, company))
-
-	populate = cint(populate_from_recommendations)
 
+def _new_job_card(doc, company: str, warehouse: str, populate: bool, lookups: dict | None = None) -> str:
 	jc = frappe.new_doc("Job Card")
 	jc.company = company
 	jc.warehouse = warehouse
@@ -152,8 +158,138 @@ def create_job_card_from_inspection(
 	jc.complaint_summary = _build_complaint_summary_from_inspection(doc)
 
 	if populate:
-		_populate_job_lines_from_inspection(jc, doc, company)
+		_populate_job_lines_from_inspection(jc, doc, company, lookups)
 
 	jc.insert()
 
 	return jc.name
+
+
+@frappe.whitelist()
+def create_job_card_from_inspection(
+	inspection: str,
+	company: str,
+	warehouse: str,
+	populate_from_recommendations=1,
+):
+	"""Create a Job Card linked to this inspection and appointment; optionally fill lines from recommendations."""
+	frappe.has_permission("Job Card", ptype="create", throw=True)
+	doc = frappe.get_doc("Vehicle Inspection", inspection)
+	_validate_inspection(doc)
+	_validate_warehouse(company, warehouse)
+
+	return _new_job_card(doc, company, warehouse, cint(populate_from_recommendations))
+
+
+# Batch conversion
+# ----------------
+
+
+@frappe.whitelist()
+def create_job_cards_from_inspections(
+	inspections,
+	company: str,
+	warehouse: str,
+	populate_from_recommendations=1,
+) -> dict:
+	"""Queue Job Card creation for many inspections sharing one company and warehouse (e.g. a fleet day).
+
+	Company, warehouse and permissions are checked once here; the worker shares item, BOM and price
+	lookups across the batch and reports per-inspection results through get_conversion_status and the
+	workshop_inspection_conversion realtime event.
+	"""
+	names = frappe.parse_json(inspections) if isinstance(inspections, str) else inspections
+	names = list(dict.fromkeys(n for n in names or [] if n))
+	if not names:
+		frappe.throw(_("Select at least one Vehicle Inspection."))
+	if len(names) > CONVERSION_BATCH_LIMIT:
+		frappe.throw(_("At most {0} inspections can be converted at once.").format(CONVERSION_BATCH_LIMIT))
+	frappe.has_permission("Job Card", ptype="create", throw=True)
+	_validate_warehouse(company, warehouse)
+
+	job_id = f"{_CONVERSION_PREFIX}::{frappe.generate_hash(length=12)}"
+	record = _set_conversion_status(job_id, "queued", total=len(names), results={})
+	frappe.enqueue(
+		"workshop_mgmt.workshop_management.vehicle_inspection_jobs.convert_inspections",
+		queue="long",
+		timeout=CONVERSION_TIMEOUT,
+		job_id=job_id,
+		enqueue_after_commit=True,
+		conversion_id=job_id,
+		inspections=names,
+		company=company,
+		warehouse=warehouse,
+		populate=cint(populate_from_recommendations),
+	)
+	return record
+
+
+def _set_conversion_status(conversion_id: str, status: str, **values) -> dict:
+	record = {"conversion_id": conversion_id, "status": status, "user": frappe.session.user, **values}
+	frappe.cache().set_value(f"{_CONVERSION_PREFIX}:{conversion_id}", record, expires_in_sec=_CONVERSION_TTL)
+	return record
+
+
+@frappe.whitelist()
+def get_conversion_status(conversion_id: str) -> dict:
+	"""Progress and per-inspection results of a queued batch conversion (only for the user who queued it)."""
+	record = frappe.cache().get_value(f"{_CONVERSION_PREFIX}:{conversion_id}", expires=True)
+	if not record or record.get("user") != frappe.session.user:
+		frappe.throw(_("Conversion {0} not found.").format(conversion_id), frappe.DoesNotExistError)
+	return record
+
+
+def convert_inspections(conversion_id: str, inspections: list, company: str, warehouse: str, populate: int):
+	"""Worker: one Job Card per inspection, each under a savepoint, committed CONVERSION_CHUNK_SIZE at a time.
+
+	Results map each inspection to {"status": "created", "job_card"} or {"status": "failed", "error"}.
+	"""
+	from workshop_mgmt.workshop_management import link_sync
+	from workshop_mgmt.workshop_management.link_cache import clear as clear_link_headers
+
+	results: dict[str, dict] = {}
+	docs = []
+	for name in inspections:
+		try:
+			doc = frappe.get_doc("Vehicle Inspection", name)
+			_validate_inspection(doc)
+			docs.append(doc)
+		except Exception as e:
+			frappe.clear_messages()
+			results[name] = {"status": "failed", "error": strip_html(str(e))}
+
+	lookups = None
+	if populate and docs:
+		lookups = _line_lookups(docs, company, customers=[doc.customer for doc in docs])
+	_set_conversion_status(conversion_id, "running", total=len(inspections), results=results)
+
+	for offset in range(0, len(docs), CONVERSION_CHUNK_SIZE):
+		for doc in docs[offset : offset + CONVERSION_CHUNK_SIZE]:
+			link_sync.flush()
+			frappe.db.savepoint(_CONVERSION_PREFIX)
+			try:
+				results[doc.name] = {
+					"status": "created",
+					"job_card": _new_job_card(doc, company, warehouse, populate, lookups),
+				}
+			except Exception as e:
+				frappe.db.rollback(save_point=_CONVERSION_PREFIX)
+				link_sync.discard()
+				clear_link_headers()
+				results[doc.name] = {"status": "failed", "error": strip_html(str(e)) or _("Job Card creation failed.")}
+			finally:
+				frappe.clear_messages()
+		frappe.db.commit()
+		_set_conversion_status(conversion_id, "running", total=len(inspections), results=results)
+
+	failed = sum(1 for r in results.values() if r["status"] == "failed")
+	record = _set_conversion_status(
+		conversion_id,
+		"done",
+		total=len(inspections),
+		created=len(results) - failed,
+		failed=failed,
+		results=results,
+	)
+	frappe.publish_realtime(CONVERSION_EVENT, record, user=frappe.session.user)
+	return record
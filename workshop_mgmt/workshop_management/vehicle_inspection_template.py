@@ -1,5 +1,8 @@
 # Copyright (c) 2026, Infoney and contributors
-# Standard vehicle inspection checklist (sections + check items). Used by Vehicle Inspection "Load checklist".
+# Inspection checklists: the built-in standard list plus per make / model / fuel type templates, compiled and cached.
+
+import hashlib
+import json
 
 import frappe
 
@@ -34,7 +37,92 @@ STANDARD_VEHICLE_INSPECTION_CHECKLIST = [
 ]
 
 
+_BUNDLE_KEY = "workshop_inspection_checklists"
+_MATCH_FIELDS = ("make", "model", "fuel_type")
+
+
+def _compile() -> dict:
+	"""Every enabled Inspection Checklist Template plus the built-in list, tagged with a content hash."""
+	templates = frappe.get_all(
+		"Inspection Checklist Template",
+		filters={"enabled": 1},
+		fields=["name", "priority", *_MATCH_FIELDS],
+		order_by="name asc",
+	)
+	items: dict[str, list] = {}
+	if templates:
+		rows = frappe.get_all(
+			"Inspection Checklist Template Item",
+			filters={"parenttype": "Inspection Checklist Template", "parent": ["in", [t.name for t in templates]]},
+			fields=["parent", "section", "check_item"],
+			order_by="parent asc, idx asc",
+		)
+		for r in rows:
+			items.setdefault(r.parent, []).append({"section": r.section, "check_item": r.check_item})
+	bundle = {
+		"templates": [
+			{
+				"name": t.name,
+				"priority": t.priority or 0,
+				**{f: (t.get(f) or "").strip().lower() or None for f in _MATCH_FIELDS},
+				"items": items.get(t.name, []),
+			}
+			for t in templates
+		],
+		"standard": STANDARD_VEHICLE_INSPECTION_CHECKLIST,
+	}
+	content = json.dumps(bundle, sort_keys=True, separators=(",", ":"))
+	bundle["version"] = hashlib.sha1(content.encode()).hexdigest()[:16]
+	return bundle
+
+
+def get_checklist_bundle() -> dict:
+	"""Compiled templates from the cache (compiled on first use after a template change)."""
+	return frappe.cache().get_value(_BUNDLE_KEY, generator=_compile)
+
+
+def invalidate_checklist_bundle() -> None:
+	"""Inspection Checklist Template on_update / on_trash: recompile on next use (again once committed,
+	so a request racing the save cannot cache the old templates)."""
+	frappe.cache().delete_value(_BUNDLE_KEY)
+	frappe.db.after_commit.add(lambda: frappe.cache().delete_value(_BUNDLE_KEY))
+
+
+def select_checklist(bundle: dict, make=None, model=None, fuel_type=None) -> list[dict]:
+	"""Rows of the best template for the vehicle: every set criterion must match (case-insensitive),
+	more matched criteria win, then priority, then name; the built-in list when nothing matches.
+	The portal runs the same selection on its cached bundle (frontend/src/utils/checklists.js)."""
+	vehicle = {"make": make, "model": model, "fuel_type": fuel_type}
+	vehicle = {f: (v or "").strip().lower() or None for f, v in vehicle.items()}
+	best, best_key = None, None
+	for template in bundle["templates"]:
+		criteria = [f for f in _MATCH_FIELDS if template[f]]
+		if any(template[f] != vehicle[f] for f in criteria):
+			continue
+		key = (len(criteria), template["priority"])
+		if best_key is None or key > best_key:
+			best, best_key = template, key
+	return best["items"] if best else bundle["standard"]
+
+
+@frappe.whitelist()
+def get_inspection_checklists(etag=None) -> dict:
+	"""Compiled checklist templates for clients that keep them locally.
+
+	Pass the version of the copy you hold as etag: when it is still current only {"version",
+	"not_modified": 1} comes back, otherwise the whole bundle (version, templates, standard).
+	"""
+	bundle = get_checklist_bundle()
+	if etag and etag == bundle["version"]:
+		return {"version": bundle["version"], "not_modified": 1}
+	return bundle
+
+
 @frappe.whitelist()
-def get_standard_vehicle_inspection_checklist():
-	"""Return the built-in section + check_item rows for the inspection grid."""
-	return STANDARD_VEHICLE_INSPECTION_CHECKLIST
+def get_standard_vehicle_inspection_checklist(vehicle=None):
+	"""Return the section + check_item rows for the inspection grid, picked for the vehicle when given."""
+	bundle = get_checklist_bundle()
+	if not vehicle:
+		return bundle["standard"]
+	values = frappe.db.get_value("Vehicle", vehicle, list(_MATCH_FIELDS), as_dict=True) or {}
+	return select_checklist(bundle, **values)
@@ -0,0 +1,357 @@
+# Copyright (c) 2026, Infoney and contributors
+# Compiled workflow transition graphs (per workflow and role set) for shortest-path status moves.
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import deque
+
+import frappe
+from frappe import _
+
+_PREFIX = "workshop_workflow_graph"
+
+# Compiled graphs also stay in worker memory, keyed by the full cache key (which carries the generation).
+_LOCAL_GRAPHS: dict[str, dict] = {}
+_LOCAL_LIMIT = 64
+
+
+def _generation_key(workflow_name: str) -> str:
+	return frappe.cache().make_key(f"{_PREFIX}:generation:{workflow_name}")
+
+
+def invalidate_workflow_graph(doc, method=None):
+	"""Workflow on_update / on_trash: compiled graphs of that workflow are rebuilt on next use."""
+	frappe.cache().incr(_generation_key(doc.name))
+	_LOCAL_GRAPHS.clear()
+
+
+def _roles_key(roles) -> str:
+	return hashlib.md5("\n".join(sorted(roles)).encode()).hexdigest()[:12]
+
+
+def _shortest_paths(edges: dict) -> dict:
+	"""All-pairs shortest paths over every edge, as [(state, edge index), ...] per (source, target).
+
+	BFS from each state, following edges in transition order and keeping the first discovery, so ties
+	break exactly like the uncompiled search.
+	"""
+	paths = {}
+	for source in edges:
+		found = {source: []}
+		queue = deque([source])
+		while queue:
+			state = queue.popleft()
+			for idx, edge in enumerate(edges.get(state, ())):
+				if edge["next_state"] in found:
+					continue
+				found[edge["next_state"]] = [*found[state], (state, idx)]
+				queue.append(edge["next_state"])
+		del found[source]
+		paths[source] = found
+	return paths
+
+
+def _compile(workflow, roles) -> dict:
+	edges: dict[str, list[dict]] = {}
+	for tr in workflow.transitions:
+		if tr.allowed not in roles:
+			continue
+		edges.setdefault(tr.state, []).append(
+			{
+				"action": tr.action,
+				"next_state": tr.next_state,
+				"condition": (tr.condition or "").strip() or None,
+				"allow_self_approval": bool(tr.allow_self_approval),
+			}
+		)
+	return {
+		"workflow": workflow.name,
+		"state_field": workflow.workflow_state_field,
+		"initial": workflow.states[0].state if workflow.states else None,
+		"edges": edges,
+		"paths": _shortest_paths(edges),
+	}
+
+
+def get_compiled_graph(doctype: str, roles=None) -> dict | None:
+	"""Adjacency index and memoized shortest paths of the active workflow for the given roles.
+
+	Return None when the doctype has no active workflow.
+	"""
+	from frappe.model.workflow import get_workflow_name
+
+	workflow_name = get_workflow_name(doctype)
+	if not workflow_name:
+		return None
+	roles = roles if roles is not None else frappe.get_roles()
+	generation = frappe.cache().get(_generation_key(workflow_name))
+	key = f"{_PREFIX}:{workflow_name}:{int(generation or 0)}:{_roles_key(roles)}"
+
+	graph = _LOCAL_GRAPHS.get(key)
+	if graph is not None:
+		return graph
+	graph = frappe.cache().get_value(key)
+	if graph is None:
+		graph = _compile(frappe.get_cached_doc("Workflow", workflow_name), set(roles))
+		frappe.cache().set_value(key, graph, expires_in_sec=24 * 60 * 60)
+	if len(_LOCAL_GRAPHS) >= _LOCAL_LIMIT:
+		_LOCAL_GRAPHS.clear()
+	_LOCAL_GRAPHS[key] = graph
+	return graph
+
+
+class _EdgeChecker:
+	"""Per-call check of the doc-dependent parts of a transition, against one loaded document.
+
+	Edges without a condition and without a self-approval restriction are always allowed; the rest are
+	evaluated once per (state, edge) with the workflow field temporarily set to that state.
+	"""
+
+	def __init__(self, doc, graph: dict, user: str):
+		self.doc = doc
+		self.field = graph["state_field"]
+		self.edges = graph["edges"]
+		self.user = user
+		self.owner_blocked = user != "Administrator" and user == doc.get("owner")
+		self.memo: dict[tuple[str, int], bool] = {}
+
+	def is_static(self, edge: dict) -> bool:
+		return not edge["condition"] and (edge["allow_self_approval"] or not self.owner_blocked)
+
+	def allowed(self, state: str, idx: int) -> bool:
+		edge = self.edges[state][idx]
+		if self.is_static(edge):
+			return True
+		key = (state, idx)
+		if key not in self.memo:
+			self.memo[key] = self._evaluate(state, edge)
+		return self.memo[key]
+
+	def _evaluate(self, state: str, edge: dict) -> bool:
+		from frappe.model.workflow import has_approval_access, is_transition_condition_satisfied
+
+		original = self.doc.get(self.field)
+		self.doc.set(self.field, state)
+		try:
+			if edge["condition"] and not is_transition_condition_satisfied(
+				frappe._dict(condition=edge["condition"]), self.doc
+			):
+				return False
+			return has_approval_access(self.user, self.doc, edge)
+		finally:
+			self.doc.set(self.field, original)
+
+
+def path_to_status(doc, target_status: str, user: str | None = None, roles=None) -> list[str] | None:
+	"""Workflow actions moving doc to target_status along a shortest allowed path ([] if already there).
+
+	Return None when there is no workflow or no allowed path. The memoized shortest path is tried first:
+	it is shortest over a superset of the allowed edges, so it is the answer whenever its doc-dependent
+	hops pass; otherwise a BFS over the compiled adjacency evaluates only conditional edges.
+	"""
+	graph = get_compiled_graph(doc.doctype, roles)
+	if not graph:
+		return None
+	start = doc.get(graph["state_field"]) or graph["initial"]
+	if not start:
+		return None
+	if start == target_status:
+		return []
+
+	candidate = graph["paths"].get(start, {}).get(target_status)
+	if candidate is None:
+		return None
+
+	edges = graph["edges"]
+	checker = _EdgeChecker(doc, graph, user or frappe.session.user)
+	if all(checker.allowed(state, idx) for state, idx in candidate):
+		return [edges[state][idx]["action"] for state, idx in candidate]
+
+	queue = deque([(start, [])])
+	visited = {start}
+	while queue:
+		state, path = queue.popleft()
+		for idx, edge in enumerate(edges.get(state, ())):
+			if not checker.allowed(state, idx):
+				continue
+			next_path = [*path, edge["action"]]
+			if edge["next_state"] == target_status:
+				return next_path
+			if edge["next_state"] not in visited:
+				visited.add(edge["next_state"])
+				queue.append((edge["next_state"], next_path))
+	return None
+
+
+def shared_path(graph: dict, start: str, target_status: str, owner_blocked: bool) -> list[str] | None:
+	"""The memoized path from start to target_status when none of its hops depends on the document.
+
+	Such a path is allowed (and shortest) for every document in that state, so bulk moves resolve it once
+	per (state, target). Return None when some hop has a condition or a self-approval restriction that
+	applies (owner_blocked), or when no path exists; callers then fall back to path_to_status per doc.
+	"""
+	candidate = graph["paths"].get(start, {}).get(target_status)
+	if candidate is None:
+		return None
+	edges = graph["edges"]
+	for state, idx in candidate:
+		edge = edges[state][idx]
+		if edge["condition"] or (owner_blocked and not edge["allow_self_approval"]):
+			return None
+	return [edges[state][idx]["action"] for state, idx in candidate]
+
+
+def fast_forward(doc, actions: list[str], user: str | None = None):
+	"""Apply a multi-action workflow path with one save instead of one apply_workflow save per action.
+
+	Every hop is checked up front the way apply_workflow checks it (transition valid for the user's roles
+	and condition from that state, self-approval) and its state's update_field is applied in order. The
+	document is then saved once with the final state, and one Workflow comment per hop keeps the timeline
+	identical to stepwise moves. Return the saved doc, or None (doc reloaded, nothing written) when a hop
+	changes docstatus, which needs submit/cancel and so the stepwise path.
+	"""
+	from frappe.model.workflow import (
+		WorkflowTransitionError,
+		get_transitions,
+		get_workflow,
+		has_approval_access,
+	)
+	from frappe.utils import cint
+
+	workflow = get_workflow(doc.doctype)
+	field = workflow.workflow_state_field
+	states = {s.state: s for s in workflow.states}
+	user = user or frappe.session.user
+
+	hops = []
+	for action in actions:
+		transition = next((t for t in get_transitions(doc, workflow) if t.action == action), None)
+		if not transition:
+			frappe.throw(
+				_("Not a valid Workflow Action {0} from {1}.").format(action, doc.get(field)),
+				WorkflowTransitionError,
+			)
+		if not has_approval_access(user, doc, transition):
+			frappe.throw(_("Self approval is not allowed"))
+		next_state = states[transition.next_state]
+		if cint(next_state.doc_status) != doc.docstatus:
+			doc.reload()
+			return None
+		doc.set(field, next_state.state)
+		if next_state.update_field:
+			doc.set(next_state.update_field, next_state.update_value)
+		hops.append(next_state.state)
+
+	# Frappe's save-time check only knows single transitions; the controller skips it for this save.
+	doc.flags.workflow_fast_forward = hops
+	try:
+		doc.save()
+	finally:
+		doc.flags.workflow_fast_forward = None
+	for state in hops:
+		doc.add_comment("Workflow", _(state))
+	return doc
+
+
+# Benchmark
+# ---------
+
+
+def _uncompiled_path_to_status(doctype: str, name: str, target_status: str):
+	"""Reference search the compiled graph replaced (one document load and a full transition scan per
+	dequeued state); kept only for benchmark_path_resolution."""
+	from frappe.model.workflow import (
+		get_workflow,
+		has_approval_access,
+		is_transition_condition_satisfied,
+	)
+
+	workflow = get_workflow(doctype)
+	field = workflow.workflow_state_field
+	base = frappe.get_doc(doctype, name)
+	base.load_from_db()
+	start = base.get(field) or (workflow.states[0].state if workflow.states else None)
+	if not start:
+		return None
+	if start == target_status:
+		return []
+
+	roles = frappe.get_roles()
+	user = frappe.session.user
+	queue = deque([(start, [])])
+	visited = {start}
+	while queue:
+		state, path = queue.popleft()
+		eval_doc = frappe.get_doc(doctype, name)
+		eval_doc.load_from_db()
+		eval_doc.set(field, state)
+		for tr in workflow.transitions:
+			if tr.state != state or tr.allowed not in roles:
+				continue
+			if not is_transition_condition_satisfied(tr, eval_doc):
+				continue
+			if not has_approval_access(user, eval_doc, tr.as_dict()):
+				continue
+			new_path = [*path, tr.action]
+			if tr.next_state == target_status:
+				return new_path
+			if tr.next_state not in visited:
+				visited.add(tr.next_state)
+				queue.append((tr.next_state, new_path))
+	return None
+
+
+def benchmark_path_resolution(job_card: str | None = None, iterations: int = 20) -> dict:
+	"""Time path resolution to every workflow state for one Job Card, uncompiled vs compiled.
+
+	Run with: bench --site <site> benchmark-job-card-workflow [--job-card JC-...] [--iterations 20]
+	Both timings include loading the Job Card, as job_card_set_status does.
+	"""
+	from frappe.model.workflow import get_workflow, get_workflow_name
+
+	workflow_name = get_workflow_name("Job Card")
+	if not workflow_name:
+		frappe.throw(_("Job Card has no active workflow to benchmark."))
+	name = job_card or frappe.db.get_value("Job Card", {"docstatus": ["<", 2]}, "name", order_by="modified desc")
+	if not name:
+		frappe.throw(_("No Job Card found to benchmark against."))
+
+	targets = [s.state for s in get_workflow("Job Card").states]
+	iterations = max(int(iterations or 1), 1)
+	runs = iterations * len(targets)
+
+	def timed(resolve) -> float:
+		started = time.perf_counter()
+		for _i in range(iterations):
+			for target in targets:
+				resolve(target)
+		return (time.perf_counter() - started) * 1000 / runs
+
+	def compiled(target):
+		return path_to_status(frappe.get_doc("Job Card", name), target)
+
+	uncompiled_ms = timed(lambda target: _uncompiled_path_to_status("Job Card", name, target))
+
+	frappe.cache().incr(_generation_key(workflow_name))
+	_LOCAL_GRAPHS.clear()
+	started = time.perf_counter()
+	compiled(targets[0])
+	cold_ms = (time.perf_counter() - started) * 1000
+	compiled_ms = timed(compiled)
+
+	mismatches = [
+		target for target in targets if _uncompiled_path_to_status("Job Card", name, target) != compiled(target)
+	]
+	return {
+		"job_card": name,
+		"workflow": workflow_name,
+		"states": len(targets),
+		"iterations": iterations,
+		"uncompiled_ms_per_path": round(uncompiled_ms, 3),
+		"compiled_ms_per_path": round(compiled_ms, 3),
+		"compiled_cold_ms": round(cold_ms, 3),
+		"speedup": round(uncompiled_ms / compiled_ms, 1) if compiled_ms else None,
+		"mismatches": mismatches,
+	}